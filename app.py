@@ -4,153 +4,111 @@ Sistema de Otimização de Corte Contínuo - Backend Flask
 API REST para comunicação com interface web
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, g, render_template, jsonify, request, stream_with_context
 from flask_cors import CORS
-import networkx as nx
+import io
 import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from itertools import islice
+
+from nucleo import GrafoEuleriano, otimizar_grafo
+from mosaico import consultar_regiao, limites
+from importacao_dxf import ERRO_CORDA, TOLERANCIA_FUSAO, carregar_dxf
+from soldagem import TOLERANCIA_SOLDAGEM, soldar
+from carteiro_chines import TIPO_DESLOCAMENTO
+from gcode import blocos_texto, linhas_programa
+from compactacao_gcode import TOLERANCIA_PADRAO
+from cache_resultados import CacheResultados, chave_resultado
+from projetos import PROJETO_PADRAO, RegistroProjetos
+from tarefas import CONCLUIDA, GerenciadorTarefas
+from instrumentacao import TIPO_CONTEUDO, CronometroFases, cronometrar_gerador, medir, registro as registro_metricas
 
 app = Flask(__name__)
 CORS(app)
 
+# Número de programas CNC mantidos para download
+LIMITE_PROGRAMAS = 8
+# Formato aceito para identificadores de projeto
+ID_PROJETO = re.compile(r"[A-Za-z0-9_-]{1,64}")
 
-class GrafoEuleriano:
-    """Classe para representar e manipular grafos e encontrar ciclos eulerianos."""
-    
-    def __init__(self):
-        self.grafo = nx.MultiGraph()
-        self.vertices = {}
-        self.arestas = []
-        
-    def adicionar_vertice(self, nome, x, y):
-        """Adiciona um vértice ao grafo."""
-        self.grafo.add_node(nome, pos=(x, y))
-        self.vertices[nome] = (x, y)
-        
-    def adicionar_aresta(self, origem, destino, peso=1):
-        """Adiciona uma aresta ao grafo."""
-        self.grafo.add_edge(origem, destino, weight=peso)
-        # Adicionar à lista apenas se não existir (evitar duplicatas na lista)
-        if (origem, destino) not in self.arestas and (destino, origem) not in self.arestas:
-            self.arestas.append((origem, destino))
-        
-    def remover_vertice(self, nome):
-        """Remove um vértice do grafo."""
-        if nome in self.grafo:
-            self.grafo.remove_node(nome)
-            if nome in self.vertices:
-                del self.vertices[nome]
-            self.arestas = [(o, d) for o, d in self.arestas if o != nome and d != nome]
-            
-    def remover_aresta(self, origem, destino):
-        """Remove uma aresta do grafo."""
-        if self.grafo.has_edge(origem, destino):
-            self.grafo.remove_edge(origem, destino)
-            if (origem, destino) in self.arestas:
-                self.arestas.remove((origem, destino))
-            elif (destino, origem) in self.arestas:
-                self.arestas.remove((destino, origem))
-                
-    def verificar_euleriano(self):
-        """Verifica se o grafo possui um ciclo euleriano."""
-        if len(self.grafo.nodes()) == 0:
-            return False, "Grafo vazio"
-            
-        if not nx.is_connected(self.grafo.to_undirected()):
-            return False, "Grafo não é conexo"
-            
-        graus_impares = [v for v in self.grafo.nodes() if self.grafo.degree(v) % 2 != 0]
-        if len(graus_impares) > 0:
-            return False, f"Vértices com grau ímpar: {graus_impares}"
-            
-        return True, "Grafo é euleriano"
-        
-    def encontrar_ciclo_euleriano(self):
-        """Encontra um ciclo euleriano usando o algoritmo de Hierholzer."""
-        if len(self.grafo.edges()) == 0:
-            return []
-            
-        grafo_temp = self.grafo.copy()
-        vertice_atual = list(grafo_temp.nodes())[0]
-        ciclo = [vertice_atual]
-        
-        while grafo_temp.number_of_edges() > 0:
-            ciclo_parcial = self._encontrar_ciclo_parcial(grafo_temp, vertice_atual)
-            indice = ciclo.index(vertice_atual)
-            ciclo = ciclo[:indice] + ciclo_parcial + ciclo[indice+1:]
-            
-            vertice_atual = None
-            for v in ciclo:
-                if grafo_temp.degree(v) > 0:
-                    vertice_atual = v
-                    break
-                    
-            if vertice_atual is None:
-                break
-                
-        return ciclo
-        
-    def _encontrar_ciclo_parcial(self, grafo, vertice_inicial):
-        """Encontra um ciclo parcial a partir de um vértice."""
-        ciclo = [vertice_inicial]
-        vertice_atual = vertice_inicial
-        
-        while True:
-            vizinhos = list(grafo.neighbors(vertice_atual))
-            if not vizinhos:
-                break
-                
-            proximo = vizinhos[0]
-            ciclo.append(proximo)
-            grafo.remove_edge(vertice_atual, proximo)
-            
-            if proximo == vertice_inicial:
-                break
-                
-            vertice_atual = proximo
-            
-        return ciclo
-        
-    def calcular_distancia_total(self, caminho):
-        """Calcula a distância total percorrida no caminho."""
-        distancia_total = 0
-        for i in range(len(caminho) - 1):
-            v1 = self.vertices[caminho[i]]
-            v2 = self.vertices[caminho[i+1]]
-            distancia = ((v1[0] - v2[0])**2 + (v1[1] - v2[1])**2)**0.5
-            distancia_total += distancia
-        return distancia_total
-    
-    def to_dict(self):
-        """Converte o grafo para dicionário."""
-        # Sincronizar arestas com o grafo NetworkX para garantir consistência
-        arestas_sincronizadas = []
-        for origem, destino in self.grafo.edges():
-            arestas_sincronizadas.append((origem, destino))
-        
-        # Atualizar lista interna para manter sincronização
-        self.arestas = arestas_sincronizadas
-        
-        return {
-            "vertices": {nome: {"x": float(pos[0]), "y": float(pos[1])} 
-                       for nome, pos in self.vertices.items()},
-            "arestas": arestas_sincronizadas
-        }
-    
-    def from_dict(self, dados):
-        """Carrega o grafo de um dicionário."""
-        self.grafo = nx.MultiGraph()
-        self.vertices = {}
-        self.arestas = []
-        
-        for nome, pos in dados.get("vertices", {}).items():
-            self.adicionar_vertice(nome, pos["x"], pos["y"])
-            
-        for origem, destino in dados.get("arestas", []):
-            self.adicionar_aresta(origem, destino)
 
+# Grafos por projeto (?projeto=<id>; sem o parâmetro, o projeto padrão)
+projetos = RegistroProjetos(GrafoEuleriano)
+
+# Cache de resultados de otimização; CACHE_RESULTADOS_DIR ativa a camada em disco
+cache_resultados = CacheResultados(diretorio=os.environ.get("CACHE_RESULTADOS_DIR"))
 
-# Instância global do grafo
-grafo_atual = GrafoEuleriano()
+# Otimizações assíncronas (/api/jobs), executadas num pool de processos
+tarefas_otimizacao = GerenciadorTarefas()
+
+# Métricas exportadas em /api/metrics (formato do Prometheus)
+latencia_requisicoes = registro_metricas.histograma(
+    "corte_requisicao_duracao_segundos", "Latência das requisições por endpoint.", ("endpoint", "metodo")
+)
+total_requisicoes = registro_metricas.contador(
+    "corte_requisicoes_total", "Requisições atendidas por endpoint e status.", ("endpoint", "metodo", "status")
+)
+tamanho_grafos = registro_metricas.medidor(
+    "corte_grafos_elementos", "Total de vértices e arestas dos projetos carregados.", ("elemento",)
+)
+maior_grafo = registro_metricas.medidor(
+    "corte_maior_grafo_arestas", "Número de arestas do maior projeto carregado."
+)
+projetos_carregados = registro_metricas.medidor(
+    "corte_projetos", "Projetos carregados em memória."
+)
+consultas_cache = registro_metricas.contador(
+    "corte_cache_consultas_total", "Consultas ao cache de resultados.", ("resultado",)
+)
+taxa_acertos_cache = registro_metricas.medidor(
+    "corte_cache_taxa_acertos", "Fração das consultas ao cache de resultados que foram acertos."
+)
+bytes_cache = registro_metricas.medidor(
+    "corte_cache_bytes", "Bytes ocupados pelo cache de resultados em memória."
+)
+
+# Programas CNC das otimizações mais recentes de cada projeto:
+# projeto -> {id -> argumentos de linhas_programa (ciclo, tipos, pontos, velocidade, compactar, tolerancia)},
+# os dois do menos ao mais recente
+programas = OrderedDict()
+trava_programas = threading.Lock()
+
+
+def registrar_programa(projeto, programa):
+    """Guarda os dados de um programa do projeto para download posterior; retorna seu identificador."""
+    identificador = uuid.uuid4().hex
+    with trava_programas:
+        do_projeto = programas.setdefault(projeto, OrderedDict())
+        programas.move_to_end(projeto)
+        do_projeto[identificador] = programa
+        while len(do_projeto) > LIMITE_PROGRAMAS:
+            do_projeto.popitem(last=False)
+        while len(programas) > projetos.limite_projetos:
+            programas.popitem(last=False)
+    return identificador
+
+
+@app.before_request
+def iniciar_cronometro():
+    g.inicio_requisicao = time.perf_counter()
+
+
+@app.after_request
+def registrar_requisicao(resposta):
+    """Registra a latência (até o envio dos cabeçalhos) e o status de cada requisição."""
+    inicio = g.pop('inicio_requisicao', None)
+    if inicio is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "desconhecido"
+        latencia_requisicoes.observar(time.perf_counter() - inicio, endpoint=endpoint, metodo=request.method)
+        total_requisicoes.incrementar(endpoint=endpoint, metodo=request.method, status=resposta.status_code)
+    return resposta
 
 
 @app.route('/')
@@ -159,152 +117,487 @@ def index():
     return render_template('index.html')
 
 
+def projeto_requisicao():
+    """Identificador do projeto da requisição (parâmetro ?projeto=)."""
+    return request.args.get('projeto') or PROJETO_PADRAO
+
+
+def com_projeto(funcao):
+    """Executa o endpoint com o grafo do projeto da requisição, com a trava do projeto adquirida."""
+    @wraps(funcao)
+    def envolvida(*args, **kwargs):
+        identificador = projeto_requisicao()
+        if not ID_PROJETO.fullmatch(identificador):
+            return jsonify({"erro": "Identificador de projeto inválido!"}), 400
+        with projetos.usar(identificador) as grafo:
+            return funcao(grafo, *args, **kwargs)
+    return envolvida
+
+
+@app.route('/api/projetos', methods=['GET'])
+def listar_projetos():
+    """Lista os projetos abertos no servidor."""
+    return jsonify({"projetos": projetos.listar()})
+
+
+@app.route('/api/projetos', methods=['POST'])
+def criar_projeto():
+    """Cria um projeto vazio e retorna seu identificador."""
+    return jsonify({"sucesso": True, "projeto": projetos.criar()})
+
+
+@app.route('/api/projetos/<identificador>', methods=['DELETE'])
+def remover_projeto(identificador):
+    """Descarta um projeto e seu grafo."""
+    if not projetos.remover(identificador):
+        return jsonify({"erro": "Projeto não encontrado!"}), 404
+    with trava_programas:
+        programas.pop(identificador, None)
+    return jsonify({"sucesso": True})
+
+
+def versao_cliente(padrao=None):
+    """Versão do grafo conhecida pelo cliente (parâmetro ?since=)."""
+    return request.args.get('since', padrao, type=int)
+
+
+def resposta_alteracoes(grafo, versao, **extras):
+    """
+    Monta a resposta de uma mutação: apenas o delta desde a versão do cliente
+    ou, se ela não estiver mais no histórico, o grafo completo.
+    """
+    with medir("verificar_euleriano"):
+        status = grafo.verificar_euleriano()
+    resposta = {
+        "sucesso": True,
+        "versao": grafo.versao,
+        "status": status,
+        **extras
+    }
+    delta = grafo.alteracoes_desde(versao)
+    if delta is None:
+        with medir("to_dict"):
+            resposta["grafo"] = grafo.to_dict()
+    else:
+        resposta["delta"] = delta
+    return jsonify(resposta)
+
+
 @app.route('/api/grafo', methods=['GET'])
-def get_grafo():
-    """Retorna o estado atual do grafo."""
+@com_projeto
+def get_grafo(grafo):
+    """
+    Retorna o estado atual do grafo, ou apenas as alterações desde ?since=<versao>.
+    Com ?limite=<n>, um grafo completo com mais de n vértices não é enviado:
+    a resposta traz só o resumo (tamanho e limites) para o cliente pedir
+    regiões em /api/grafo/tile.
+    """
+    versao = versao_cliente()
+    limite = request.args.get('limite', type=int)
+    if limite is not None and len(grafo.vertices) > limite and grafo.alteracoes_desde(versao) is None:
+        return jsonify({
+            "sucesso": True,
+            "versao": grafo.versao,
+            "status": grafo.verificar_euleriano(),
+            "mosaico": True,
+            "num_vertices": len(grafo.vertices),
+            "num_arestas": len(grafo.arestas),
+            "limites": limites(grafo)
+        })
+    return resposta_alteracoes(grafo, versao)
+
+
+@app.route('/api/grafo/tile', methods=['GET'])
+@com_projeto
+def get_grafo_tile(grafo):
+    """
+    Geometria da região ?bbox=xmin,ymin,xmax,ymax para o ?zoom= do cliente
+    (pixels por unidade): exata quando cabe no limite, senão agregada.
+    """
+    try:
+        caixa = [float(valor) for valor in request.args.get('bbox', '').split(',')]
+        if len(caixa) != 4:
+            raise ValueError("bbox deve ter quatro números: xmin,ymin,xmax,ymax")
+        zoom = float(request.args.get('zoom', 1.0))
+        with medir("tile"):
+            resposta = consultar_regiao(grafo, caixa, zoom)
+    except ValueError as erro:
+        return jsonify({"erro": f"Parâmetros inválidos: {erro}"}), 400
+    return jsonify(resposta)
+
+
+@app.route('/api/importar/dxf', methods=['POST'])
+@com_projeto
+def importar_dxf(grafo):
+    """
+    Substitui o grafo pela geometria do DXF enviado no campo "arquivo", lido
+    em fluxo. ?tolerancia= e ?erro_corda= ajustam a fusão dos extremos e a
+    aproximação dos arcos por cordas.
+    """
+    arquivo = request.files.get('arquivo')
+    if arquivo is None:
+        return jsonify({"erro": "Arquivo DXF não enviado!"}), 400
+    try:
+        tolerancia = float(request.args.get('tolerancia', TOLERANCIA_FUSAO))
+        erro_corda = float(request.args.get('erro_corda', ERRO_CORDA))
+        with medir("importar_dxf"):
+            estatisticas = carregar_dxf(io.TextIOWrapper(arquivo.stream, encoding="utf-8", errors="replace"),
+                                        grafo, tolerancia, erro_corda)
+    except ValueError as erro:
+        return jsonify({"erro": f"DXF inválido: {erro}"}), 400
     return jsonify({
-        "grafo": grafo_atual.to_dict(),
-        "status": grafo_atual.verificar_euleriano()
+        "sucesso": True,
+        "versao": grafo.versao,
+        "status": grafo.verificar_euleriano(),
+        "estatisticas": estatisticas,
+        "limites": limites(grafo)
     })
 
 
 @app.route('/api/vertice', methods=['POST'])
-def adicionar_vertice():
+@com_projeto
+def adicionar_vertice(grafo):
     """Adiciona um vértice ao grafo."""
     data = request.json
-    nome = data.get('nome') or f"P{len(grafo_atual.vertices) + 1}"
-    x = float(data.get('x'))
-    y = float(data.get('y'))
+    nome = data.get('nome') or f"P{len(grafo.vertices) + 1}"
+    try:
+        x = float(data.get('x'))
+        y = float(data.get('y'))
+    except (TypeError, ValueError):
+        return jsonify({"erro": "Coordenadas inválidas!"}), 400
+    if not (math.isfinite(x) and math.isfinite(y)):
+        return jsonify({"erro": "Coordenadas devem ser números finitos!"}), 400
     
-    if nome in grafo_atual.vertices:
+    if nome in grafo.vertices:
         return jsonify({"erro": f"Ponto '{nome}' já existe!"}), 400
         
-    grafo_atual.adicionar_vertice(nome, x, y)
-    return jsonify({
-        "sucesso": True,
-        "grafo": grafo_atual.to_dict(),
-        "status": grafo_atual.verificar_euleriano()
-    })
+    versao = versao_cliente(grafo.versao)
+    grafo.adicionar_vertice(nome, x, y)
+    return resposta_alteracoes(grafo, versao)
 
 
 @app.route('/api/vertice/<nome>', methods=['DELETE'])
-def remover_vertice(nome):
+@com_projeto
+def remover_vertice(grafo, nome):
     """Remove um vértice do grafo."""
-    if nome not in grafo_atual.vertices:
+    if nome not in grafo.vertices:
         return jsonify({"erro": f"Ponto '{nome}' não encontrado!"}), 404
         
-    grafo_atual.remover_vertice(nome)
-    return jsonify({
-        "sucesso": True,
-        "grafo": grafo_atual.to_dict(),
-        "status": grafo_atual.verificar_euleriano()
-    })
+    versao = versao_cliente(grafo.versao)
+    grafo.remover_vertice(nome)
+    return resposta_alteracoes(grafo, versao)
 
 
 @app.route('/api/aresta', methods=['POST'])
-def adicionar_aresta():
+@com_projeto
+def adicionar_aresta(grafo):
     """Adiciona uma aresta ao grafo."""
     data = request.json
     origem = data.get('origem')
     destino = data.get('destino')
     
-    if origem not in grafo_atual.vertices or destino not in grafo_atual.vertices:
+    if origem not in grafo.vertices or destino not in grafo.vertices:
         return jsonify({"erro": "Pontos não encontrados!"}), 400
     
     # Verificar se a conexão já existe (evitar duplicatas desnecessárias)
     # Mas permitir múltiplas arestas entre os mesmos vértices se necessário
-    grafo_atual.adicionar_aresta(origem, destino)
+    versao = versao_cliente(grafo.versao)
+    grafo.adicionar_aresta(origem, destino)
     
-    return jsonify({
-        "sucesso": True,
-        "grafo": grafo_atual.to_dict(),
-        "status": grafo_atual.verificar_euleriano()
-    })
+    return resposta_alteracoes(grafo, versao)
 
 
 @app.route('/api/aresta', methods=['DELETE'])
-def remover_aresta():
+@com_projeto
+def remover_aresta(grafo):
     """Remove uma aresta do grafo."""
     data = request.json
     origem = data.get('origem')
     destino = data.get('destino')
     
-    grafo_atual.remover_aresta(origem, destino)
-    return jsonify({
-        "sucesso": True,
-        "grafo": grafo_atual.to_dict(),
-        "status": grafo_atual.verificar_euleriano()
-    })
+    versao = versao_cliente(grafo.versao)
+    grafo.remover_aresta(origem, destino)
+    return resposta_alteracoes(grafo, versao)
 
 
-@app.route('/api/otimizar', methods=['POST'])
-def otimizar():
-    """Otimiza o caminho usando ciclo euleriano."""
+@app.route('/api/batch', methods=['POST'])
+@com_projeto
+def batch(grafo):
+    """
+    Aplica várias operações (adicionar/remover/mover ponto, adicionar/remover
+    trajetória, limpar) em uma única requisição, de forma atômica.
+    """
     data = request.json
-    velocidade = float(data.get('velocidade', 100.0))
-    tempo_setup = float(data.get('tempo_setup', 0.5))
-    
-    euleriano, mensagem = grafo_atual.verificar_euleriano()
-    
-    if not euleriano:
-        return jsonify({
-            "erro": mensagem,
-            "status": grafo_atual.verificar_euleriano()
-        }), 400
-        
-    ciclo = grafo_atual.encontrar_ciclo_euleriano()
+    operacoes = data.get('operacoes', [])
     
-    if not ciclo:
-        return jsonify({"erro": "Nenhum ciclo encontrado"}), 400
+    versao = versao_cliente(grafo.versao)
+    try:
+        grafo.aplicar_operacoes(operacoes)
+    except ValueError as erro:
+        return jsonify({"erro": str(erro)}), 400
         
-    distancia = grafo_atual.calcular_distancia_total(ciclo)
-    tempo_corte = (distancia / velocidade) if velocidade > 0 else 0
-    tempo_total = tempo_corte + tempo_setup
-    
-    # Gerar programa CNC
-    programa_cnc = []
-    programa_cnc.append(f"G00 X{grafo_atual.vertices[ciclo[0]][0]:.2f} Y{grafo_atual.vertices[ciclo[0]][1]:.2f}  ; Posicionamento inicial")
-    programa_cnc.append(f"G01 F{velocidade:.1f}  ; Velocidade de corte")
-    programa_cnc.append("")
-    
-    for i, ponto in enumerate(ciclo[1:], 1):
-        x, y = grafo_atual.vertices[ponto]
-        programa_cnc.append(f"N{i:03d} G01 X{x:.2f} Y{y:.2f}  ; Corte até ponto {ponto}")
+    return resposta_alteracoes(grafo, versao)
+
+
+@app.route('/api/soldar', methods=['POST'])
+@com_projeto
+def soldar_vertices(grafo):
+    """
+    Funde os pontos a menos de "tolerancia" (mm) um do outro e remove as
+    trajetórias de comprimento nulo; com "dividir_juncoes", também divide as
+    trajetórias nos pontos que as tocam (junções em T). Usado antes da otimização.
+    """
+    data = request.json or {}
+    versao = versao_cliente(grafo.versao)
+    try:
+        tolerancia = float(data.get('tolerancia', TOLERANCIA_SOLDAGEM))
+        with medir("soldagem"):
+            estatisticas = soldar(grafo, tolerancia, bool(data.get('dividir_juncoes', False)))
+    except ValueError as erro:
+        return jsonify({"erro": f"Soldagem inválida: {erro}"}), 400
+    return resposta_alteracoes(grafo, versao, soldagem=estatisticas)
+
+
+def parametros_otimizacao(data):
+    """Parâmetros da otimização a partir do JSON da requisição."""
+    velocidade_rapida = data.get('velocidade_rapida')
+    aceleracao = data.get('aceleracao')
+    return {
+        "velocidade": float(data.get('velocidade', 100.0)),
+        "tempo_setup": float(data.get('tempo_setup', 0.5)),
+        "estrategia": data.get('estrategia', 'euleriano'),
+        "velocidade_rapida": float(velocidade_rapida) if velocidade_rapida else None,
+        "aceleracao": float(aceleracao) if aceleracao else None,
+        "compactar": bool(data.get('compactar', False)),
+        "tolerancia": float(data.get('tolerancia', TOLERANCIA_PADRAO))
+    }
+
+
+def processos_otimizacao(data):
+    """
+    Número de processos pedido no JSON da requisição, entre 1 e o número de
+    CPUs (None: sem paralelismo). Levanta ValueError se não for um inteiro.
+    """
+    processos = data.get('processos')
+    if processos is None:
+        return None
+    if isinstance(processos, str) and re.fullmatch(r"\s*[+-]?\d+\s*", processos):
+        processos = int(processos)
+    if isinstance(processos, bool) or not isinstance(processos, int):
+        raise ValueError("processos deve ser um número inteiro")
+    return min(max(processos, 1), os.cpu_count() or 1)
+
+
+def registrar_resultado(resultado, parametros, projeto):
+    """Registra o programa CNC do resultado no projeto; retorna o identificador do programa."""
+    # O programa CNC não vai no JSON: fica registrado e é baixado em fluxo por /api/programa.nc
+    return registrar_programa(projeto, (resultado["ciclo"], resultado["tipos"], resultado["pontos"],
+                                        parametros["velocidade"], parametros["compactar"], parametros["tolerancia"]))
+
+
+def resposta_otimizacao(resultado, parametros, em_cache, projeto, identificador):
+    """Monta a resposta da otimização, cujo programa CNC já foi registrado com o identificador."""
+    ciclo, tipos, metricas = resultado["ciclo"], resultado["tipos"], resultado["metricas"]
+    tempo_total = metricas["tempo_movimento"] + parametros["tempo_setup"]
     
-    programa_cnc.append(f"\nG00 X{grafo_atual.vertices[ciclo[0]][0]:.2f} Y{grafo_atual.vertices[ciclo[0]][1]:.2f}  ; Retorno ao início")
-    programa_cnc.append("M30  ; Fim do programa")
+    resumo_programa = {
+        "id": identificador,
+        "url": f"/api/programa.nc?projeto={projeto}&id={identificador}",
+        "linhas": len(ciclo) + 5
+    }
+    if resultado["compactacao"]:
+        resumo_programa["linhas"] = resultado["compactacao"]["blocos_compactado"]
+        resumo_programa["compactacao"] = resultado["compactacao"]
     
-    return jsonify({
+    return {
         "sucesso": True,
         "ciclo": ciclo,
-        "distancia": distancia,
-        "tempo_corte": tempo_corte,
-        "tempo_setup": tempo_setup,
+        "tipos": tipos,
+        "distancia": metricas["distancia"],
+        "distancia_corte": metricas["distancia_corte"],
+        "distancia_deslocamento": metricas["distancia_deslocamento"],
+        "tempo_corte": metricas["tempo_corte"],
+        "tempo_deslocamento": metricas["tempo_deslocamento"],
+        "tempo_setup": parametros["tempo_setup"],
         "tempo_total": tempo_total,
-        "programa_cnc": "\n".join(programa_cnc),
+        "programa": resumo_programa,
+        "em_cache": em_cache,
         "estatisticas": {
             "vertices_visitados": len(ciclo),
-            "trajetorias_percorridas": len(ciclo) - 1
+            "trajetorias_percorridas": len(ciclo) - 1,
+            "deslocamentos": tipos.count(TIPO_DESLOCAMENTO)
         }
-    })
+    }
 
 
-@app.route('/api/limpar', methods=['POST'])
-def limpar():
-    """Limpa o grafo atual."""
-    global grafo_atual
-    grafo_atual = GrafoEuleriano()
+@app.route('/api/otimizar', methods=['POST'])
+@com_projeto
+def otimizar(grafo):
+    """
+    Otimiza o caminho usando ciclo euleriano ou rota do Carteiro Chinês.
+    Com ?profile=1 a resposta inclui o tempo (s) de cada fase em "perfil".
+    """
+    data = request.json or {}
+    parametros = parametros_otimizacao(data)
+    try:
+        processos = processos_otimizacao(data)
+    except ValueError as erro:
+        return jsonify({"erro": f"Parâmetros inválidos: {erro}"}), 400
+    cronometro = CronometroFases()
+    
+    # Resultados são reaproveitados para o mesmo grafo e os mesmos parâmetros
+    with cronometro.medir("cache"):
+        chave = chave_resultado(grafo.vertices, grafo.arestas, parametros)
+        resultado = cache_resultados.obter(chave)
+    em_cache = resultado is not None
+    
+    if resultado is None:
+        try:
+            resultado = otimizar_grafo(grafo, parametros, processos=processos,
+                                       progresso=cronometro)
+        except ValueError as erro:
+            return jsonify({
+                "erro": str(erro),
+                "status": grafo.verificar_euleriano()
+            }), 400
+        finally:
+            cronometro.encerrar()
+        with cronometro.medir("guardar_cache"):
+            cache_resultados.guardar(chave, resultado)
+    
+    with cronometro.medir("resposta"):
+        projeto = projeto_requisicao()
+        programa = registrar_resultado(resultado, parametros, projeto)
+        resposta = resposta_otimizacao(resultado, parametros, em_cache, projeto, programa)
+    if request.args.get('profile') == '1':
+        resposta["perfil"] = cronometro.tempos
+    return jsonify(resposta)
+
+
+@app.route('/api/jobs', methods=['POST'])
+@com_projeto
+def enviar_tarefa(grafo):
+    """
+    Enfileira a otimização do projeto num processo separado e retorna o id da
+    tarefa (202); o andamento é consultado em /api/jobs/<id>.
+    """
+    data = request.json or {}
+    parametros = parametros_otimizacao(data)
+    chave = chave_resultado(grafo.vertices, grafo.arestas, parametros)
+    resultado = cache_resultados.obter(chave)
+    
+    if resultado is not None:
+        identificador = tarefas_otimizacao.concluida(resultado, parametros, projeto_requisicao())
+    else:
+        otimizavel, mensagem = grafo.verificar_rota(parametros["estrategia"])
+        if not otimizavel:
+            return jsonify({
+                "erro": mensagem,
+                "status": grafo.verificar_euleriano()
+            }), 400
+        with medir("to_dict"):
+            dados = grafo.to_dict()
+        identificador = tarefas_otimizacao.enviar(
+            dados, parametros,
+            ao_concluir=lambda resultado: cache_resultados.guardar(chave, resultado),
+            projeto=projeto_requisicao()
+        )
+    
     return jsonify({
         "sucesso": True,
-        "grafo": grafo_atual.to_dict()
-    })
+        "tarefa": identificador,
+        "url": f"/api/jobs/{identificador}"
+    }), 202
+
+
+@app.route('/api/jobs/<identificador>', methods=['GET'])
+def consultar_tarefa(identificador):
+    """Estado da tarefa: fase, progresso (0 a 1), erro e, ao concluir, o resultado."""
+    tarefa = tarefas_otimizacao.consultar(identificador)
+    if tarefa is None:
+        return jsonify({"erro": "Tarefa não encontrada!"}), 404
+    
+    resposta = {chave: tarefa[chave] for chave in ("id", "estado", "fase", "progresso", "erro")}
+    if tarefa["estado"] == CONCLUIDA:
+        # O programa é registrado uma única vez, na primeira consulta; as seguintes reusam o id
+        programa = tarefa.get("programa")
+        if programa is None:
+            registrado = registrar_resultado(tarefa["resultado"], tarefa["parametros"], tarefa["projeto"])
+            programa = tarefas_otimizacao.anotar(identificador, "programa", registrado) or registrado
+        resposta["resultado"] = resposta_otimizacao(tarefa["resultado"], tarefa["parametros"],
+                                                    tarefa["em_cache"], tarefa["projeto"], programa)
+    return jsonify(resposta)
+
+
+@app.route('/api/jobs/<identificador>', methods=['DELETE'])
+def cancelar_tarefa(identificador):
+    """Cancela a tarefa (as em execução param na próxima atualização de progresso)."""
+    if not tarefas_otimizacao.cancelar(identificador):
+        return jsonify({"erro": "Tarefa não encontrada!"}), 404
+    return jsonify({"sucesso": True})
+
+
+@app.route('/api/programa.nc', methods=['GET'])
+def baixar_programa():
+    """
+    Envia o programa CNC de uma otimização do projeto em fluxo (transferência
+    em partes). Parâmetros: projeto, id (padrão: a otimização mais recente do
+    projeto) e limite (número máximo de linhas, para pré-visualização).
+    """
+    projeto = projeto_requisicao()
+    if not ID_PROJETO.fullmatch(projeto):
+        return jsonify({"erro": "Identificador de projeto inválido!"}), 400
+    with trava_programas:
+        do_projeto = programas.get(projeto, {})
+        identificador = request.args.get('id') or next(reversed(do_projeto), None)
+        programa = do_projeto.get(identificador)
+    if programa is None:
+        return jsonify({"erro": "Programa não encontrado. Otimize o caminho novamente."}), 404
+    limite = request.args.get('limite', type=int)
+    
+    linhas = cronometrar_gerador(linhas_programa(*programa), "gcode_envio")
+    cabecalhos = {}
+    if limite is not None:
+        linhas = islice(linhas, max(limite, 0))
+    else:
+        cabecalhos["Content-Disposition"] = f"attachment; filename=programa_{identificador}.nc"
+    
+    return Response(stream_with_context(blocos_texto(linhas)), mimetype='text/plain', headers=cabecalhos)
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metricas():
+    """Métricas de latência, fases do pipeline, tamanho dos grafos e cache, no formato do Prometheus."""
+    resumo = projetos.listar()
+    projetos_carregados.definir(len(resumo))
+    tamanho_grafos.definir(sum(p["vertices"] for p in resumo), elemento="vertices")
+    tamanho_grafos.definir(sum(p["arestas"] for p in resumo), elemento="arestas")
+    maior_grafo.definir(max((p["arestas"] for p in resumo), default=0))
+    
+    acertos, falhas = cache_resultados.acertos, cache_resultados.falhas
+    consultas_cache.definir(acertos, resultado="acerto")
+    consultas_cache.definir(falhas, resultado="falha")
+    taxa_acertos_cache.definir(acertos / (acertos + falhas) if acertos + falhas else 0.0)
+    bytes_cache.definir(cache_resultados.bytes_em_memoria)
+    
+    return Response(registro_metricas.texto(), mimetype=None, content_type=TIPO_CONTEUDO)
+
+
+@app.route('/api/limpar', methods=['POST'])
+@com_projeto
+def limpar(grafo):
+    """Limpa o grafo atual."""
+    versao = versao_cliente(grafo.versao)
+    grafo.limpar()
+    return resposta_alteracoes(grafo, versao)
 
 
 @app.route('/api/exemplo/<tipo>', methods=['POST'])
-def exemplo(tipo):
+@com_projeto
+def exemplo(grafo, tipo):
     """Carrega um exemplo pré-definido."""
-    global grafo_atual
-    grafo_atual = GrafoEuleriano()
+    versao = versao_cliente(grafo.versao)
+    grafo.limpar()
     
     import math
     
@@ -317,14 +610,14 @@ def exemplo(tipo):
         # Retângulo 50x30 centralizado
         largura = 50
         altura = 30
-        grafo_atual.adicionar_vertice("P1", centro_x - largura/2, centro_y - altura/2)
-        grafo_atual.adicionar_vertice("P2", centro_x + largura/2, centro_y - altura/2)
-        grafo_atual.adicionar_vertice("P3", centro_x + largura/2, centro_y + altura/2)
-        grafo_atual.adicionar_vertice("P4", centro_x - largura/2, centro_y + altura/2)
-        grafo_atual.adicionar_aresta("P1", "P2")
-        grafo_atual.adicionar_aresta("P2", "P3")
-        grafo_atual.adicionar_aresta("P3", "P4")
-        grafo_atual.adicionar_aresta("P4", "P1")
+        grafo.adicionar_vertice("P1", centro_x - largura/2, centro_y - altura/2)
+        grafo.adicionar_vertice("P2", centro_x + largura/2, centro_y - altura/2)
+        grafo.adicionar_vertice("P3", centro_x + largura/2, centro_y + altura/2)
+        grafo.adicionar_vertice("P4", centro_x - largura/2, centro_y + altura/2)
+        grafo.adicionar_aresta("P1", "P2")
+        grafo.adicionar_aresta("P2", "P3")
+        grafo.adicionar_aresta("P3", "P4")
+        grafo.adicionar_aresta("P4", "P1")
         
     elif tipo == 'estrela':
         raio_externo = 80
@@ -336,7 +629,7 @@ def exemplo(tipo):
             x = centro_x + raio_externo * math.cos(angulo)
             y = centro_y + raio_externo * math.sin(angulo)
             nome = f"E{i+1}"
-            grafo_atual.adicionar_vertice(nome, x, y)
+            grafo.adicionar_vertice(nome, x, y)
             pontos_externos.append(nome)
             
         pontos_internos = []
@@ -345,12 +638,12 @@ def exemplo(tipo):
             x = centro_x + raio_interno * math.cos(angulo)
             y = centro_y + raio_interno * math.sin(angulo)
             nome = f"I{i+1}"
-            grafo_atual.adicionar_vertice(nome, x, y)
+            grafo.adicionar_vertice(nome, x, y)
             pontos_internos.append(nome)
             
         for i in range(5):
-            grafo_atual.adicionar_aresta(pontos_externos[i], pontos_internos[i])
-            grafo_atual.adicionar_aresta(pontos_internos[i], pontos_externos[(i+1) % 5])
+            grafo.adicionar_aresta(pontos_externos[i], pontos_internos[i])
+            grafo.adicionar_aresta(pontos_internos[i], pontos_externos[(i+1) % 5])
             
     elif tipo == 'grade':
         # Grade 3x3 centralizada
@@ -363,24 +656,20 @@ def exemplo(tipo):
                 nome = f"P{i}{j}"
                 x = offset_x + i * espacamento
                 y = offset_y + j * espacamento
-                grafo_atual.adicionar_vertice(nome, x, y)
+                grafo.adicionar_vertice(nome, x, y)
                 
         for i in range(3):
             for j in range(3):
                 nome = f"P{i}{j}"
                 if i < 2:
-                    grafo_atual.adicionar_aresta(nome, f"P{i+1}{j}")
+                    grafo.adicionar_aresta(nome, f"P{i+1}{j}")
                 if j < 2:
-                    grafo_atual.adicionar_aresta(nome, f"P{i}{j+1}")
+                    grafo.adicionar_aresta(nome, f"P{i}{j+1}")
                     
-        grafo_atual.adicionar_aresta("P00", "P22")
-        grafo_atual.adicionar_aresta("P02", "P20")
+        grafo.adicionar_aresta("P00", "P22")
+        grafo.adicionar_aresta("P02", "P20")
     
-    return jsonify({
-        "sucesso": True,
-        "grafo": grafo_atual.to_dict(),
-        "status": grafo_atual.verificar_euleriano()
-    })
+    return resposta_alteracoes(grafo, versao)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,93 @@
+"""
+Armazenamento de arestas com operações O(1).
+
+As arestas recebem identificadores estáveis e são indexadas pelo par canônico
+(menor, maior) de extremos, de modo que inserção, remoção e consulta não
+percorrem listas. Arestas paralelas são modeladas explicitamente: cada uma tem
+seu próprio identificador e o par guarda a multiplicidade.
+"""
+
+
+def chave_aresta(u, v):
+    """Par canônico (menor, maior) de uma aresta não direcionada."""
+    return (u, v) if u <= v else (v, u)
+
+
+class ArmazemArestas:
+    """Conjunto de arestas (multigrafo não direcionado) indexado por par e por vértice."""
+
+    def __init__(self):
+        self.por_id = {}  # id -> (origem, destino), em ordem de inserção
+        self._por_par = {}  # par canônico -> {id: None}
+        self._por_vertice = {}  # vértice -> {id: None}
+        self._proximo_id = 0
+
+    def __len__(self):
+        return len(self.por_id)
+
+    def __iter__(self):
+        """Itera sobre os pares (origem, destino), um por aresta (inclusive paralelas)."""
+        return iter(self.por_id.values())
+
+    def itens(self):
+        """Itera sobre (id, origem, destino)."""
+        for identificador, (origem, destino) in self.por_id.items():
+            yield identificador, origem, destino
+
+    def adicionar(self, origem, destino):
+        """Adiciona uma aresta e retorna seu identificador."""
+        identificador = self._proximo_id
+        self._proximo_id += 1
+        self.por_id[identificador] = (origem, destino)
+        self._por_par.setdefault(chave_aresta(origem, destino), {})[identificador] = None
+        self._por_vertice.setdefault(origem, {})[identificador] = None
+        self._por_vertice.setdefault(destino, {})[identificador] = None
+        return identificador
+
+    def remover_id(self, identificador):
+        """Remove a aresta pelo identificador; retorna (origem, destino)."""
+        origem, destino = self.por_id.pop(identificador)
+        chave = chave_aresta(origem, destino)
+        ids = self._por_par[chave]
+        del ids[identificador]
+        if not ids:
+            del self._por_par[chave]
+        for vertice in ((origem,) if origem == destino else (origem, destino)):
+            incidentes = self._por_vertice[vertice]
+            incidentes.pop(identificador, None)
+            if not incidentes:
+                del self._por_vertice[vertice]
+        return origem, destino
+
+    def remover(self, origem, destino):
+        """Remove uma aresta entre origem e destino (a mais recente); retorna seu id ou None."""
+        ids = self._por_par.get(chave_aresta(origem, destino))
+        if not ids:
+            return None
+        identificador = next(reversed(ids))
+        self.remover_id(identificador)
+        return identificador
+
+    def remover_vertice(self, vertice):
+        """Remove todas as arestas incidentes ao vértice; retorna a lista de (id, origem, destino)."""
+        removidas = []
+        for identificador in list(self._por_vertice.get(vertice, ())):
+            origem, destino = self.remover_id(identificador)
+            removidas.append((identificador, origem, destino))
+        return removidas
+
+    def contem(self, origem, destino):
+        """Indica se existe ao menos uma aresta entre origem e destino."""
+        return chave_aresta(origem, destino) in self._por_par
+
+    def multiplicidade(self, origem, destino):
+        """Número de arestas paralelas entre origem e destino."""
+        return len(self._por_par.get(chave_aresta(origem, destino), ()))
+
+    def incidentes(self, vertice):
+        """Identificadores das arestas incidentes ao vértice."""
+        return list(self._por_vertice.get(vertice, ()))
+
+    def ids(self, origem, destino):
+        """Identificadores das arestas entre origem e destino, em ordem de inserção."""
+        return list(self._por_par.get(chave_aresta(origem, destino), ()))
@@ -0,0 +1,11 @@
+"""
+Medições de desempenho do sistema de corte.
+
+geradores: layouts sintéticos parametrizados (grade com diagonais, malha de
+Delaunay, chapa com várias peças e layout com muitos vértices ímpares).
+desempenho: mede cada fase do pipeline e grava/compara resultados em JSON.
+
+Uso: python -m benchmarks --help
+"""
+
+from benchmarks.geradores import GERADORES, gerar
@@ -0,0 +1,6 @@
+import sys
+
+from benchmarks.desempenho import main
+
+
+sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Medição de desempenho do pipeline de otimização sobre layouts sintéticos.
+
+Para cada gerador e tamanho (número aproximado de arestas) mede o tempo de
+carga do projeto, validação, busca da rota, cálculo das métricas,
+serialização e emissão do G-code (completo e compactado). Os resultados vão
+para um JSON que pode ser comparado com o de outro commit:
+
+    python -m benchmarks -o atual.json
+    python -m benchmarks -o atual.json --comparar base.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.geradores import GERADORES, gerar
+
+
+TAMANHOS_PADRAO = (100, 1000, 10000, 100000)
+TAMANHO_MAXIMO = 1000000
+FASES_MEDIDAS = ("carga", "validacao", "rota", "metricas", "serializacao", "gcode", "gcode_compacto")
+TOLERANCIA_REGRESSAO = 0.25  # aumento relativo de tempo considerado regressão
+MINIMO_COMPARAVEL = 0.005  # segundos; fases mais rápidas que isso são ruído
+
+
+def _classe_grafo(nome):
+    if nome == "euleriano":
+        from nucleo import GrafoEuleriano
+        return GrafoEuleriano
+    from grafo_compacto import GrafoCompacto
+    return GrafoCompacto
+
+
+def medir_projeto(dados, estrategia="carteiro", grafo="compacto", velocidade=100.0):
+    """Tempo (s) de cada fase do pipeline para um projeto; retorna (tempos, resumo do grafo)."""
+    from gcode import linhas_programa
+
+    tempos = {}
+    inicio = time.perf_counter()
+
+    def marcar(fase):
+        nonlocal inicio
+        agora = time.perf_counter()
+        tempos[fase] = agora - inicio
+        inicio = agora
+
+    g = _classe_grafo(grafo)()
+    g.from_dict(dados)
+    marcar("carga")
+    otimizavel, mensagem = g.verificar_rota(estrategia)
+    marcar("validacao")
+    if not otimizavel:
+        raise ValueError(mensagem)
+    ciclo, tipos = g.otimizar_rota(estrategia)
+    marcar("rota")
+    g.calcular_metricas(ciclo, tipos, velocidade)
+    pontos = g.pontos_caminho(ciclo)
+    if not isinstance(pontos, list):
+        pontos = pontos.tolist()
+    marcar("metricas")
+    json.dumps(g.to_dict())
+    marcar("serializacao")
+    for _ in linhas_programa(ciclo, tipos, pontos, velocidade):
+        pass
+    marcar("gcode")
+    for _ in linhas_programa(ciclo, tipos, pontos, velocidade, compactar=True):
+        pass
+    marcar("gcode_compacto")
+
+    resumo = {
+        "vertices": len(g.vertices),
+        "arestas": len(g.arestas),
+        "trechos": len(tipos)
+    }
+    return tempos, resumo
+
+
+def contar_impares(dados):
+    """Número de vértices de grau ímpar do projeto."""
+    grau = {}
+    for origem, destino in dados["arestas"]:
+        grau[origem] = grau.get(origem, 0) + 1
+        grau[destino] = grau.get(destino, 0) + 1
+    return sum(1 for g in grau.values() if g % 2)
+
+
+def executar(geradores, tamanhos, repeticoes=1, estrategia="carteiro", grafo="compacto", semente=0,
+             ao_medir=None):
+    """Mede todas as combinações; cada fase fica com o menor tempo entre as repetições."""
+    resultados = []
+    for nome in geradores:
+        # Aquecimento: importações tardias (como a do NetworkX) não entram nas medições
+        medir_projeto(gerar(nome, min(tamanhos), semente), estrategia, grafo)
+        for tamanho in tamanhos:
+            dados = gerar(nome, tamanho, semente)
+            melhores = None
+            for _ in range(repeticoes):
+                tempos, resumo = medir_projeto(dados, estrategia, grafo)
+                melhores = tempos if melhores is None else {
+                    fase: min(melhores[fase], tempos[fase]) for fase in tempos
+                }
+            resultado = {"gerador": nome, "tamanho": tamanho, **resumo,
+                         "impares": contar_impares(dados), "segundos": melhores,
+                         "total": sum(melhores.values())}
+            resultados.append(resultado)
+            if ao_medir:
+                ao_medir(resultado)
+    return resultados
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, base, tolerancia=TOLERANCIA_REGRESSAO):
+    """
+    Compara dois relatórios (dicionários do JSON) pelo par (gerador, tamanho).
+    Retorna a lista de (gerador, tamanho, fase, base, atual, razao) e as regressões.
+    """
+    anteriores = {(r["gerador"], r["tamanho"]): r for r in base["resultados"]}
+    linhas, regressoes = [], []
+    for resultado in atual["resultados"]:
+        anterior = anteriores.get((resultado["gerador"], resultado["tamanho"]))
+        if anterior is None:
+            continue
+        for fase, segundos in resultado["segundos"].items():
+            segundos_base = anterior["segundos"].get(fase)
+            if segundos_base is None:
+                continue
+            razao = segundos / segundos_base if segundos_base else float("inf")
+            linha = (resultado["gerador"], resultado["tamanho"], fase, segundos_base, segundos, razao)
+            linhas.append(linha)
+            if max(segundos, segundos_base) >= MINIMO_COMPARAVEL and razao > 1 + tolerancia:
+                regressoes.append(linha)
+    return linhas, regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medições de desempenho sobre layouts sintéticos.")
+    parser.add_argument("-g", "--geradores", nargs="+", choices=tuple(GERADORES), default=list(GERADORES))
+    parser.add_argument("-n", "--tamanhos", nargs="+", type=int, default=list(TAMANHOS_PADRAO),
+                        help="números aproximados de arestas (padrão: 10² a 10⁵)")
+    parser.add_argument("--completo", action="store_true", help=f"inclui {TAMANHO_MAXIMO} arestas")
+    parser.add_argument("-r", "--repeticoes", type=int, default=1, help="repetições (vale o menor tempo)")
+    parser.add_argument("--estrategia", choices=("euleriano", "carteiro"), default="carteiro")
+    parser.add_argument("--grafo", choices=("compacto", "euleriano"), default="compacto",
+                        help="representação do grafo: GrafoCompacto ou GrafoEuleriano")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("-o", "--saida", default=None, help="arquivo JSON dos resultados")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_REGRESSAO,
+                        help="aumento relativo tolerado antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    tamanhos = sorted(set(args.tamanhos + ([TAMANHO_MAXIMO] if args.completo else [])))
+
+    def ao_medir(resultado):
+        fases = "  ".join(f"{fase}={resultado['segundos'][fase] * 1000:.1f}" for fase in FASES_MEDIDAS)
+        print(f"{resultado['gerador']:>10} {resultado['arestas']:>8} arestas  {fases} ms", file=sys.stderr)
+
+    resultados = executar(args.geradores, tamanhos, args.repeticoes, args.estrategia, args.grafo,
+                          args.semente, ao_medir)
+    relatorio = {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {"estrategia": args.estrategia, "grafo": args.grafo, "semente": args.semente,
+                       "repeticoes": args.repeticoes},
+        "resultados": resultados
+    }
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, indent=2)
+        print(f"Resultados gravados em {args.saida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        linhas, regressoes = comparar(relatorio, base, args.tolerancia)
+        print(f"\nComparação com {args.comparar} (commit {base.get('commit')}):")
+        for gerador, tamanho, fase, segundos_base, segundos, razao in linhas:
+            marca = "  <- regressão" if (gerador, tamanho, fase, segundos_base, segundos, razao) in regressoes else ""
+            print(f"  {gerador:>10} {tamanho:>8} {fase:>15}: {segundos_base * 1000:9.1f} -> "
+                  f"{segundos * 1000:9.1f} ms ({razao:.2f}x){marca}")
+        if regressoes:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}", file=sys.stderr)
+            return 1
+    return 0
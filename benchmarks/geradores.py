@@ -0,0 +1,149 @@
+"""
+Geradores paramétricos de layouts de chapa para medições de desempenho.
+
+Cada gerador retorna um projeto no formato de GrafoEuleriano.to_dict
+({"vertices": {nome: {"x", "y"}}, "arestas": [[origem, destino], ...]}) e é
+determinístico para a mesma semente. gerar(nome, arestas) escolhe os
+parâmetros de cada gerador para chegar perto do número de arestas pedido.
+"""
+
+import math
+import random
+
+
+def _projeto(coordenadas, arestas):
+    """Monta o dicionário do projeto a partir de coordenadas [(x, y)] e pares de índices."""
+    return {
+        "vertices": {f"P{i}": {"x": x, "y": y} for i, (x, y) in enumerate(coordenadas)},
+        "arestas": [[f"P{a}", f"P{b}"] for a, b in arestas]
+    }
+
+
+def grade_diagonais(linhas, colunas, espacamento=10.0):
+    """Grade linhas x colunas com trajetórias horizontais, verticais e uma diagonal por célula."""
+    coordenadas = [(j * espacamento, i * espacamento) for i in range(linhas) for j in range(colunas)]
+    arestas = []
+    for i in range(linhas):
+        for j in range(colunas):
+            v = i * colunas + j
+            if j + 1 < colunas:
+                arestas.append((v, v + 1))
+            if i + 1 < linhas:
+                arestas.append((v, v + colunas))
+            if i + 1 < linhas and j + 1 < colunas:
+                arestas.append((v, v + colunas + 1))
+    return _projeto(coordenadas, arestas)
+
+
+def malha_delaunay(pontos, largura=1000.0, semente=0):
+    """
+    Malha triangular planar sobre pontos aleatórios. Usa a triangulação de
+    Delaunay do SciPy quando disponível; sem ele, triangula uma grade com
+    perturbação aleatória (também planar, com a mesma densidade de arestas).
+    """
+    aleatorio = random.Random(semente)
+    try:
+        import numpy as np
+        from scipy.spatial import Delaunay
+    except ImportError:
+        Delaunay = None
+
+    if Delaunay is not None:
+        coordenadas = [(aleatorio.uniform(0, largura), aleatorio.uniform(0, largura)) for _ in range(pontos)]
+        triangulos = Delaunay(np.array(coordenadas)).simplices
+        arestas = set()
+        for a, b, c in triangulos.tolist():
+            for u, v in ((a, b), (b, c), (c, a)):
+                arestas.add((min(u, v), max(u, v)))
+        return _projeto(coordenadas, sorted(arestas))
+
+    lado = max(2, math.ceil(math.sqrt(pontos)))
+    passo = largura / lado
+    coordenadas = [((j + aleatorio.uniform(-0.3, 0.3)) * passo, (i + aleatorio.uniform(-0.3, 0.3)) * passo)
+                   for i in range(lado) for j in range(lado)]
+    arestas = []
+    for i in range(lado):
+        for j in range(lado):
+            v = i * lado + j
+            if j + 1 < lado:
+                arestas.append((v, v + 1))
+            if i + 1 < lado:
+                arestas.append((v, v + lado))
+            if i + 1 < lado and j + 1 < lado:
+                if aleatorio.random() < 0.5:
+                    arestas.append((v, v + lado + 1))
+                else:
+                    arestas.append((v + 1, v + lado))
+    return _projeto(coordenadas, arestas)
+
+
+def chapa_multipecas(pecas, contornos=3, lados=32, tamanho=100.0):
+    """
+    Chapa com várias peças dispostas em grade; cada peça tem contornos
+    concêntricos (contorno externo e furos internos), cada um um ciclo separado.
+    """
+    por_linha = max(1, math.ceil(math.sqrt(pecas)))
+    coordenadas, arestas = [], []
+    for p in range(pecas):
+        cx = (p % por_linha + 0.5) * tamanho * 1.2
+        cy = (p // por_linha + 0.5) * tamanho * 1.2
+        for c in range(contornos):
+            raio = tamanho / 2 * (contornos - c) / contornos
+            inicio = len(coordenadas)
+            for k in range(lados):
+                angulo = 2 * math.pi * k / lados
+                coordenadas.append((cx + raio * math.cos(angulo), cy + raio * math.sin(angulo)))
+                arestas.append((inicio + k, inicio + (k + 1) % lados))
+    return _projeto(coordenadas, arestas)
+
+
+def layout_impares(dentes, segmentos=4, espacamento=10.0, semente=0):
+    """
+    "Pente": uma espinha com um dente em cada ponto. Os pontos internos da
+    espinha têm grau 3 e as pontas dos dentes grau 1, de modo que quase todos
+    os vértices são ímpares (caso mais caro do Carteiro Chinês).
+    """
+    aleatorio = random.Random(semente)
+    coordenadas = [(d * espacamento, 0.0) for d in range(dentes)]
+    arestas = [(d, d + 1) for d in range(dentes - 1)]
+    for d in range(dentes):
+        comprimento = aleatorio.randint(1, segmentos)
+        anterior = d
+        for s in range(1, comprimento + 1):
+            coordenadas.append((d * espacamento, s * espacamento))
+            arestas.append((anterior, len(coordenadas) - 1))
+            anterior = len(coordenadas) - 1
+    return _projeto(coordenadas, arestas)
+
+
+def _grade(arestas, semente):
+    lado = max(2, math.ceil(math.sqrt(arestas / 3)))
+    return grade_diagonais(lado, lado)
+
+
+def _delaunay(arestas, semente):
+    return malha_delaunay(max(4, arestas // 3), semente=semente)
+
+
+def _multipecas(arestas, semente):
+    return chapa_multipecas(max(1, math.ceil(arestas / 96)), contornos=3, lados=32)
+
+
+def _impares(arestas, semente):
+    # Cada dente tem em média 2,5 segmentos (segmentos=4), mais uma aresta de espinha
+    return layout_impares(max(2, math.ceil(arestas / 3.5)), segmentos=4, semente=semente)
+
+
+GERADORES = {
+    "grade": _grade,
+    "delaunay": _delaunay,
+    "multipecas": _multipecas,
+    "impares": _impares,
+}
+
+
+def gerar(nome, arestas, semente=0):
+    """Projeto do gerador nome com aproximadamente o número de arestas pedido."""
+    if nome not in GERADORES:
+        raise ValueError(f"gerador desconhecido: {nome!r} (opções: {', '.join(GERADORES)})")
+    return GERADORES[nome](arestas, semente)
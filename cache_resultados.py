@@ -0,0 +1,143 @@
+"""
+Cache de resultados de otimização endereçado por conteúdo.
+
+A chave é um hash canônico do grafo (vértices ordenados com suas coordenadas e
+o multiconjunto de arestas, independente da ordem de inserção) e dos
+parâmetros que alteram a rota. Os resultados ficam serializados em JSON em
+memória, com descarte LRU limitado pelo total de bytes, e opcionalmente numa
+camada em disco que sobrevive a reinícios do servidor. Por ser JSON, ler um
+arquivo do diretório do cache (que pode ser compartilhado) nunca executa
+código, ao contrário de pickle.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from armazem_arestas import chave_aresta
+
+
+LIMITE_MEMORIA_PADRAO = 256 * 1024 * 1024  # bytes
+# Parâmetros que só entram na resposta (tempo total), não no resultado guardado
+PARAMETROS_FORA_DA_CHAVE = frozenset({"tempo_setup"})
+
+
+def chave_resultado(vertices, arestas, parametros):
+    """
+    Hash canônico (hex SHA-256) de um grafo e dos parâmetros da otimização
+    (exceto PARAMETROS_FORA_DA_CHAVE). vertices é um mapeamento nome -> (x, y)
+    e arestas um iterável de pares (origem, destino); a ordem de ambos não
+    altera a chave.
+    """
+    h = hashlib.sha256()
+    h.update("\n".join(f"{nome}\t{x!r}\t{y!r}" for nome, (x, y) in sorted(vertices.items())).encode("utf-8"))
+    h.update(b"\0")
+    h.update("\n".join(f"{o}\t{d}" for o, d in sorted(chave_aresta(o, d) for o, d in arestas)).encode("utf-8"))
+    h.update(b"\0")
+    parametros = {nome: valor for nome, valor in parametros.items() if nome not in PARAMETROS_FORA_DA_CHAVE}
+    h.update(json.dumps(parametros, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """Cache LRU limitado por bytes, com camada opcional em disco."""
+
+    def __init__(self, limite_bytes=LIMITE_MEMORIA_PADRAO, diretorio=None, limite_disco_bytes=None):
+        self.limite_bytes = limite_bytes
+        self.diretorio = diretorio
+        self.limite_disco_bytes = limite_disco_bytes
+        self.bytes_em_memoria = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas = OrderedDict()  # chave -> resultado serializado
+        self._trava = threading.Lock()
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _arquivo(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def _guardar_em_memoria(self, chave, dados):
+        antigo = self._entradas.pop(chave, None)
+        if antigo is not None:
+            self.bytes_em_memoria -= len(antigo)
+        if len(dados) > self.limite_bytes:
+            return
+        self._entradas[chave] = dados
+        self.bytes_em_memoria += len(dados)
+        while self.bytes_em_memoria > self.limite_bytes:
+            _, removido = self._entradas.popitem(last=False)
+            self.bytes_em_memoria -= len(removido)
+
+    def obter(self, chave):
+        """Retorna o resultado guardado para a chave ou None."""
+        with self._trava:
+            dados = self._entradas.get(chave)
+            if dados is not None:
+                self._entradas.move_to_end(chave)
+        resultado = None
+        if dados is not None:
+            resultado = json.loads(dados)
+        elif self.diretorio:
+            try:
+                with open(self._arquivo(chave), "rb") as f:
+                    dados = f.read()
+                os.utime(self._arquivo(chave))  # mantém a ordem LRU do disco
+                resultado = json.loads(dados)
+            except (OSError, ValueError):
+                dados = None  # ausente, corrompido ou de outro formato
+            if dados is not None:
+                with self._trava:
+                    self._guardar_em_memoria(chave, dados)
+        with self._trava:
+            if dados is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+        return resultado
+
+    def guardar(self, chave, resultado):
+        """Guarda o resultado (qualquer objeto serializável em JSON; tuplas voltam como listas)."""
+        dados = json.dumps(resultado, separators=(",", ":")).encode("utf-8")
+        with self._trava:
+            self._guardar_em_memoria(chave, dados)
+        if self.diretorio:
+            self._gravar_em_disco(chave, dados)
+
+    def _gravar_em_disco(self, chave, dados):
+        # Grava em arquivo temporário e renomeia, para que leitores nunca vejam arquivos parciais.
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        with os.fdopen(descritor, "wb") as f:
+            f.write(dados)
+        os.replace(temporario, self._arquivo(chave))
+        if self.limite_disco_bytes is not None:
+            self._limitar_disco()
+
+    def _limitar_disco(self):
+        """Remove os arquivos usados há mais tempo até o diretório caber no limite."""
+        arquivos = []
+        for entrada in os.scandir(self.diretorio):
+            if entrada.name.endswith(".json"):
+                estado = entrada.stat()
+                arquivos.append((estado.st_mtime, estado.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= self.limite_disco_bytes:
+                break
+            try:
+                os.remove(caminho)
+                total -= tamanho
+            except OSError:
+                pass
+
+    def limpar(self):
+        """Esvazia a camada em memória (a camada em disco é mantida)."""
+        with self._trava:
+            self._entradas.clear()
+            self.bytes_em_memoria = 0
@@ -0,0 +1,148 @@
+"""
+Modo Carteiro Chinês (inspeção de rotas) para peças não eulerianas.
+
+Os vértices de grau ímpar são emparelhados por distância euclidiana e cada par
+ganha uma aresta de ligação, tornando todos os graus pares. A ligação é uma
+repetição da trajetória de corte quando os dois pontos já são vizinhos, ou um
+deslocamento rápido (G00, ferramenta desligada) caso contrário.
+
+Para poucos vértices ímpares o emparelhamento de peso mínimo é exato (blossom,
+via NetworkX); acima de LIMITE_EMPARELHAMENTO_EXATO usa-se um emparelhamento
+guloso sobre os vizinhos mais próximos encontrados por uma árvore KD.
+"""
+
+import heapq
+
+
+LIMITE_EMPARELHAMENTO_EXATO = 60
+VIZINHOS_CANDIDATOS = 8
+
+TIPO_CORTE = "corte"
+TIPO_REPETICAO = "repeticao"
+TIPO_DESLOCAMENTO = "deslocamento"
+
+
+class ArvoreKD:
+    """Árvore KD estática em 2D para consultas de vizinhos mais próximos."""
+
+    def __init__(self, pontos):
+        self.pontos = pontos
+        self.raiz = self._construir(list(range(len(pontos))), 0)
+
+    def _construir(self, indices, profundidade):
+        if not indices:
+            return None
+        eixo = profundidade % 2
+        indices.sort(key=lambda i: self.pontos[i][eixo])
+        meio = len(indices) // 2
+        return (
+            indices[meio],
+            eixo,
+            self._construir(indices[:meio], profundidade + 1),
+            self._construir(indices[meio + 1:], profundidade + 1),
+        )
+
+    def vizinhos(self, ponto, k):
+        """Retorna até k pares (distância², índice) mais próximos de ponto, em ordem crescente."""
+        melhores = []
+        px, py = ponto
+
+        def visitar(no):
+            if no is None:
+                return
+            indice, eixo, esquerda, direita = no
+            qx, qy = self.pontos[indice]
+            d2 = (qx - px) ** 2 + (qy - py) ** 2
+            if len(melhores) < k:
+                heapq.heappush(melhores, (-d2, indice))
+            elif d2 < -melhores[0][0]:
+                heapq.heapreplace(melhores, (-d2, indice))
+
+            diferenca = ponto[eixo] - (qx, qy)[eixo]
+            perto, longe = (esquerda, direita) if diferenca < 0 else (direita, esquerda)
+            visitar(perto)
+            if len(melhores) < k or diferenca * diferenca < -melhores[0][0]:
+                visitar(longe)
+
+        visitar(self.raiz)
+        return sorted((-d2, indice) for d2, indice in melhores)
+
+
+def emparelhamento_exato(pontos):
+    """Emparelhamento perfeito de peso mínimo (blossom). Custo O(n³)."""
+    import networkx as nx  # importado só aqui: é o módulo mais lento de carregar
+
+    completo = nx.Graph()
+    for a in range(len(pontos)):
+        ax, ay = pontos[a]
+        for b in range(a + 1, len(pontos)):
+            bx, by = pontos[b]
+            completo.add_edge(a, b, weight=((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5)
+    return [tuple(sorted(par)) for par in nx.min_weight_matching(completo)]
+
+
+def emparelhamento_guloso(pontos, vizinhos=VIZINHOS_CANDIDATOS):
+    """
+    Emparelhamento aproximado: ordena os pares candidatos (k vizinhos mais
+    próximos de cada ponto) pela distância e aceita-os enquanto ambos estiverem
+    livres. Pontos que sobram são reemparelhados em nova rodada.
+    """
+    livres = list(range(len(pontos)))
+    pares = []
+
+    while livres:
+        subconjunto = [pontos[i] for i in livres]
+        arvore = ArvoreKD(subconjunto)
+        k = min(vizinhos + 1, len(livres))
+
+        candidatos = []
+        for a, ponto in enumerate(subconjunto):
+            for d2, b in arvore.vizinhos(ponto, k):
+                if a != b:
+                    candidatos.append((d2, min(a, b), max(a, b)))
+        candidatos.sort()
+
+        usado = bytearray(len(subconjunto))
+        for _, a, b in candidatos:
+            if not usado[a] and not usado[b]:
+                usado[a] = usado[b] = 1
+                pares.append((livres[a], livres[b]))
+
+        livres = [livres[a] for a in range(len(subconjunto)) if not usado[a]]
+
+    return pares
+
+
+def emparelhar_vertices(pontos, limite_exato=LIMITE_EMPARELHAMENTO_EXATO):
+    """Emparelha uma lista (de tamanho par) de pontos (x, y); retorna pares de índices."""
+    if len(pontos) <= limite_exato:
+        return emparelhamento_exato(pontos)
+    return emparelhamento_guloso(pontos)
+
+
+def ligacoes_carteiro(coordenadas, origens, destinos):
+    """
+    Calcula as arestas de ligação que tornam pares todos os graus do multigrafo
+    em que coordenadas[v] é o ponto (x, y) do vértice v e a aresta e liga
+    origens[e] a destinos[e].
+
+    Retorna uma lista de (origem, destino, tipo), em que tipo é TIPO_REPETICAO
+    se já existe trajetória entre os dois pontos e TIPO_DESLOCAMENTO se não.
+    """
+    grau = [0] * len(coordenadas)
+    adjacentes = set()
+    for u, v in zip(origens, destinos):
+        grau[u] += 1
+        grau[v] += 1
+        adjacentes.add((u, v) if u <= v else (v, u))
+
+    impares = [v for v in range(len(coordenadas)) if grau[v] % 2 != 0]
+    pares = emparelhar_vertices([coordenadas[v] for v in impares])
+
+    ligacoes = []
+    for a, b in pares:
+        origem, destino = impares[a], impares[b]
+        chave = (origem, destino) if origem <= destino else (destino, origem)
+        tipo = TIPO_REPETICAO if chave in adjacentes else TIPO_DESLOCAMENTO
+        ligacoes.append((origem, destino, tipo))
+    return ligacoes
@@ -8,135 +8,16 @@ Isso é ideal para máquinas de corte contínuo (CNC, laser, usinagem) pois mini
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import networkx as nx
 from collections import defaultdict
 import json
 
-
-class GrafoEuleriano:
-    """Classe para representar e manipular grafos e encontrar ciclos eulerianos."""
-    
-    def __init__(self):
-        self.grafo = nx.MultiGraph()
-        self.vertices = {}
-        self.arestas = []
-        
-    def adicionar_vertice(self, nome, x, y):
-        """Adiciona um vértice ao grafo."""
-        self.grafo.add_node(nome, pos=(x, y))
-        self.vertices[nome] = (x, y)
-        
-    def adicionar_aresta(self, origem, destino, peso=1):
-        """Adiciona uma aresta ao grafo."""
-        self.grafo.add_edge(origem, destino, weight=peso)
-        self.arestas.append((origem, destino))
-        
-    def remover_vertice(self, nome):
-        """Remove um vértice do grafo."""
-        if nome in self.grafo:
-            self.grafo.remove_node(nome)
-            if nome in self.vertices:
-                del self.vertices[nome]
-            self.arestas = [(o, d) for o, d in self.arestas if o != nome and d != nome]
-            
-    def remover_aresta(self, origem, destino):
-        """Remove uma aresta do grafo."""
-        if self.grafo.has_edge(origem, destino):
-            self.grafo.remove_edge(origem, destino)
-            if (origem, destino) in self.arestas:
-                self.arestas.remove((origem, destino))
-            elif (destino, origem) in self.arestas:
-                self.arestas.remove((destino, origem))
-                
-    def verificar_euleriano(self):
-        """
-        Verifica se o grafo possui um ciclo euleriano.
-        Um grafo possui ciclo euleriano se e somente se:
-        1. O grafo é conexo
-        2. Todos os vértices têm grau par
-        """
-        if len(self.grafo.nodes()) == 0:
-            return False, "Grafo vazio"
-            
-        if not nx.is_connected(self.grafo.to_undirected()):
-            return False, "Grafo não é conexo"
-            
-        graus_impares = [v for v in self.grafo.nodes() if self.grafo.degree(v) % 2 != 0]
-        if len(graus_impares) > 0:
-            return False, f"Vértices com grau ímpar: {graus_impares}"
-            
-        return True, "Grafo é euleriano"
-        
-    def encontrar_ciclo_euleriano(self):
-        """
-        Encontra um ciclo euleriano usando o algoritmo de Hierholzer.
-        Retorna uma lista de vértices representando o ciclo.
-        """
-        if len(self.grafo.edges()) == 0:
-            return []
-            
-        # Cria uma cópia do grafo para não modificar o original
-        grafo_temp = self.grafo.copy()
-        
-        # Escolhe um vértice inicial
-        vertice_atual = list(grafo_temp.nodes())[0]
-        ciclo = [vertice_atual]
-        
-        # Enquanto houver arestas não visitadas
-        while grafo_temp.number_of_edges() > 0:
-            # Encontra um ciclo a partir do vértice atual
-            ciclo_parcial = self._encontrar_ciclo_parcial(grafo_temp, vertice_atual)
-            
-            # Insere o ciclo parcial no ciclo principal
-            indice = ciclo.index(vertice_atual)
-            ciclo = ciclo[:indice] + ciclo_parcial + ciclo[indice+1:]
-            
-            # Encontra o próximo vértice com arestas não visitadas
-            vertice_atual = None
-            for v in ciclo:
-                if grafo_temp.degree(v) > 0:
-                    vertice_atual = v
-                    break
-                    
-            if vertice_atual is None:
-                break
-                
-        return ciclo
-        
-    def _encontrar_ciclo_parcial(self, grafo, vertice_inicial):
-        """Encontra um ciclo parcial a partir de um vértice."""
-        ciclo = [vertice_inicial]
-        vertice_atual = vertice_inicial
-        
-        while True:
-            vizinhos = list(grafo.neighbors(vertice_atual))
-            if not vizinhos:
-                break
-                
-            proximo = vizinhos[0]
-            ciclo.append(proximo)
-            
-            # Remove a aresta
-            grafo.remove_edge(vertice_atual, proximo)
-            
-            if proximo == vertice_inicial:
-                break
-                
-            vertice_atual = proximo
-            
-        return ciclo
-        
-    def calcular_distancia_total(self, caminho):
-        """Calcula a distância total percorrida no caminho."""
-        distancia_total = 0
-        for i in range(len(caminho) - 1):
-            v1 = self.vertices[caminho[i]]
-            v2 = self.vertices[caminho[i+1]]
-            distancia = ((v1[0] - v2[0])**2 + (v1[1] - v2[1])**2)**0.5
-            distancia_total += distancia
-        return distancia_total
+from nucleo import GrafoEuleriano
+from carteiro_chines import TIPO_DESLOCAMENTO
+from gcode import linhas_gcode, linhas_programa
+from compactacao_gcode import comparar_programas
+from projeto_binario import EXTENSAO as EXTENSAO_BINARIA, ProjetoBinario, abrir_projeto
+from importacao_dxf import carregar_dxf, resumo
+from soldagem import TOLERANCIA_SOLDAGEM, resumo as resumo_soldagem, soldar
 
 
 class InterfaceCorteEuleriano:
@@ -153,6 +34,7 @@ class InterfaceCorteEuleriano:
         
         self.grafo = GrafoEuleriano()
         self.ciclo_euleriano = []
+        self.tipos_trechos = []  # "corte", "repeticao" ou "deslocamento" para cada trecho do ciclo
         self.modo_edicao = "ponto_corte"  # "ponto_corte" ou "trajetoria"
         self.ponto_selecionado = None
         self.velocidade_corte = 100.0  # mm/min
@@ -272,6 +154,39 @@ class InterfaceCorteEuleriano:
         self.entry_setup.grid(row=1, column=1, padx=5, pady=2, sticky=(tk.W, tk.E))
         self.entry_setup.bind('<Return>', lambda e: self.atualizar_setup())
         
+        self.carteiro_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame_parametros,
+            text="Permitir deslocamentos (Carteiro Chinês)",
+            variable=self.carteiro_var
+        ).grid(row=2, column=0, columnspan=2, sticky=tk.W, padx=2, pady=2)
+        
+        self.compactar_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame_parametros,
+            text="Compactar programa (arcos G02/G03, sem modais repetidos)",
+            variable=self.compactar_var
+        ).grid(row=3, column=0, columnspan=2, sticky=tk.W, padx=2, pady=2)
+        
+        self.soldar_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame_parametros,
+            text="Soldar pontos próximos antes de otimizar",
+            variable=self.soldar_var
+        ).grid(row=4, column=0, columnspan=2, sticky=tk.W, padx=2, pady=2)
+        
+        ttk.Label(frame_parametros, text="Tolerância (mm):").grid(row=5, column=0, sticky=tk.W, padx=2, pady=2)
+        self.entry_soldagem = ttk.Entry(frame_parametros, width=12)
+        self.entry_soldagem.insert(0, str(TOLERANCIA_SOLDAGEM))
+        self.entry_soldagem.grid(row=5, column=1, padx=5, pady=2, sticky=(tk.W, tk.E))
+        
+        self.juncoes_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            frame_parametros,
+            text="Dividir trajetórias em junções T",
+            variable=self.juncoes_var
+        ).grid(row=6, column=0, columnspan=2, sticky=tk.W, padx=2, pady=2)
+        
         # Botões de ação principais
         frame_acoes = ttk.LabelFrame(painel_controles, text="🎯 Operações da Máquina", padding="8")
         frame_acoes.grid(row=4, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -338,6 +253,12 @@ class InterfaceCorteEuleriano:
             command=self.carregar_grafo
         ).grid(row=1, column=0, sticky=(tk.W, tk.E), pady=2)
         
+        ttk.Button(
+            frame_arquivo, 
+            text="📐 Importar DXF", 
+            command=self.importar_dxf
+        ).grid(row=2, column=0, sticky=(tk.W, tk.E), pady=2)
+        
         # Informações do projeto
         frame_info = ttk.LabelFrame(painel_controles, text="📊 Status do Projeto", padding="8")
         frame_info.grid(row=6, column=0, sticky=(tk.W, tk.E, tk.N), pady=(0, 10))
@@ -385,7 +306,11 @@ class InterfaceCorteEuleriano:
         frame_visualizacao.columnconfigure(0, weight=1)
         frame_visualizacao.rowconfigure(0, weight=1)
         
-        # Criar figura matplotlib com estilo melhorado
+        # Criar figura matplotlib com estilo melhorado (importado só ao abrir a janela)
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from renderizador_mesa import RenderizadorMesa
+        
         try:
             plt.style.use('seaborn-v0_8-darkgrid')
         except:
@@ -397,6 +322,7 @@ class InterfaceCorteEuleriano:
         self.fig.patch.set_facecolor('white')
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame_visualizacao)
         self.canvas.get_tk_widget().grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.renderizador = RenderizadorMesa(self.ax, self.canvas)
         
         # Conectar eventos do mouse
         self.canvas.mpl_connect('button_press_event', self.on_click)
@@ -509,32 +435,19 @@ class InterfaceCorteEuleriano:
                     self.atualizar_instrucoes()
                     
     def encontrar_ponto_proximo(self, x, y, limite=0.2):
-        """Encontra o ponto de corte mais próximo de uma coordenada."""
-        menor_distancia = float('inf')
-        ponto_proximo = None
-        
-        for nome, (vx, vy) in self.grafo.vertices.items():
-            distancia = ((x - vx)**2 + (y - vy)**2)**0.5
-            if distancia < menor_distancia and distancia < limite:
-                menor_distancia = distancia
-                ponto_proximo = nome
-                
-        return ponto_proximo
+        """Encontra o ponto de corte mais próximo de uma coordenada (via índice espacial do grafo)."""
+        return self.grafo.ponto_proximo(x, y, limite)
     
     def on_hover(self, event):
         """Manipula movimento do mouse sobre a mesa de trabalho."""
         if event.inaxes != self.ax:
             return
             
+        ponto_proximo = None
         if self.modo_edicao == "trajetoria" and len(self.grafo.vertices) > 0:
-            x, y = event.xdata, event.ydata
-            ponto_proximo = self.encontrar_ponto_proximo(x, y, limite=0.3)
-            if ponto_proximo:
-                self.ax.set_title(f'Mesa de Trabalho - Próximo ao ponto: {ponto_proximo}', 
-                                 color='blue', fontweight='bold')
-            else:
-                self.ax.set_title('Mesa de Trabalho - Visualização da Peça', color='black', fontweight='normal')
-            self.canvas.draw_idle()
+            ponto_proximo = self.encontrar_ponto_proximo(event.xdata, event.ydata, limite=0.3)
+        # Destaque por blitting, sem redesenhar a figura
+        self.renderizador.destacar_proximo(ponto_proximo)
         
     def adicionar_ponto_corte_manual(self):
         """Adiciona um ponto de corte usando os campos de entrada."""
@@ -581,15 +494,32 @@ class InterfaceCorteEuleriano:
             messagebox.showinfo("Atenção", "Defina pelo menos um ponto de corte primeiro!")
             return
             
-        euleriano, mensagem = self.grafo.verificar_euleriano()
+        soldagem = None
+        if self.soldar_var.get():
+            try:
+                soldagem = soldar(self.grafo, float(self.entry_soldagem.get()), self.juncoes_var.get())
+            except ValueError as e:
+                messagebox.showerror("Erro", f"Tolerância de soldagem inválida: {e}")
+                return
+            if soldagem["operacoes"]:
+                # O caminho anterior pode passar por pontos que a soldagem removeu
+                self.ciclo_euleriano = []
+                self.tipos_trechos = []
+                if self.ponto_selecionado not in self.grafo.vertices:
+                    self.ponto_selecionado = None
+                self.atualizar_visualizacao()
+            
+        estrategia = "carteiro" if self.carteiro_var.get() else "euleriano"
+        euleriano, mensagem = self.grafo.verificar_rota(estrategia)
         
         if not euleriano:
             messagebox.showwarning("⚠️ Trajetória não Otimizável", 
                                  f"A configuração atual não permite corte contínuo!\n\n{mensagem}\n\n"
                                  "CONDIÇÕES PARA CORTE CONTÍNUO:\n"
-                                 "• Todos os pontos devem estar conectados\n"
-                                 "• Cada ponto deve ter número par de trajetórias\n\n"
-                                 "Dica: Adicione trajetórias para tornar todos os pontos pares.")
+                                 "• Cada ponto deve ter número par de trajetórias\n"
+                                 "• Peças separadas são ligadas por deslocamentos rápidos\n\n"
+                                 "Dica: Adicione trajetórias para tornar todos os pontos pares\n"
+                                 "ou marque 'Permitir deslocamentos (Carteiro Chinês)'.")
             self.text_resultados.config(state=tk.NORMAL)
             self.text_resultados.delete(1.0, tk.END)
             self.text_resultados.insert(tk.END, f"╔═══════════════════════════════════════════════════════════╗\n")
@@ -599,7 +529,7 @@ class InterfaceCorteEuleriano:
             self.text_resultados.config(state=tk.DISABLED)
             return
             
-        self.ciclo_euleriano = self.grafo.encontrar_ciclo_euleriano()
+        self.ciclo_euleriano, self.tipos_trechos = self.grafo.otimizar_rota(estrategia)
         
         if not self.ciclo_euleriano:
             self.text_resultados.config(state=tk.NORMAL)
@@ -609,8 +539,10 @@ class InterfaceCorteEuleriano:
             return
             
         # Calcular distância total e tempo
-        distancia_total = self.grafo.calcular_distancia_total(self.ciclo_euleriano)
-        tempo_corte = (distancia_total / self.velocidade_corte) if self.velocidade_corte > 0 else 0
+        metricas = self.grafo.calcular_metricas(self.ciclo_euleriano, self.tipos_trechos,
+                                                self.velocidade_corte)
+        distancia_total = metricas["distancia"]
+        tempo_corte = metricas["tempo_movimento"]
         tempo_total = tempo_corte + self.tempo_setup
         
         # Gerar programa CNC formatado
@@ -622,22 +554,26 @@ class InterfaceCorteEuleriano:
         resultado += "╚═══════════════════════════════════════════════════════════╝\n\n"
         resultado += "PROGRAMA CNC:\n"
         resultado += "─────────────────────────────────────────────────────────────\n"
-        resultado += f"G00 X{self.grafo.vertices[self.ciclo_euleriano[0]][0]:.2f} Y{self.grafo.vertices[self.ciclo_euleriano[0]][1]:.2f}  ; Posicionamento inicial\n"
-        resultado += f"G01 F{self.velocidade_corte:.1f}  ; Velocidade de corte\n\n"
-        
-        for i, ponto in enumerate(self.ciclo_euleriano[1:], 1):
-            x, y = self.grafo.vertices[ponto]
-            resultado += f"N{i:03d} G01 X{x:.2f} Y{y:.2f}  ; Corte até ponto {ponto}\n"
-        
-        resultado += f"\nG00 X{self.grafo.vertices[self.ciclo_euleriano[0]][0]:.2f} Y{self.grafo.vertices[self.ciclo_euleriano[0]][1]:.2f}  ; Retorno ao início\n"
-        resultado += "M30  ; Fim do programa\n"
+        pontos = self.grafo.pontos_caminho(self.ciclo_euleriano)
+        programa = (self.ciclo_euleriano, self.tipos_trechos, pontos, self.velocidade_corte)
+        resultado += "\n".join(linhas_programa(*programa, compactar=self.compactar_var.get())) + "\n"
         resultado += "─────────────────────────────────────────────────────────────\n\n"
         resultado += "ESTATÍSTICAS DE PRODUÇÃO:\n"
         resultado += f"  • Distância total percorrida: {distancia_total:.2f} mm\n"
+        resultado += f"  • Distância em deslocamentos: {metricas['distancia_deslocamento']:.2f} mm\n"
         resultado += f"  • Tempo de corte: {tempo_corte:.2f} min\n"
         resultado += f"  • Tempo de setup: {self.tempo_setup:.2f} min\n"
         resultado += f"  • Tempo total estimado: {tempo_total:.2f} min\n"
-        resultado += f"  • Trajetórias percorridas: {len(self.ciclo_euleriano) - 1}\n\n"
+        resultado += f"  • Trajetórias percorridas: {len(self.ciclo_euleriano) - 1}\n"
+        resultado += f"  • Deslocamentos rápidos: {self.tipos_trechos.count(TIPO_DESLOCAMENTO)}\n"
+        if soldagem is not None:
+            resultado += f"  • Soldagem: {resumo_soldagem(soldagem)}\n"
+        if self.compactar_var.get():
+            reducao = comparar_programas(linhas_gcode(*programa), linhas_programa(*programa, compactar=True))
+            resultado += (f"  • Programa compactado: {reducao['bytes_compactado']} bytes "
+                          f"(-{reducao['reducao_bytes']:.1%}), {reducao['blocos_compactado']} blocos "
+                          f"(-{reducao['reducao_blocos']:.1%})\n")
+        resultado += "\n"
         resultado += "💡 Este caminho visita cada trajetória exatamente uma vez,\n"
         resultado += "   minimizando o tempo de corte e movimentos desnecessários!"
         
@@ -655,117 +591,8 @@ class InterfaceCorteEuleriano:
         
     def atualizar_visualizacao(self):
         """Atualiza a visualização da mesa de trabalho."""
-        self.ax.clear()
-        
-        # Fundo da mesa (cinza claro)
-        self.ax.set_facecolor('#f0f0f0')
-        
-        if len(self.grafo.vertices) == 0:
-            self.ax.text(0.5, 0.5, 
-                        "📍 Clique na mesa para definir pontos de corte\n\n"
-                        "ou use uma peça pré-definida no painel esquerdo", 
-                        ha='center', va='center', transform=self.ax.transAxes, 
-                        fontsize=13, color='gray', style='italic',
-                        bbox=dict(boxstyle='round', facecolor='white', edgecolor='gray', alpha=0.8, linewidth=2))
-            self.ax.set_xlim(-1, 1)
-            self.ax.set_ylim(-1, 1)
-            self.canvas.draw()
-            self.atualizar_info()
-            return
-            
-        # Calcular limites da mesa
-        if len(self.grafo.vertices) > 0:
-            xs = [pos[0] for pos in self.grafo.vertices.values()]
-            ys = [pos[1] for pos in self.grafo.vertices.values()]
-            margin = max((max(xs) - min(xs)), (max(ys) - min(ys))) * 0.2 + 1
-            self.ax.set_xlim(min(xs) - margin, max(xs) + margin)
-            self.ax.set_ylim(min(ys) - margin, max(ys) + margin)
-            
-        # Desenhar trajetórias de corte definidas (cinza tracejado)
-        for origem, destino in self.grafo.arestas:
-            x1, y1 = self.grafo.vertices[origem]
-            x2, y2 = self.grafo.vertices[destino]
-            self.ax.plot([x1, x2], [y1, y2], 'gray', alpha=0.5, linewidth=2, linestyle='--', label='Trajetórias definidas')
-            
-        # Desenhar caminho otimizado da ferramenta (vermelho destacado)
-        if self.ciclo_euleriano and len(self.ciclo_euleriano) > 1:
-            for i in range(len(self.ciclo_euleriano) - 1):
-                v1 = self.ciclo_euleriano[i]
-                v2 = self.ciclo_euleriano[i + 1]
-                x1, y1 = self.grafo.vertices[v1]
-                x2, y2 = self.grafo.vertices[v2]
-                self.ax.plot([x1, x2], [y1, y2], 'r-', linewidth=4, alpha=0.9, zorder=2, label='Caminho otimizado')
-                
-                # Número da etapa do programa CNC
-                mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-                self.ax.text(mid_x, mid_y, f"N{i+1}", ha='center', va='center',
-                           fontsize=9, fontweight='bold', color='red',
-                           bbox=dict(boxstyle='round,pad=0.4', facecolor='white', 
-                                   edgecolor='red', linewidth=2, alpha=0.9), zorder=3)
-                
-            # Desenhar setas indicando direção da ferramenta
-            for i in range(len(self.ciclo_euleriano) - 1):
-                v1 = self.ciclo_euleriano[i]
-                v2 = self.ciclo_euleriano[i + 1]
-                x1, y1 = self.grafo.vertices[v1]
-                x2, y2 = self.grafo.vertices[v2]
-                dx = x2 - x1
-                dy = y2 - y1
-                comprimento = (dx**2 + dy**2)**0.5
-                if comprimento > 0.1:
-                    self.ax.arrow(x1 + dx*0.5, y1 + dy*0.5, dx*0.15, dy*0.15,
-                                head_width=0.2, head_length=0.2, fc='red', ec='red', 
-                                alpha=0.9, zorder=4)
-                    
-        # Desenhar pontos de corte
-        for nome, (x, y) in self.grafo.vertices.items():
-            # Cor diferente para ponto selecionado
-            if nome == self.ponto_selecionado:
-                cor = '#FF4444'  # Vermelho para selecionado
-                tamanho = 18
-                borda = 'darkred'
-                largura_borda = 3
-            elif nome in (self.ciclo_euleriano[0] if self.ciclo_euleriano else []):
-                cor = '#00AA00'  # Verde para início do ciclo
-                tamanho = 14
-                borda = 'darkgreen'
-                largura_borda = 2.5
-            else:
-                cor = '#0066CC'  # Azul para pontos normais
-                tamanho = 12
-                borda = 'darkblue'
-                largura_borda = 2
-                
-            # Desenhar ponto de corte
-            self.ax.plot(x, y, 'o', color=cor, markersize=tamanho, 
-                        markeredgecolor=borda, markeredgewidth=largura_borda, zorder=5)
-            # Label do ponto
-            self.ax.text(x, y + 0.25, nome, ha='center', va='bottom', 
-                        fontsize=10, fontweight='bold', color='black',
-                        bbox=dict(boxstyle='round,pad=0.4', facecolor='white', 
-                                edgecolor=borda, alpha=0.9, linewidth=1.5), zorder=6)
-            
-        # Título com informações
-        titulo = 'Mesa de Trabalho - Visualização da Peça'
-        if self.ponto_selecionado:
-            titulo += f' | Ponto selecionado: {self.ponto_selecionado}'
-        if self.ciclo_euleriano:
-            titulo += ' | Caminho otimizado ativo'
-            
-        self.ax.set_xlabel('Coordenada X (mm)', fontsize=11, fontweight='bold')
-        self.ax.set_ylabel('Coordenada Y (mm)', fontsize=11, fontweight='bold')
-        self.ax.set_title(titulo, fontsize=13, fontweight='bold', pad=15)
-        self.ax.grid(True, alpha=0.4, linestyle=':', linewidth=0.8, color='gray')
-        self.ax.set_aspect('equal', adjustable='box')
-        
-        # Legenda
-        if len(self.grafo.arestas) > 0 or self.ciclo_euleriano:
-            self.ax.plot([], [], 'b-', linewidth=2, label='Pontos de corte')
-            if self.ciclo_euleriano:
-                self.ax.plot([], [], 'r-', linewidth=4, label='Caminho otimizado')
-            self.ax.legend(loc='upper right', fontsize=9, framealpha=0.9)
-        
-        self.canvas.draw()
+        self.renderizador.atualizar(self.grafo, self.ciclo_euleriano, self.tipos_trechos,
+                                    self.ponto_selecionado)
         self.atualizar_info()
         
     def atualizar_info(self):
@@ -787,7 +614,7 @@ class InterfaceCorteEuleriano:
             if num_pontos <= 10:
                 info += f"\n\n📐 Trajetórias por ponto:"
                 for nome in sorted(self.grafo.vertices.keys()):
-                    grau = self.grafo.grafo.degree(nome)
+                    grau = self.grafo.grau(nome)
                     paridade = "✓" if grau % 2 == 0 else "✗"
                     info += f"\n   {nome}: {grau} {paridade}"
             
@@ -838,6 +665,7 @@ class InterfaceCorteEuleriano:
                              "Esta ação não pode ser desfeita."):
             self.grafo = GrafoEuleriano()
             self.ciclo_euleriano = []
+            self.tipos_trechos = []
             self.ponto_selecionado = None
             self.text_resultados.config(state=tk.NORMAL)
             self.text_resultados.delete(1.0, tk.END)
@@ -866,6 +694,7 @@ class InterfaceCorteEuleriano:
         """Cria um exemplo: placa retangular com corte no perímetro."""
         self.grafo = GrafoEuleriano()
         self.ciclo_euleriano = []
+        self.tipos_trechos = []
         self.ponto_selecionado = None
         
         # Pontos de corte formando um retângulo
@@ -888,6 +717,7 @@ class InterfaceCorteEuleriano:
         """Cria um exemplo: peça em formato de estrela."""
         self.grafo = GrafoEuleriano()
         self.ciclo_euleriano = []
+        self.tipos_trechos = []
         self.ponto_selecionado = None
         import math
         
@@ -928,6 +758,7 @@ class InterfaceCorteEuleriano:
         """Cria um exemplo: grade com padrão de furos."""
         self.grafo = GrafoEuleriano()
         self.ciclo_euleriano = []
+        self.tipos_trechos = []
         self.ponto_selecionado = None
         
         # Cria uma grade 3x3 de pontos de corte
@@ -954,51 +785,62 @@ class InterfaceCorteEuleriano:
         self.atualizar_info()
         
     def salvar_grafo(self):
-        """Salva o grafo em um arquivo JSON."""
+        """Salva o grafo em um arquivo JSON ou no formato binário compacto (.cgb)."""
         arquivo = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json"), ("Projeto binário", f"*{EXTENSAO_BINARIA}"),
+                       ("All files", "*.*")]
         )
         
         if arquivo:
-            dados = {
-                "vertices": {nome: {"x": pos[0], "y": pos[1]} 
-                           for nome, pos in self.grafo.vertices.items()},
-                "arestas": self.grafo.arestas
-            }
-            
-            with open(arquivo, 'w') as f:
-                json.dump(dados, f, indent=2)
+            if arquivo.lower().endswith(EXTENSAO_BINARIA):
+                ProjetoBinario.de_grafo(self.grafo).salvar(arquivo)
+            else:
+                with open(arquivo, 'w') as f:
+                    json.dump(self.grafo.to_dict(), f, indent=2)
                 
             messagebox.showinfo("Sucesso", f"Grafo salvo em {arquivo}")
             
     def carregar_grafo(self):
-        """Carrega um grafo de um arquivo JSON."""
+        """Carrega um grafo de um arquivo JSON ou binário (.cgb)."""
         arquivo = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("Projetos", f"*.json *{EXTENSAO_BINARIA}"), ("JSON files", "*.json"),
+                       ("Projeto binário", f"*{EXTENSAO_BINARIA}"), ("All files", "*.*")]
         )
         
         if arquivo:
             try:
-                with open(arquivo, 'r') as f:
-                    dados = json.load(f)
-                    
-                self.grafo = GrafoEuleriano()
-                
-                for nome, pos in dados["vertices"].items():
-                    self.grafo.adicionar_vertice(nome, pos["x"], pos["y"])
-                    
-                for origem, destino in dados["arestas"]:
-                    self.grafo.adicionar_aresta(origem, destino)
-                    
+                self.grafo = abrir_projeto(arquivo, GrafoEuleriano)
                 self.ciclo_euleriano = []
-                self.vertice_selecionado = None
+                self.tipos_trechos = []
+                self.ponto_selecionado = None
                 self.atualizar_visualizacao()
                 self.atualizar_instrucoes()
                 messagebox.showinfo("✅ Sucesso", f"Grafo carregado de {arquivo}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao carregar arquivo: {str(e)}")
 
+    def importar_dxf(self):
+        """Substitui a peça pela geometria de um desenho DXF."""
+        arquivo = filedialog.askopenfilename(
+            filetypes=[("Desenhos DXF", "*.dxf"), ("All files", "*.*")]
+        )
+        
+        if arquivo:
+            try:
+                grafo = GrafoEuleriano()
+                estatisticas = carregar_dxf(arquivo, grafo)
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao importar DXF: {str(e)}")
+                return
+            self.grafo = grafo
+            self.ciclo_euleriano = []
+            self.tipos_trechos = []
+            self.ponto_selecionado = None
+            self.atualizar_visualizacao()
+            self.atualizar_instrucoes()
+            messagebox.showinfo("✅ DXF importado", resumo(estatisticas))
+
 
 def main():
     """Função principal."""
@@ -0,0 +1,237 @@
+"""
+Compactação de programas CNC.
+
+Pós-processamento do caminho otimizado para controladores com buffer de
+leitura antecipada pequeno e links seriais/DNC lentos:
+
+- trechos consecutivos colineares (dentro de uma tolerância) viram um só G01;
+- sequências de trechos que aproximam um arco de circunferência viram G02/G03
+  (centro em I/J incremental), desde que todos os pontos e as flechas dos
+  trechos fiquem dentro da tolerância;
+- palavras modais repetidas (G, X, Y, F) são omitidas e os comentários e
+  números de bloco são removidos.
+
+As métricas de bytes e blocos permitem medir a redução em relação ao programa
+completo gerado por gcode.linhas_gcode.
+"""
+
+from math import asin, atan2, hypot, inf, pi, sqrt
+
+from carteiro_chines import TIPO_DESLOCAMENTO
+
+
+TOLERANCIA_PADRAO = 0.01  # mm
+RAIO_MAXIMO_ARCO = 10000.0  # mm; acima disso o trecho é tratado como reta
+
+
+def _formatar(valor):
+    """Número com duas casas, sem zeros à direita (mantém o ponto decimal)."""
+    texto = f"{valor:.2f}".rstrip("0")
+    return "0." if texto in ("-0.", "0.") else texto
+
+
+def _fim_do_trecho(tipos, inicio):
+    """Primeiro índice de ponto após a sequência de trechos com o mesmo código G de tipos[inicio]."""
+    rapido = tipos[inicio] == TIPO_DESLOCAMENTO
+    fim = inicio
+    while fim < len(tipos) and (tipos[fim] == TIPO_DESLOCAMENTO) == rapido:
+        fim += 1
+    return fim
+
+
+def _estender_reta(pontos, inicio, fim, tolerancia):
+    """
+    Maior k <= fim tal que a reta pontos[inicio] -> pontos[k] passa a no máximo
+    tolerancia de todos os pontos intermediários, sempre avançando.
+    Usa o cone de direções admissíveis (O(1) por ponto).
+    """
+    ax, ay = pontos[inicio]
+    k = inicio + 1
+    bx, by = pontos[k][0] - ax, pontos[k][1] - ay
+    norma = hypot(bx, by)
+    if norma == 0:
+        return k
+    ux, uy = bx / norma, by / norma
+    minimo, maximo = -inf, inf
+    avanco = norma
+
+    while k < fim:
+        dx, dy = pontos[k][0] - ax, pontos[k][1] - ay
+        distancia = hypot(dx, dy)
+        if distancia > tolerancia:
+            angulo = atan2(ux * dy - uy * dx, ux * dx + uy * dy)
+            meia_abertura = asin(tolerancia / distancia)
+            minimo = max(minimo, angulo - meia_abertura)
+            maximo = min(maximo, angulo + meia_abertura)
+
+        ex, ey = pontos[k + 1][0] - ax, pontos[k + 1][1] - ay
+        proximo_avanco = ex * ux + ey * uy
+        angulo = atan2(ux * ey - uy * ex, proximo_avanco)
+        if proximo_avanco <= avanco or not (minimo <= angulo <= maximo) or abs(angulo) >= pi / 2:
+            break
+        avanco = proximo_avanco
+        k += 1
+    return k
+
+
+def _circulo(p, q, r):
+    """Centro e raio da circunferência pelos três pontos, ou None se colineares."""
+    ax, ay = p
+    bx, by = q
+    cx, cy = r
+    d = 2 * (ax * (by - cy) + bx * (cy - ay) + cx * (ay - by))
+    if d == 0:
+        return None
+    a2, b2, c2 = ax * ax + ay * ay, bx * bx + by * by, cx * cx + cy * cy
+    ux = (a2 * (by - cy) + b2 * (cy - ay) + c2 * (ay - by)) / d
+    uy = (a2 * (cx - bx) + b2 * (ax - cx) + c2 * (bx - ax)) / d
+    return (ux, uy), hypot(ax - ux, ay - uy)
+
+
+def _giro(pontos, k):
+    """Produto vetorial entre os trechos k-1 -> k e k -> k+1 (sinal = sentido da curva)."""
+    (ax, ay), (bx, by), (cx, cy) = pontos[k - 1], pontos[k], pontos[k + 1]
+    return (bx - ax) * (cy - by) - (by - ay) * (cx - bx)
+
+
+def _ajustar_arco(pontos, inicio, fim, tolerancia):
+    """Centro do arco por pontos[inicio..fim] se todos os pontos e flechas cabem na tolerância."""
+    ajuste = _circulo(pontos[inicio], pontos[(inicio + fim) // 2], pontos[fim])
+    if ajuste is None:
+        return None
+    (cx, cy), raio = ajuste
+    if raio > RAIO_MAXIMO_ARCO:
+        return None
+    if hypot(pontos[fim][0] - pontos[inicio][0], pontos[fim][1] - pontos[inicio][1]) <= 2 * tolerancia + 0.01:
+        return None  # extremos coincidentes seriam interpretados como circunferência completa
+
+    varredura = 0.0
+    for k in range(inicio, fim + 1):
+        x, y = pontos[k]
+        if abs(hypot(x - cx, y - cy) - raio) > tolerancia:
+            return None
+        if k > inicio:
+            corda = hypot(x - pontos[k - 1][0], y - pontos[k - 1][1])
+            if corda > 2 * raio:
+                return None
+            if raio - sqrt(raio * raio - corda * corda / 4) > tolerancia:
+                return None
+            varredura += 2 * asin(corda / (2 * raio))
+    if varredura >= 2 * pi - 1e-3:
+        return None
+    return cx, cy
+
+
+def _estender_arco(pontos, inicio, fim, tolerancia):
+    """
+    Procura o maior arco a partir de inicio (no mínimo três trechos) dentro de
+    uma sequência de curvas no mesmo sentido; retorna (k, centro, horario) ou None.
+    """
+    if fim - inicio < 3:
+        return None
+    sentido = _giro(pontos, inicio + 1)
+    if sentido == 0:
+        return None
+    limite = inicio + 2
+    while limite < fim and _giro(pontos, limite) * sentido > 0:
+        limite += 1
+    if limite - inicio < 3:
+        return None
+
+    centro = _ajustar_arco(pontos, inicio, inicio + 3, tolerancia)
+    if centro is None:
+        return None
+    melhor, baixo, alto = inicio + 3, inicio + 4, limite
+    while baixo <= alto:
+        meio = (baixo + alto) // 2
+        ajuste = _ajustar_arco(pontos, inicio, meio, tolerancia)
+        if ajuste is None:
+            alto = meio - 1
+        else:
+            melhor, centro, baixo = meio, ajuste, meio + 1
+    return melhor, centro, sentido < 0
+
+
+def movimentos_compactos(pontos, tipos, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Gera os movimentos (codigo, x, y, centro) do caminho compactado, em que
+    codigo é "G00", "G01", "G02" ou "G03" e centro é (cx, cy) nos arcos.
+    """
+    i = 0
+    n = len(pontos)
+    while i < n - 1:
+        fim = _fim_do_trecho(tipos, i)
+        while i < fim:
+            if tipos[i] != TIPO_DESLOCAMENTO:
+                arco = _estender_arco(pontos, i, fim, tolerancia)
+                if arco is not None:
+                    k, centro, horario = arco
+                    yield ("G02" if horario else "G03"), pontos[k][0], pontos[k][1], centro
+                    i = k
+                    continue
+            k = _estender_reta(pontos, i, fim, tolerancia)
+            yield ("G00" if tipos[i] == TIPO_DESLOCAMENTO else "G01"), pontos[k][0], pontos[k][1], None
+            i = k
+
+
+def linhas_gcode_compacto(ciclo, tipos, pontos, velocidade, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Versão compactada de gcode.linhas_gcode: mesmos argumentos, sem comentários
+    nem números de bloco, com retas fundidas, arcos e palavras modais suprimidas.
+    """
+    if not ciclo:
+        return
+    x0, y0 = _formatar(pontos[0][0]), _formatar(pontos[0][1])
+    yield f"G00 X{x0} Y{y0}"
+    modal, atual_x, atual_y = "G00", x0, y0
+    avanco = None
+
+    for codigo, x, y, centro in movimentos_compactos(pontos, tipos, tolerancia):
+        px, py = _formatar(x), _formatar(y)
+        if px == atual_x and py == atual_y:
+            continue
+        palavras = []
+        if codigo != modal:
+            palavras.append(codigo)
+        if px != atual_x:
+            palavras.append("X" + px)
+        if py != atual_y:
+            palavras.append("Y" + py)
+        if centro is not None:
+            anterior_x, anterior_y = float(atual_x), float(atual_y)
+            palavras.append("I" + _formatar(centro[0] - anterior_x))
+            palavras.append("J" + _formatar(centro[1] - anterior_y))
+        if codigo != "G00" and avanco is None:
+            avanco = _formatar(velocidade)
+            palavras.append("F" + avanco)
+        yield " ".join(palavras)
+        modal, atual_x, atual_y = codigo, px, py
+
+    if (atual_x, atual_y) != (x0, y0):
+        yield ("" if modal == "G00" else "G00 ") + f"X{x0} Y{y0}"
+    yield "M30"
+
+
+def medir_programa(linhas):
+    """Retorna (bytes, blocos) do programa: bytes em UTF-8 com quebras de linha; blocos = linhas não vazias."""
+    total_bytes = 0
+    blocos = 0
+    for linha in linhas:
+        total_bytes += len(linha.encode("utf-8")) + 1
+        if linha.strip():
+            blocos += 1
+    return total_bytes, blocos
+
+
+def comparar_programas(original, compactado):
+    """Resumo da redução de tamanho entre dois programas (iteráveis de linhas)."""
+    bytes_original, blocos_original = medir_programa(original)
+    bytes_compactado, blocos_compactado = medir_programa(compactado)
+    return {
+        "bytes_original": bytes_original,
+        "bytes_compactado": bytes_compactado,
+        "blocos_original": blocos_original,
+        "blocos_compactado": blocos_compactado,
+        "reducao_bytes": 1 - bytes_compactado / bytes_original if bytes_original else 0.0,
+        "reducao_blocos": 1 - blocos_compactado / blocos_original if blocos_original else 0.0,
+    }
@@ -0,0 +1,117 @@
+"""
+Geração de programas CNC (G-code) em fluxo.
+
+As linhas são produzidas por geradores, de modo que programas com centenas de
+milhares de blocos podem ser enviados por HTTP ou gravados em arquivo sem que
+o texto inteiro fique em memória.
+
+Uso pela linha de comando (projeto salvo pela interface, em JSON ou no formato binário .cgb):
+
+    python gcode.py projeto.json -o programa.nc --estrategia carteiro [--compactar]
+"""
+
+import argparse
+import sys
+
+from carteiro_chines import TIPO_DESLOCAMENTO
+from compactacao_gcode import TOLERANCIA_PADRAO, comparar_programas, linhas_gcode_compacto
+
+
+LINHAS_POR_BLOCO = 2000
+
+
+def linhas_gcode(ciclo, tipos, pontos, velocidade):
+    """
+    Gera as linhas (sem quebra de linha) do programa CNC do caminho.
+    pontos[i] é a coordenada (x, y) de ciclo[i] e tipos[i] classifica o trecho
+    ciclo[i] -> ciclo[i+1] (G00 para deslocamentos, G01 para cortes).
+    """
+    if not ciclo:
+        return
+    x0, y0 = pontos[0]
+    yield f"G00 X{x0:.2f} Y{y0:.2f}  ; Posicionamento inicial"
+    yield f"G01 F{velocidade:.1f}  ; Velocidade de corte"
+    yield ""
+
+    for i in range(1, len(ciclo)):
+        x, y = pontos[i]
+        if tipos[i - 1] == TIPO_DESLOCAMENTO:
+            yield f"N{i:03d} G00 X{x:.2f} Y{y:.2f}  ; Deslocamento rápido até ponto {ciclo[i]}"
+        else:
+            yield f"N{i:03d} G01 X{x:.2f} Y{y:.2f}  ; Corte até ponto {ciclo[i]}"
+
+    yield ""
+    yield f"G00 X{x0:.2f} Y{y0:.2f}  ; Retorno ao início"
+    yield "M30  ; Fim do programa"
+
+
+def linhas_programa(ciclo, tipos, pontos, velocidade, compactar=False, tolerancia=TOLERANCIA_PADRAO):
+    """Linhas do programa completo (linhas_gcode) ou compactado (linhas_gcode_compacto)."""
+    if compactar:
+        return linhas_gcode_compacto(ciclo, tipos, pontos, velocidade, tolerancia)
+    return linhas_gcode(ciclo, tipos, pontos, velocidade)
+
+
+def blocos_texto(linhas, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Agrupa linhas em blocos de texto (cada linha terminada por quebra de linha)."""
+    bloco = []
+    for linha in linhas:
+        bloco.append(linha)
+        if len(bloco) >= linhas_por_bloco:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+    if bloco:
+        yield "\n".join(bloco) + "\n"
+
+
+def escrever_gcode(arquivo, linhas):
+    """Grava as linhas no arquivo (objeto de texto aberto) bloco a bloco; retorna o número de linhas."""
+    total = 0
+    for bloco in blocos_texto(linhas):
+        arquivo.write(bloco)
+        total += bloco.count("\n")
+    return total
+
+
+def main(argv=None):
+    from grafo_compacto import GrafoCompacto
+    from projeto_binario import abrir_projeto
+
+    parser = argparse.ArgumentParser(description="Gera o programa CNC de um projeto salvo em JSON ou binário.")
+    parser.add_argument("projeto", help="arquivo JSON ou binário (.cgb) com vértices e arestas")
+    parser.add_argument("-o", "--saida", default="-", help="arquivo .nc de saída (padrão: saída padrão)")
+    parser.add_argument("--estrategia", choices=("euleriano", "carteiro"), default="euleriano")
+    parser.add_argument("--velocidade", type=float, default=100.0, help="velocidade de corte (mm/min)")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--compactar", action="store_true",
+                        help="funde retas, ajusta arcos G02/G03 e omite palavras modais e comentários")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                        help="tolerância geométrica da compactação (mm)")
+    args = parser.parse_args(argv)
+
+    grafo = abrir_projeto(args.projeto, GrafoCompacto)
+    otimizavel, mensagem = grafo.verificar_rota(args.estrategia)
+    if not otimizavel:
+        print(f"Erro: {mensagem}", file=sys.stderr)
+        return 1
+
+    ciclo, tipos = grafo.otimizar_rota(args.estrategia, processos=args.processos)
+    pontos = grafo.pontos_caminho(ciclo).tolist()
+    linhas = linhas_programa(ciclo, tipos, pontos, args.velocidade, args.compactar, args.tolerancia)
+    if args.compactar:
+        reducao = comparar_programas(linhas_gcode(ciclo, tipos, pontos, args.velocidade),
+                                     linhas_gcode_compacto(ciclo, tipos, pontos, args.velocidade, args.tolerancia))
+        print(f"Compactação: {reducao['bytes_original']} -> {reducao['bytes_compactado']} bytes "
+              f"({reducao['reducao_bytes']:.1%}), {reducao['blocos_original']} -> "
+              f"{reducao['blocos_compactado']} blocos ({reducao['reducao_blocos']:.1%})", file=sys.stderr)
+    if args.saida == "-":
+        escrever_gcode(sys.stdout, linhas)
+    else:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            total = escrever_gcode(f, linhas)
+        print(f"{total} linhas gravadas em {args.saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Representação compacta (baseada em arrays NumPy) do grafo de corte.
+
+Alternativa ao GrafoEuleriano (baseado em dicionários) para chapas grandes: as
+coordenadas ficam num array float64 (N x 2), os extremos das arestas num array
+int32 (M x 2) e a adjacência em formato CSR (deslocamentos + índices de arestas),
+construída de forma vetorizada e reaproveitada até a próxima alteração. Apenas
+o mapa nome -> índice é mantido em estruturas Python.
+
+Remoções marcam a posição como inativa; quando mais da metade das posições
+estiver inativa os arrays são compactados, o que renumera os identificadores
+das arestas.
+"""
+
+import numpy as np
+
+from metricas_caminho import comprimentos_segmentos, metricas_caminho
+from motor_euleriano import hierholzer
+from sequenciamento import componentes_conexos, planejar_rota
+
+
+CAPACIDADE_INICIAL = 64
+MINIMO_COMPACTACAO = 1024
+
+
+class _VisaoVertices:
+    """Visão somente leitura nome -> (x, y) sobre os arrays do grafo compacto."""
+
+    def __init__(self, grafo):
+        self._grafo = grafo
+
+    def __len__(self):
+        return len(self._grafo._indice)
+
+    def __iter__(self):
+        return iter(self._grafo._indice)
+
+    def __contains__(self, nome):
+        return nome in self._grafo._indice
+
+    def __getitem__(self, nome):
+        x, y = self._grafo._coordenadas[self._grafo._indice[nome]]
+        return float(x), float(y)
+
+    def keys(self):
+        return self._grafo._indice.keys()
+
+    def items(self):
+        for nome in self._grafo._indice:
+            yield nome, self[nome]
+
+
+class _VisaoArestas:
+    """Visão somente leitura das arestas como pares (origem, destino) de nomes."""
+
+    def __init__(self, grafo):
+        self._grafo = grafo
+
+    def __len__(self):
+        return self._grafo._num_arestas_ativas
+
+    def __iter__(self):
+        nomes = self._grafo._nomes
+        ids = np.flatnonzero(self._grafo._ativa[:self._grafo._num_arestas])
+        extremos = self._grafo._extremos[ids]
+        return zip(map(nomes.__getitem__, extremos[:, 0].tolist()),
+                   map(nomes.__getitem__, extremos[:, 1].tolist()))
+
+
+class GrafoCompacto:
+    """Grafo de corte com armazenamento contíguo; mesma API de GrafoEuleriano."""
+
+    def __init__(self, capacidade=CAPACIDADE_INICIAL):
+        self.limpar(capacidade)
+
+    def limpar(self, capacidade=CAPACIDADE_INICIAL):
+        """Remove todos os vértices e arestas."""
+        self._coordenadas = np.zeros((capacidade, 2), dtype=np.float64)
+        self._ativo = np.zeros(capacidade, dtype=bool)
+        self._nomes = []
+        self._indice = {}
+        self._extremos = np.zeros((capacidade, 2), dtype=np.int32)
+        self._ativa = np.zeros(capacidade, dtype=bool)
+        self._num_arestas = 0
+        self._num_arestas_ativas = 0
+        self._estrutura = None
+        self.vertices = _VisaoVertices(self)
+        self.arestas = _VisaoArestas(self)
+
+    @staticmethod
+    def _ampliar(array, tamanho):
+        if tamanho <= len(array):
+            return array
+        novo = np.zeros((max(tamanho, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+        novo[:len(array)] = array
+        return novo
+
+    def adicionar_vertice(self, nome, x, y):
+        """Adiciona um vértice ao grafo (ou atualiza a posição de um existente)."""
+        if nome in self._indice:
+            self.mover_vertice(nome, x, y)
+            return
+        indice = len(self._nomes)
+        self._coordenadas = self._ampliar(self._coordenadas, indice + 1)
+        self._ativo = self._ampliar(self._ativo, indice + 1)
+        self._coordenadas[indice] = (x, y)
+        self._ativo[indice] = True
+        self._nomes.append(nome)
+        self._indice[nome] = indice
+        self._estrutura = None
+
+    def mover_vertice(self, nome, x, y):
+        """Altera as coordenadas de um vértice, mantendo suas arestas."""
+        self._coordenadas[self._indice[nome]] = (x, y)
+
+    def adicionar_aresta(self, origem, destino, peso=1):
+        """Adiciona uma aresta ao grafo e retorna seu identificador."""
+        identificador = self._num_arestas
+        self._extremos = self._ampliar(self._extremos, identificador + 1)
+        self._ativa = self._ampliar(self._ativa, identificador + 1)
+        self._extremos[identificador] = (self._indice[origem], self._indice[destino])
+        self._ativa[identificador] = True
+        self._num_arestas += 1
+        self._num_arestas_ativas += 1
+        self._estrutura = None
+        return identificador
+
+    def _arestas_entre(self, u, v):
+        """Identificadores das arestas ativas entre os índices u e v (busca vetorizada)."""
+        extremos = self._extremos[:self._num_arestas]
+        origens, destinos = extremos[:, 0], extremos[:, 1]
+        mascara = ((origens == u) & (destinos == v)) | ((origens == v) & (destinos == u))
+        return np.flatnonzero(mascara & self._ativa[:self._num_arestas])
+
+    def remover_vertice(self, nome):
+        """Remove um vértice e suas arestas."""
+        indice = self._indice.pop(nome, None)
+        if indice is None:
+            return
+        extremos = self._extremos[:self._num_arestas]
+        incidentes = ((extremos[:, 0] == indice) | (extremos[:, 1] == indice)) & self._ativa[:self._num_arestas]
+        self._num_arestas_ativas -= int(np.count_nonzero(incidentes))
+        self._ativa[:self._num_arestas][incidentes] = False
+        self._ativo[indice] = False
+        self._nomes[indice] = None
+        self._estrutura = None
+        self._compactar_se_necessario()
+
+    def remover_aresta(self, origem, destino):
+        """Remove uma aresta entre origem e destino (a mais recente)."""
+        if origem not in self._indice or destino not in self._indice:
+            return
+        ids = self._arestas_entre(self._indice[origem], self._indice[destino])
+        if len(ids):
+            self._ativa[ids[-1]] = False
+            self._num_arestas_ativas -= 1
+            self._estrutura = None
+            self._compactar_se_necessario()
+
+    def _compactar_se_necessario(self):
+        inativos = len(self._nomes) - len(self._indice)
+        inativas = self._num_arestas - self._num_arestas_ativas
+        if max(inativos, inativas) >= MINIMO_COMPACTACAO and (
+                2 * inativos > len(self._nomes) or 2 * inativas > self._num_arestas):
+            self.compactar()
+
+    def compactar(self):
+        """Descarta as posições inativas; renumera vértices e identificadores de arestas."""
+        mantidos = np.flatnonzero(self._ativo[:len(self._nomes)])
+        novo_indice = np.full(len(self._nomes), -1, dtype=np.int32)
+        novo_indice[mantidos] = np.arange(len(mantidos), dtype=np.int32)
+
+        ids = np.flatnonzero(self._ativa[:self._num_arestas])
+        self._extremos = novo_indice[self._extremos[ids]]
+        self._ativa = np.ones(len(ids), dtype=bool)
+        self._num_arestas = self._num_arestas_ativas = len(ids)
+
+        self._coordenadas = self._coordenadas[mantidos]
+        self._ativo = np.ones(len(mantidos), dtype=bool)
+        self._nomes = [self._nomes[i] for i in mantidos.tolist()]
+        self._indice = {nome: i for i, nome in enumerate(self._nomes)}
+        self._estrutura = None
+
+    def _estrutura_compacta(self):
+        """
+        Retorna (vertices, origens, destinos, ids, inicio, adjacentes) com índices
+        contíguos: vertices[i] é a posição original do vértice i, ids[e] o
+        identificador da aresta e, e a adjacência está em formato CSR.
+        """
+        if self._estrutura is None:
+            vertices = np.flatnonzero(self._ativo[:len(self._nomes)])
+            local = np.full(len(self._nomes), -1, dtype=np.int32)
+            local[vertices] = np.arange(len(vertices), dtype=np.int32)
+
+            ids = np.flatnonzero(self._ativa[:self._num_arestas])
+            extremos = local[self._extremos[ids]]
+            origens, destinos = extremos[:, 0], extremos[:, 1]
+
+            pontas = np.concatenate((origens, destinos))
+            ordem = np.argsort(pontas, kind="stable")
+            adjacentes = np.concatenate((np.arange(len(ids)),) * 2)[ordem]
+            inicio = np.zeros(len(vertices) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(pontas, minlength=len(vertices)), out=inicio[1:])
+
+            self._estrutura = (vertices, origens, destinos, ids, inicio, adjacentes)
+        return self._estrutura
+
+    def graus(self):
+        """Array com o grau de cada vértice ativo, na ordem de inserção."""
+        vertices, origens, destinos, _, _, _ = self._estrutura_compacta()
+        return np.bincount(np.concatenate((origens, destinos)), minlength=len(vertices))
+
+    def _componentes(self):
+        vertices, origens, destinos, _, inicio, adjacentes = self._estrutura_compacta()
+        origens, destinos = origens.tolist(), destinos.tolist()
+        return componentes_conexos(len(vertices), origens, destinos,
+                                   (inicio.tolist(), adjacentes.tolist()))
+
+    def verificar_euleriano(self):
+        """Verifica se o grafo possui um ciclo euleriano."""
+        if not self._indice:
+            return False, "Grafo vazio"
+
+        graus = self.graus()
+        isolados = int(np.count_nonzero(graus == 0))
+        if len(self._componentes()) + isolados > 1:
+            return False, "Grafo não é conexo"
+
+        vertices = self._estrutura_compacta()[0]
+        impares = [self._nomes[i] for i in vertices[graus % 2 == 1].tolist()]
+        if impares:
+            return False, f"Vértices com grau ímpar: {impares}"
+
+        return True, "Grafo é euleriano"
+
+    def verificar_rota(self, estrategia="euleriano"):
+        """
+        Verifica se a chapa pode ser otimizada peça a peça.
+        Componentes desconexos são permitidos; na estratégia euleriana todos os
+        vértices precisam ter grau par.
+        """
+        if self._num_arestas_ativas == 0:
+            return False, "Nenhuma trajetória definida"
+
+        graus = self.graus()
+        vertices = self._estrutura_compacta()[0]
+        graus_impares = [self._nomes[i] for i in vertices[graus % 2 == 1].tolist()]
+        if graus_impares and estrategia != "carteiro":
+            return False, f"Vértices com grau ímpar: {graus_impares}"
+
+        mensagem = f"{len(self._componentes())} peça(s)"
+        if graus_impares:
+            mensagem += f", {len(graus_impares)} vértices com grau ímpar serão emparelhados"
+        return True, mensagem
+
+    def encontrar_ciclo_euleriano(self):
+        """Encontra um ciclo euleriano usando o algoritmo de Hierholzer."""
+        ciclo, _ = self.encontrar_ciclo_euleriano_com_arestas()
+        return ciclo
+
+    def encontrar_ciclo_euleriano_com_arestas(self):
+        """
+        Encontra um ciclo euleriano e as arestas percorridas.
+        Retorna (ciclo, arestas), em que arestas[i] é o identificador da aresta
+        que liga ciclo[i] a ciclo[i+1].
+        """
+        if self._num_arestas_ativas == 0:
+            return [], []
+
+        vertices, origens, destinos, ids, inicio, adjacentes = self._estrutura_compacta()
+        ciclo, arestas = hierholzer(len(vertices), origens.tolist(), destinos.tolist(), 0,
+                                    (inicio.tolist(), adjacentes.tolist()))
+        nomes = self._nomes
+        posicoes = vertices[ciclo].tolist() if ciclo else []
+        return [nomes[i] for i in posicoes], ids[arestas].tolist() if arestas else []
+
+    def otimizar_rota(self, estrategia="euleriano", processos=None, progresso=None):
+        """
+        Planeja a rota da ferramenta para toda a chapa, peça a peça.
+        Retorna (ciclo, tipos), como GrafoEuleriano.otimizar_rota; progresso é
+        repassado a planejar_rota.
+        """
+        vertices, origens, destinos, _, inicio, adjacentes = self._estrutura_compacta()
+        ciclo, tipos = planejar_rota(
+            self._coordenadas[vertices].tolist(), origens.tolist(), destinos.tolist(),
+            estrategia=estrategia, processos=processos,
+            adjacencia=(inicio.tolist(), adjacentes.tolist()), progresso=progresso
+        )
+        nomes = self._nomes
+        return [nomes[i] for i in vertices[ciclo].tolist()] if ciclo else [], tipos
+
+    def calcular_distancia_total(self, caminho):
+        """Calcula a distância total percorrida no caminho."""
+        return float(comprimentos_segmentos(self.pontos_caminho(caminho)).sum())
+
+    def calcular_metricas(self, caminho, tipos=None, velocidade=100.0, velocidade_rapida=None, aceleracao=None):
+        """Distâncias de corte/deslocamento e tempos do caminho (ver metricas_caminho)."""
+        return metricas_caminho(self.pontos_caminho(caminho), tipos, velocidade, velocidade_rapida, aceleracao)
+
+    def pontos_caminho(self, caminho):
+        """Coordenadas (K x 2) dos vértices do caminho, reunidas de uma vez."""
+        indice = self._indice
+        return self._coordenadas[[indice[nome] for nome in caminho]]
+
+    def ponto_proximo(self, x, y, raio):
+        """Vértice mais próximo de (x, y) a distância menor que raio, ou None (busca vetorizada)."""
+        n = len(self._nomes)
+        if n == 0:
+            return None
+        d2 = ((self._coordenadas[:n] - (x, y)) ** 2).sum(axis=1)
+        d2[~self._ativo[:n]] = np.inf
+        melhor = int(np.argmin(d2))
+        return self._nomes[melhor] if d2[melhor] < raio * raio else None
+
+    def vertices_na_regiao(self, xmin, ymin, xmax, ymax):
+        """Nomes dos vértices dentro do retângulo (limites inclusivos)."""
+        n = len(self._nomes)
+        xs, ys = self._coordenadas[:n, 0], self._coordenadas[:n, 1]
+        dentro = self._ativo[:n] & (xs >= xmin) & (xs <= xmax) & (ys >= ymin) & (ys <= ymax)
+        return [self._nomes[i] for i in np.flatnonzero(dentro).tolist()]
+
+    def to_dict(self):
+        """Converte o grafo para dicionário."""
+        vertices = self._estrutura_compacta()[0]
+        xs, ys = self._coordenadas[vertices].T.tolist()
+        return {
+            "vertices": dict(zip(map(self._nomes.__getitem__, vertices.tolist()),
+                                 ({"x": x, "y": y} for x, y in zip(xs, ys)))),
+            "arestas": list(self.arestas)
+        }
+
+    def from_dict(self, dados):
+        """Carrega o grafo de um dicionário, montando os arrays de uma só vez."""
+        vertices = dados.get("vertices", {})
+        nomes = list(vertices)
+        indice = {nome: i for i, nome in enumerate(nomes)}
+        coordenadas = [(pos["x"], pos["y"]) for pos in vertices.values()]
+        extremos = [(indice[o], indice[d]) for o, d in dados.get("arestas", [])]
+        self.carregar_arrays(nomes, coordenadas, extremos, indice)
+
+    def carregar_arrays(self, nomes, coordenadas, extremos, indice=None):
+        """
+        Carrega o grafo a partir de nomes, coordenadas (N x 2) e extremos das
+        arestas (M x 2, índices em nomes), copiando os arrays de uma só vez
+        (aceita os arrays mapeados em memória de projeto_binario).
+        """
+        nomes = list(nomes)
+        if indice is None:
+            indice = dict(zip(nomes, range(len(nomes))))
+        if len(indice) != len(nomes):
+            raise ValueError("nomes de vértices repetidos")
+        coordenadas = np.asarray(coordenadas, dtype=np.float64).reshape(-1, 2)
+        extremos = np.asarray(extremos, dtype=np.int32).reshape(-1, 2)
+
+        self.limpar(max(len(nomes), len(extremos), CAPACIDADE_INICIAL))
+        self._nomes = nomes
+        self._indice = indice
+        self._ativo[:len(nomes)] = True
+        self._coordenadas[:len(nomes)] = coordenadas
+        self._extremos[:len(extremos)] = extremos
+        self._ativa[:len(extremos)] = True
+        self._num_arestas = self._num_arestas_ativas = len(extremos)
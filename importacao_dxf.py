@@ -0,0 +1,286 @@
+"""
+Importação da geometria de corte de arquivos DXF (ASCII) para o grafo.
+
+O arquivo é lido em fluxo: os pares (código de grupo, valor) são consumidos
+duas linhas por vez e cada entidade da seção ENTITIES é entregue assim que
+termina, sem montar o documento em memória. São importadas LINE, LWPOLYLINE
+e POLYLINE (inclusive trechos em arco, pelo bulge), ARC e CIRCLE; os arcos
+viram cordas cuja flecha não passa de erro_corda. Extremos a menos de
+`tolerancia` um do outro viram o mesmo ponto de corte (soldagem.FusaoPontos,
+hash espacial com células do tamanho da tolerância), e o resultado é carregado
+de uma só vez no grafo com carregar_arrays:
+
+    python -m importacao_dxf peca.dxf [projeto.json|projeto.cgb] --tolerancia 0.001 --erro-corda 0.01
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from itertools import zip_longest
+
+import numpy as np
+
+from armazem_arestas import chave_aresta
+from projeto_binario import EXTENSAO, ProjetoBinario
+from soldagem import FusaoPontos
+
+
+TOLERANCIA_FUSAO = 1e-3  # mm: extremos mais próximos que isso viram o mesmo ponto
+ERRO_CORDA = 0.01  # mm: distância máxima entre um arco e as cordas que o aproximam
+MAXIMO_CORDAS_ARCO = 4096
+SENTINELA_BINARIO = "AutoCAD Binary DXF"
+# Bits de POLYLINE.70 de malhas 3D e de faces, que não são trajetórias de corte
+POLILINHA_FECHADA = 1
+POLILINHA_MALHA = 16 | 64
+
+
+def pares(linhas):
+    """Pares (código de grupo, valor) de um DXF ASCII, lidos duas linhas por vez."""
+    linhas = iter(linhas)
+    for numero, (codigo, valor) in enumerate(zip_longest(linhas, linhas)):
+        if valor is None:
+            raise ValueError("arquivo truncado: código de grupo sem valor")
+        try:
+            codigo = int(codigo)
+        except ValueError:
+            if codigo.startswith(SENTINELA_BINARIO):
+                raise ValueError("DXF binário não suportado; exporte o desenho como DXF ASCII") from None
+            raise ValueError(f"linha {2 * numero + 1}: código de grupo inválido {codigo.strip()[:40]!r}") from None
+        yield codigo, valor.strip()
+
+
+def entidades(linhas):
+    """Entidades da seção ENTITIES como (tipo, [(código, valor), ...]), uma de cada vez."""
+    secao = None
+    nome_secao = False
+    tipo, grupos = None, []
+    for codigo, valor in pares(linhas):
+        if codigo == 0:
+            if tipo is not None:
+                yield tipo, grupos
+                tipo, grupos = None, []
+            if valor == "SECTION":
+                nome_secao = True
+            elif valor == "ENDSEC":
+                secao = None
+            elif valor == "EOF":
+                return
+            elif secao == "ENTITIES":
+                tipo = valor
+        elif nome_secao:
+            if codigo == 2:
+                secao, nome_secao = valor, False
+        elif tipo is not None:
+            grupos.append((codigo, valor))
+    if tipo is not None:
+        yield tipo, grupos
+
+
+def _cordas(cx, cy, raio, inicio, varredura, erro_corda, minimo=1):
+    """Pontos internos do arco (ângulos em radianos, varredura com sinal) aproximado por cordas."""
+    if erro_corda < raio:
+        n = math.ceil(abs(varredura) / (2 * math.acos(1 - erro_corda / raio)))
+    else:
+        n = 1
+    n = min(max(n, minimo), MAXIMO_CORDAS_ARCO)
+    return [(cx + raio * math.cos(inicio + varredura * k / n), cy + raio * math.sin(inicio + varredura * k / n))
+            for k in range(1, n)]
+
+
+def _polilinha(vertices, fechada, erro_corda):
+    """Pontos de uma polilinha [(x, y, bulge), ...], com os trechos em arco aproximados por cordas."""
+    if fechada and len(vertices) > 1:
+        vertices = vertices + vertices[:1]
+    pontos = [vertices[0][:2]]
+    for (x0, y0, bulge), (x1, y1, _) in zip(vertices, vertices[1:]):
+        if bulge and (x0, y0) != (x1, y1):
+            # bulge = tan(varredura / 4); o centro fica na mediatriz da corda
+            deslocamento = (1 / bulge - bulge) / 4
+            cx = (x0 + x1) / 2 - (y1 - y0) * deslocamento
+            cy = (y0 + y1) / 2 + (x1 - x0) * deslocamento
+            pontos.extend(_cordas(cx, cy, math.hypot(x0 - cx, y0 - cy), math.atan2(y0 - cy, x0 - cx),
+                                  4 * math.atan(bulge), erro_corda))
+        pontos.append((x1, y1))
+    return pontos
+
+
+def _espelhar(pontos, valores):
+    """Passa para o sistema do desenho pontos no sistema da entidade com extrusão (0, 0, -1)."""
+    if float(valores.get(230, 1)) < 0:
+        return [(-x, y) for x, y in pontos]
+    return pontos
+
+
+def trechos(tipo, grupos, erro_corda=ERRO_CORDA):
+    """Sequência de pontos (x, y) ligados por trajetórias de uma entidade LINE, LWPOLYLINE, ARC ou CIRCLE."""
+    valores = dict(grupos)
+    if tipo == "LINE":
+        return [(float(valores[10]), float(valores[20])), (float(valores[11]), float(valores[21]))]
+    if tipo == "LWPOLYLINE":
+        vertices = []
+        for codigo, valor in grupos:
+            if codigo == 10:
+                vertices.append([float(valor), 0.0, 0.0])
+            elif codigo == 20 and vertices:
+                vertices[-1][1] = float(valor)
+            elif codigo == 42 and vertices:
+                vertices[-1][2] = float(valor)
+        if not vertices:
+            return []
+        fechada = int(valores.get(70, 0)) & POLILINHA_FECHADA
+        return _espelhar(_polilinha([tuple(v) for v in vertices], fechada, erro_corda), valores)
+    cx, cy, raio = float(valores[10]), float(valores[20]), float(valores[40])
+    if raio <= 0:
+        return []
+    if tipo == "CIRCLE":
+        inicio, varredura, minimo = 0.0, 2 * math.pi, 3
+    else:
+        inicio = math.radians(float(valores[50]))
+        varredura = math.radians((float(valores[51]) - float(valores[50])) % 360 or 360)
+        minimo = 1
+    pontos = [(cx + raio * math.cos(inicio), cy + raio * math.sin(inicio))]
+    pontos.extend(_cordas(cx, cy, raio, inicio, varredura, erro_corda, minimo))
+    pontos.append(pontos[0] if tipo == "CIRCLE" else
+                  (cx + raio * math.cos(inicio + varredura), cy + raio * math.sin(inicio + varredura)))
+    return _espelhar(pontos, valores)
+
+
+def ler_dxf(origem, tolerancia=TOLERANCIA_FUSAO, erro_corda=ERRO_CORDA):
+    """
+    Lê um DXF (caminho ou linhas de texto, p. ex. um arquivo aberto) em fluxo.
+    Retorna (ProjetoBinario, estatísticas). Trajetórias de comprimento nulo
+    depois da fusão dos extremos e trajetórias repetidas são descartadas, e só
+    ficam os pontos ligados a alguma trajetória.
+    """
+    if not (tolerancia > 0 and erro_corda > 0):
+        raise ValueError("tolerância e erro de corda devem ser positivos")
+    if isinstance(origem, (str, os.PathLike)):
+        with open(origem, "r", encoding="utf-8", errors="replace") as f:
+            return ler_dxf(f, tolerancia, erro_corda)
+
+    inicio = time.perf_counter()
+    fusao = FusaoPontos(tolerancia)
+    extremos, vistas = [], set()
+    estatisticas = {"entidades": 0, "ignoradas": {}, "descartadas": 0, "duplicadas": 0}
+
+    def ligar(pontos):
+        anterior = None
+        for x, y in pontos:
+            atual = fusao.indice(x, y)
+            if anterior is not None:
+                chave = chave_aresta(anterior, atual)
+                if anterior == atual:
+                    estatisticas["descartadas"] += 1
+                elif chave in vistas:
+                    estatisticas["duplicadas"] += 1
+                else:
+                    vistas.add(chave)
+                    extremos.append(chave)
+            anterior = atual
+
+    polilinha = None  # POLYLINE em andamento: (valores, [(x, y, bulge), ...]) até o SEQEND
+    for tipo, grupos in entidades(origem):
+        try:
+            if polilinha is not None and tipo == "VERTEX":
+                valores = dict(grupos)
+                polilinha[1].append((float(valores[10]), float(valores[20]), float(valores.get(42, 0))))
+                continue
+            if polilinha is not None:
+                valores, vertices = polilinha
+                polilinha = None
+                if vertices:
+                    fechada = int(valores.get(70, 0)) & POLILINHA_FECHADA
+                    ligar(_espelhar(_polilinha(vertices, fechada, erro_corda), valores))
+                if tipo == "SEQEND":
+                    continue
+            estatisticas["entidades"] += 1
+            if tipo == "POLYLINE" and not int(dict(grupos).get(70, 0)) & POLILINHA_MALHA:
+                polilinha = (dict(grupos), [])
+            elif tipo in ("LINE", "LWPOLYLINE", "ARC", "CIRCLE"):
+                ligar(trechos(tipo, grupos, erro_corda))
+            else:
+                estatisticas["ignoradas"][tipo] = estatisticas["ignoradas"].get(tipo, 0) + 1
+        except (KeyError, ValueError, OverflowError) as erro:  # OverflowError: coordenada infinita
+            motivo = f"grupo {erro.args[0]} ausente" if isinstance(erro, KeyError) else erro
+            raise ValueError(f"entidade {tipo} {estatisticas['entidades']}: {motivo}") from None
+
+    # Pontos de entidades que degeneraram por inteiro não ficam como vértices isolados
+    usados, extremos = np.unique(np.array(extremos, dtype=np.int64).reshape(-1, 2), return_inverse=True)
+    coordenadas = np.array(fusao.coordenadas, dtype=np.float64).reshape(-1, 2)[usados]
+    nomes = [f"P{i + 1}" for i in range(len(usados))]
+    projeto = ProjetoBinario(nomes, coordenadas, extremos.reshape(-1, 2))
+    segundos = time.perf_counter() - inicio
+    estatisticas.update({
+        "vertices": len(nomes),
+        "arestas": len(extremos),
+        "fundidos": fusao.fundidos,
+        "segundos": segundos,
+        "entidades_por_segundo": estatisticas["entidades"] / segundos if segundos > 0 else 0.0
+    })
+    return projeto, estatisticas
+
+
+def carregar_dxf(origem, grafo, tolerancia=TOLERANCIA_FUSAO, erro_corda=ERRO_CORDA):
+    """
+    Substitui o conteúdo do grafo (GrafoEuleriano ou GrafoCompacto) pela
+    geometria do DXF e retorna as estatísticas, com o tempo da carga incluído
+    em "segundos" e na vazão.
+    """
+    projeto, estatisticas = ler_dxf(origem, tolerancia, erro_corda)
+    inicio = time.perf_counter()
+    grafo.carregar_arrays(projeto.nomes, projeto.coordenadas, projeto.arestas)
+    estatisticas["segundos_carga"] = time.perf_counter() - inicio
+    estatisticas["segundos"] += estatisticas["segundos_carga"]
+    segundos = estatisticas["segundos"]
+    estatisticas["entidades_por_segundo"] = estatisticas["entidades"] / segundos if segundos > 0 else 0.0
+    return estatisticas
+
+
+def resumo(estatisticas):
+    """Texto curto com o resultado e a vazão da importação."""
+    texto = (f"{estatisticas['entidades']} entidades -> {estatisticas['vertices']} pontos e "
+             f"{estatisticas['arestas']} trajetórias em {estatisticas['segundos']:.2f} s "
+             f"({estatisticas['entidades_por_segundo']:,.0f} entidades/s)")
+    descartes = []
+    if estatisticas["duplicadas"]:
+        descartes.append(f"{estatisticas['duplicadas']} trajetórias repetidas")
+    if estatisticas["descartadas"]:
+        descartes.append(f"{estatisticas['descartadas']} de comprimento nulo")
+    if estatisticas["ignoradas"]:
+        descartes.append("ignoradas: " + ", ".join(f"{tipo} x{n}" for tipo, n in
+                                                    sorted(estatisticas["ignoradas"].items())))
+    if descartes:
+        texto += "; descartadas " + "; ".join(descartes)
+    return texto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa a geometria de um DXF para um projeto JSON ou .cgb.")
+    parser.add_argument("entrada", help="arquivo DXF (ASCII)")
+    parser.add_argument("saida", nargs="?", default=None, help="projeto .json ou .cgb (padrão: <entrada>.json)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_FUSAO,
+                        help=f"distância para fundir extremos (padrão: {TOLERANCIA_FUSAO})")
+    parser.add_argument("--erro-corda", type=float, default=ERRO_CORDA,
+                        help=f"erro máximo ao aproximar arcos por cordas (padrão: {ERRO_CORDA})")
+    args = parser.parse_args(argv)
+
+    saida = args.saida or os.path.splitext(args.entrada)[0] + ".json"
+    try:
+        projeto, estatisticas = ler_dxf(args.entrada, args.tolerancia, args.erro_corda)
+        if saida.lower().endswith(EXTENSAO):
+            projeto.salvar(saida)
+        else:
+            with open(saida, "w", encoding="utf-8") as f:
+                json.dump(projeto.para_dict(), f)
+    except (OSError, ValueError) as erro:
+        print(f"Erro: {erro}", file=sys.stderr)
+        return 1
+    print(f"{resumo(estatisticas)}; gravado em {saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
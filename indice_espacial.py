@@ -0,0 +1,146 @@
+"""
+Índice espacial dos pontos de corte para seleção pelo mouse nos editores.
+
+Grade uniforme (hash de células): cada ponto fica na célula que contém suas
+coordenadas, e as consultas visitam apenas as células que cruzam a região
+procurada. Inserir, mover e remover custam O(1); a busca do ponto mais
+próximo dentro de um raio e a busca numa caixa custam O(k), em que k é o
+número de pontos nas células visitadas. Quando a ocupação média das células
+passa de OCUPACAO_MAXIMA a grade é refinada, de modo que pontos concentrados
+numa região pequena não caiam todos na mesma célula. static/indice_espacial.js
+é a mesma estrutura no cliente web.
+"""
+
+from math import floor, inf
+
+
+TAMANHO_CELULA_PADRAO = 10.0
+OCUPACAO_MAXIMA = 8  # pontos por célula ocupada, em média, antes de refinar a grade
+TAMANHO_CELULA_MINIMO = 1e-6
+
+
+class GradeEspacial:
+    """Pontos nomeados indexados por uma grade uniforme, com atualização incremental."""
+
+    def __init__(self, tamanho_celula=TAMANHO_CELULA_PADRAO):
+        self._tamanho_inicial = tamanho_celula
+        self.tamanho_celula = tamanho_celula
+        self._celulas = {}  # (i, j) -> {nome: (x, y)}
+        self._posicoes = {}  # nome -> (x, y)
+        self._limite_refino = 0  # só tenta refinar de novo ao dobrar o número de pontos
+
+    def __len__(self):
+        return len(self._posicoes)
+
+    def __contains__(self, nome):
+        return nome in self._posicoes
+
+    def _celula(self, x, y):
+        return floor(x / self.tamanho_celula), floor(y / self.tamanho_celula)
+
+    def _retirar(self, nome):
+        x, y = self._posicoes.pop(nome)
+        chave = self._celula(x, y)
+        celula = self._celulas[chave]
+        del celula[nome]
+        if not celula:
+            del self._celulas[chave]
+
+    def adicionar(self, nome, x, y):
+        """Insere o ponto (ou o move, se o nome já existe)."""
+        if nome in self._posicoes:
+            self._retirar(nome)
+        self._posicoes[nome] = (x, y)
+        self._celulas.setdefault(self._celula(x, y), {})[nome] = (x, y)
+        if len(self._posicoes) > OCUPACAO_MAXIMA * len(self._celulas) and len(self._posicoes) >= self._limite_refino:
+            self._refinar()
+
+    def mover(self, nome, x, y):
+        """Altera as coordenadas de um ponto."""
+        self.adicionar(nome, x, y)
+
+    def remover(self, nome):
+        """Remove o ponto; nomes inexistentes são ignorados."""
+        if nome in self._posicoes:
+            self._retirar(nome)
+
+    def limpar(self):
+        self.tamanho_celula = self._tamanho_inicial
+        self._celulas.clear()
+        self._posicoes.clear()
+        self._limite_refino = 0
+
+    def _refinar(self):
+        # Divide as células pela metade enquanto isso espalhar os pontos.
+        # Pontos repetidos não se separam; por isso o próximo refino só é
+        # tentado quando o número de pontos dobrar (custo amortizado O(1)).
+        while (len(self._posicoes) > OCUPACAO_MAXIMA * len(self._celulas)
+               and self.tamanho_celula / 2 >= TAMANHO_CELULA_MINIMO):
+            ocupadas = len(self._celulas)
+            self.tamanho_celula /= 2
+            self._celulas = {}
+            for nome, (x, y) in self._posicoes.items():
+                self._celulas.setdefault(self._celula(x, y), {})[nome] = (x, y)
+            if len(self._celulas) == ocupadas:
+                break
+        self._limite_refino = 2 * len(self._posicoes)
+
+    def _celulas_na_caixa(self, xmin, ymin, xmax, ymax):
+        """Células ocupadas que cruzam a caixa (percorre a menor das duas coleções)."""
+        i0, j0 = self._celula(xmin, ymin)
+        i1, j1 = self._celula(xmax, ymax)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(self._celulas):
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    celula = self._celulas.get((i, j))
+                    if celula:
+                        yield celula
+        else:
+            for (i, j), celula in self._celulas.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    yield celula
+
+    def mais_proximo(self, x, y, raio):
+        """Nome do ponto mais próximo de (x, y) a distância menor que raio, ou None."""
+        melhor = None
+        melhor_d2 = raio * raio
+        for celula in self._celulas_na_caixa(x - raio, y - raio, x + raio, y + raio):
+            for nome, (px, py) in celula.items():
+                d2 = (px - x) ** 2 + (py - y) ** 2
+                if d2 < melhor_d2:
+                    melhor, melhor_d2 = nome, d2
+        return melhor
+
+    def na_caixa(self, xmin, ymin, xmax, ymax, limite=None):
+        """
+        Nomes dos pontos dentro da caixa (limites inclusivos). Com `limite`, a
+        busca para e retorna None assim que passar de `limite` pontos.
+        """
+        nomes = []
+        for celula in self._celulas_na_caixa(xmin, ymin, xmax, ymax):
+            nomes.extend(nome for nome, (px, py) in celula.items() if xmin <= px <= xmax and ymin <= py <= ymax)
+            if limite is not None and len(nomes) > limite:
+                return None
+        return nomes
+
+
+def celulas_segmento(xa, ya, xb, yb, tamanho):
+    """Células da grade atravessadas pelo segmento, em ordem (percurso de Amanatides e Woo)."""
+    i, j = floor(xa / tamanho), floor(ya / tamanho)
+    passos = abs(floor(xb / tamanho) - i) + abs(floor(yb / tamanho) - j)
+    dx, dy = xb - xa, yb - ya
+    passo_i, passo_j = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+    # Fração do segmento até a próxima borda vertical/horizontal e entre duas bordas
+    proxima_x = ((i + (dx > 0)) * tamanho - xa) / dx if dx else inf
+    proxima_y = ((j + (dy > 0)) * tamanho - ya) / dy if dy else inf
+    delta_x = tamanho / abs(dx) if dx else inf
+    delta_y = tamanho / abs(dy) if dy else inf
+    yield i, j
+    for _ in range(passos):
+        if proxima_x < proxima_y:
+            i += passo_i
+            proxima_x += delta_x
+        else:
+            j += passo_j
+            proxima_y += delta_y
+        yield i, j
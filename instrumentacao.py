@@ -0,0 +1,225 @@
+"""
+Instrumentação leve do pipeline e exposição no formato texto do Prometheus.
+
+Contadores, medidores e histogramas ficam num registro em memória (protegido
+por uma trava); medir(fase) e CronometroFases cronometram trechos do
+pipeline com time.perf_counter e alimentam o histograma de duração das fases.
+O CronometroFases também pode ser passado como callback de progresso para
+nucleo.otimizar_grafo, que informa as trocas de fase.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Limites (s) dos baldes dos histogramas de duração
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+_ROTULO_INFINITO = 'le="+Inf"'
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes, valores, extra=None):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    """Base das métricas: nome, descrição, nomes dos rótulos e valores por combinação de rótulos."""
+
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=(), trava=None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._trava = trava or threading.Lock()
+
+    def _chave(self, rotulos):
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def linhas(self):
+        yield f"# HELP {self.nome} {self.ajuda}"
+        yield f"# TYPE {self.nome} {self.tipo}"
+        with self._trava:
+            valores = sorted(self._valores.items())
+        for chave, valor in valores:
+            yield from self._linhas_valor(chave, valor)
+
+    def _linhas_valor(self, chave, valor):
+        yield f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (número de requisições, acertos de cache...)."""
+
+    tipo = "counter"
+
+    def incrementar(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def definir(self, valor, **rotulos):
+        """Copia o total de um contador mantido por outro objeto (por exemplo, o cache)."""
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = valor
+
+
+class Medidor(_Metrica):
+    """Valor instantâneo que sobe e desce (tamanho dos grafos, bytes em cache...)."""
+
+    tipo = "gauge"
+
+    def definir(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._valores[chave] = valor
+
+
+class Histograma(_Metrica):
+    """Distribuição de observações em baldes cumulativos, com soma e contagem."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_SEGUNDOS, trava=None):
+        super().__init__(nome, ajuda, rotulos, trava)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            dados = self._valores.get(chave)
+            if dados is None:
+                dados = self._valores[chave] = [[0] * len(self.limites), 0.0, 0]
+            baldes = dados[0]
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    baldes[i] += 1
+                    break
+            dados[1] += valor
+            dados[2] += 1
+
+    def _linhas_valor(self, chave, valor):
+        baldes, soma, contagem = valor
+        acumulado = 0
+        for limite, quantidade in zip(self.limites, baldes):
+            acumulado += quantidade
+            rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(float(limite))}"')
+            yield f"{self.nome}_bucket{rotulos} {acumulado}"
+        yield f"{self.nome}_bucket{_formatar_rotulos(self.rotulos, chave, _ROTULO_INFINITO)} {contagem}"
+        yield f"{self.nome}_sum{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(soma)}"
+        yield f"{self.nome}_count{_formatar_rotulos(self.rotulos, chave)} {contagem}"
+
+
+class RegistroMetricas:
+    """Conjunto de métricas exportadas; texto() gera o formato de exposição do Prometheus."""
+
+    def __init__(self):
+        self._metricas = {}
+        self._trava = threading.Lock()
+
+    def _registrar(self, classe, nome, *argumentos, **opcoes):
+        with self._trava:
+            metrica = self._metricas.get(nome)
+            if metrica is None:
+                metrica = self._metricas[nome] = classe(nome, *argumentos, **opcoes)
+            elif not isinstance(metrica, classe):
+                raise ValueError(f"métrica {nome} já registrada como {metrica.tipo}")
+            return metrica
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador, nome, ajuda, rotulos)
+
+    def medidor(self, nome, ajuda, rotulos=()):
+        return self._registrar(Medidor, nome, ajuda, rotulos)
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=LIMITES_SEGUNDOS):
+        return self._registrar(Histograma, nome, ajuda, rotulos, limites=limites)
+
+    def texto(self):
+        with self._trava:
+            metricas = list(self._metricas.values())
+        return "\n".join(linha for metrica in metricas for linha in metrica.linhas()) + "\n"
+
+
+registro = RegistroMetricas()
+duracao_fases = registro.histograma(
+    "corte_fase_duracao_segundos", "Duração das fases do pipeline de otimização.", ("fase",)
+)
+
+
+@contextmanager
+def medir(fase, histograma=duracao_fases):
+    """Cronometra o bloco e registra a duração da fase no histograma."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograma.observar(time.perf_counter() - inicio, fase=fase)
+
+
+def cronometrar_gerador(gerador, fase, histograma=duracao_fases):
+    """Repassa os itens do gerador e registra o tempo até ele se esgotar (ou ser fechado)."""
+    inicio = time.perf_counter()
+    try:
+        yield from gerador
+    finally:
+        histograma.observar(time.perf_counter() - inicio, fase=fase)
+
+
+class CronometroFases:
+    """
+    Tempos (s) por fase de uma execução. Chamado como progresso(fase, fracao),
+    mede o intervalo entre as trocas de fase; medir(fase) cronometra um bloco.
+    Cada fase concluída também é registrada no histograma.
+    """
+
+    def __init__(self, histograma=duracao_fases):
+        self.histograma = histograma
+        self.tempos = {}
+        self._fase = None
+        self._inicio = None
+
+    def _acumular(self, fase, segundos):
+        self.tempos[fase] = self.tempos.get(fase, 0.0) + segundos
+        if self.histograma is not None:
+            self.histograma.observar(segundos, fase=fase)
+
+    def __call__(self, fase, fracao):
+        if fase != self._fase:
+            agora = time.perf_counter()
+            if self._fase is not None:
+                self._acumular(self._fase, agora - self._inicio)
+            self._fase, self._inicio = fase, agora
+
+    def encerrar(self):
+        """Fecha a fase em andamento e retorna os tempos."""
+        if self._fase is not None:
+            self._acumular(self._fase, time.perf_counter() - self._inicio)
+            self._fase = None
+        return self.tempos
+
+    @contextmanager
+    def medir(self, fase):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._acumular(fase, time.perf_counter() - inicio)
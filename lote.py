@@ -0,0 +1,206 @@
+"""
+Otimização em lote de projetos salvos, sem interface gráfica.
+
+Converte todos os projetos de um diretório (JSON gravado por salvar_grafo ou
+GET /api/grafo, ou o formato binário .cgb de projeto_binario) em programas CNC, distribuindo os arquivos por um pool de
+processos. Para cada arquivo é gravado um .nc e o resumo (tempos por fase,
+métricas e falhas) vai para um CSV ou JSON. Este módulo não importa tkinter
+nem matplotlib, podendo rodar em servidores sem display.
+
+Uso:
+
+    python -m lote batch projetos/ -j 8 -o programas/ --estrategia carteiro --resumo resumo.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from compactacao_gcode import TOLERANCIA_PADRAO
+from gcode import escrever_gcode, linhas_programa
+from instrumentacao import CronometroFases
+from nucleo import FASES, otimizar_grafo
+from projeto_binario import EXTENSAO as EXTENSAO_BINARIA, abrir_projeto
+
+
+EXTENSOES_PROJETO = (".json", EXTENSAO_BINARIA)
+
+CAMPOS_RESUMO = (
+    "arquivo", "saida", "status", "erro", "vertices", "arestas", "linhas",
+    "distancia", "tempo_total", "reducao_bytes", "segundos_leitura", *(f"segundos_{fase}" for fase in FASES),
+    "segundos_gravacao", "segundos"
+)
+
+
+def encontrar_projetos(diretorio, recursivo=False):
+    """Caminhos dos projetos (.json ou .cgb) do diretório, em ordem alfabética."""
+    if not recursivo:
+        return sorted(os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+                      if nome.lower().endswith(EXTENSOES_PROJETO) and os.path.isfile(os.path.join(diretorio, nome)))
+    encontrados = []
+    for raiz, _, nomes in os.walk(diretorio):
+        encontrados.extend(os.path.join(raiz, nome) for nome in nomes if nome.lower().endswith(EXTENSOES_PROJETO))
+    return sorted(encontrados)
+
+
+def caminho_saida(arquivo, diretorio, saida=None):
+    """Arquivo .nc correspondente ao projeto (mantém os subdiretórios relativos a diretorio)."""
+    relativo = os.path.splitext(os.path.relpath(arquivo, diretorio))[0] + ".nc"
+    return os.path.join(saida if saida else diretorio, relativo)
+
+
+def otimizar_arquivo(arquivo, destino, parametros):
+    """
+    Otimiza um projeto e grava seu programa CNC (executado nos processos de trabalho).
+    Retorna a linha do resumo; falhas não levantam exceção, ficam em status/erro.
+    """
+    from grafo_compacto import GrafoCompacto
+
+    linha = {campo: None for campo in CAMPOS_RESUMO}
+    linha.update(arquivo=arquivo, saida=destino, status="erro")
+    inicio = time.perf_counter()
+    cronometro = CronometroFases(histograma=None)
+
+    try:
+        grafo = abrir_projeto(arquivo, GrafoCompacto)
+        linha.update(vertices=len(grafo.vertices), arestas=len(grafo.arestas))
+        linha["segundos_leitura"] = time.perf_counter() - inicio
+
+        resultado = otimizar_grafo(grafo, parametros, progresso=cronometro)
+        cronometro.encerrar()
+        agora = time.perf_counter()
+
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        with open(destino, "w", encoding="utf-8") as f:
+            linha["linhas"] = escrever_gcode(f, linhas_programa(
+                resultado["ciclo"], resultado["tipos"], resultado["pontos"], parametros["velocidade"],
+                parametros["compactar"], parametros["tolerancia"]
+            ))
+        linha["segundos_gravacao"] = time.perf_counter() - agora
+
+        metricas = resultado["metricas"]
+        linha.update(status="ok", distancia=metricas["distancia"],
+                     tempo_total=metricas["tempo_movimento"] + parametros["tempo_setup"])
+        if resultado["compactacao"]:
+            linha["reducao_bytes"] = resultado["compactacao"]["reducao_bytes"]
+    except (OSError, ValueError, KeyError, TypeError) as erro:
+        linha["erro"] = f"{type(erro).__name__}: {erro}"
+    except Exception as erro:
+        linha["erro"] = f"Falha na otimização: {type(erro).__name__}: {erro}"
+
+    for fase in FASES:
+        linha[f"segundos_{fase}"] = cronometro.tempos.get(fase)
+    linha["segundos"] = time.perf_counter() - inicio
+    return linha
+
+
+def otimizar_lote(arquivos, diretorio, parametros, saida=None, processos=None, ao_terminar=None):
+    """
+    Otimiza os arquivos em paralelo (processos=1 roda no próprio processo).
+    ao_terminar(linha) é chamado a cada arquivo concluído; retorna as linhas
+    do resumo na ordem de arquivos.
+    """
+    destinos = [caminho_saida(arquivo, diretorio, saida) for arquivo in arquivos]
+    linhas = [None] * len(arquivos)
+
+    if processos == 1:
+        for i, (arquivo, destino) in enumerate(zip(arquivos, destinos)):
+            linhas[i] = otimizar_arquivo(arquivo, destino, parametros)
+            if ao_terminar:
+                ao_terminar(linhas[i])
+        return linhas
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {executor.submit(otimizar_arquivo, arquivo, destino, parametros): i
+                   for i, (arquivo, destino) in enumerate(zip(arquivos, destinos))}
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            try:
+                linhas[i] = futuro.result()
+            except Exception as erro:  # processo de trabalho encerrado de forma anormal
+                linhas[i] = {campo: None for campo in CAMPOS_RESUMO}
+                linhas[i].update(arquivo=arquivos[i], saida=destinos[i], status="erro",
+                                 erro=f"Falha no processo: {erro}")
+            if ao_terminar:
+                ao_terminar(linhas[i])
+    return linhas
+
+
+def gravar_resumo(caminho, linhas):
+    """Grava o resumo em JSON (extensão .json) ou CSV (demais extensões)."""
+    if caminho.lower().endswith(".json"):
+        ok = sum(1 for linha in linhas if linha["status"] == "ok")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"total": len(linhas), "sucesso": ok, "falhas": len(linhas) - ok,
+                       "arquivos": linhas}, f, indent=2, ensure_ascii=False)
+        return
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS_RESUMO)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Otimização de projetos sem interface gráfica.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    lote = comandos.add_parser("batch", help="gera os programas CNC de todos os projetos JSON de um diretório")
+    lote.add_argument("diretorio", help="diretório com os projetos (.json ou .cgb)")
+    lote.add_argument("-j", "--processos", type=int, default=None,
+                      help="número de processos (padrão: número de CPUs; 1 = sem pool)")
+    lote.add_argument("-o", "--saida", default=None, help="diretório dos .nc (padrão: o dos projetos)")
+    lote.add_argument("-r", "--recursivo", action="store_true", help="inclui subdiretórios")
+    lote.add_argument("--resumo", default=None,
+                      help="arquivo de resumo .csv ou .json (padrão: resumo.csv no diretório de saída)")
+    lote.add_argument("--estrategia", choices=("euleriano", "carteiro"), default="carteiro")
+    lote.add_argument("--velocidade", type=float, default=100.0, help="velocidade de corte (mm/min)")
+    lote.add_argument("--velocidade-rapida", type=float, default=None, help="velocidade de deslocamento (mm/min)")
+    lote.add_argument("--aceleracao", type=float, default=None, help="aceleração da máquina (mm/s²)")
+    lote.add_argument("--tempo-setup", type=float, default=0.5, help="tempo de preparação (min)")
+    lote.add_argument("--compactar", action="store_true",
+                      help="funde retas, ajusta arcos G02/G03 e omite palavras modais e comentários")
+    lote.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                      help="tolerância geométrica da compactação (mm)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.diretorio):
+        print(f"Erro: diretório não encontrado: {args.diretorio}", file=sys.stderr)
+        return 2
+    arquivos = encontrar_projetos(args.diretorio, args.recursivo)
+    if args.resumo:
+        arquivos = [arquivo for arquivo in arquivos if os.path.abspath(arquivo) != os.path.abspath(args.resumo)]
+    if not arquivos:
+        print(f"Nenhum projeto .json ou .cgb em {args.diretorio}", file=sys.stderr)
+        return 0
+
+    parametros = {
+        "velocidade": args.velocidade, "tempo_setup": args.tempo_setup, "estrategia": args.estrategia,
+        "velocidade_rapida": args.velocidade_rapida, "aceleracao": args.aceleracao,
+        "compactar": args.compactar, "tolerancia": args.tolerancia
+    }
+    concluidos = [0]
+
+    def ao_terminar(linha):
+        concluidos[0] += 1
+        situacao = "ok" if linha["status"] == "ok" else f"ERRO ({linha['erro']})"
+        print(f"[{concluidos[0]}/{len(arquivos)}] {linha['arquivo']}: {situacao} em {linha['segundos']:.2f} s",
+              file=sys.stderr)
+
+    inicio = time.perf_counter()
+    linhas = otimizar_lote(arquivos, args.diretorio, parametros, args.saida, args.processos, ao_terminar)
+    resumo = args.resumo or os.path.join(args.saida or args.diretorio, "resumo.csv")
+    os.makedirs(os.path.dirname(resumo) or ".", exist_ok=True)
+    gravar_resumo(resumo, linhas)
+
+    falhas = sum(1 for linha in linhas if linha["status"] != "ok")
+    print(f"{len(linhas) - falhas} de {len(linhas)} projetos otimizados em "
+          f"{time.perf_counter() - inicio:.1f} s; resumo em {resumo}", file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
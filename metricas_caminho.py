@@ -0,0 +1,78 @@
+"""
+Métricas vetorizadas de um caminho da ferramenta.
+
+As coordenadas do ciclo inteiro são reunidas num único array (K x 2) e os
+comprimentos dos K-1 trechos são calculados de uma vez com NumPy. O tempo de
+movimento pode considerar o limite de aceleração da máquina: cada trecho parte
+e termina parado, com perfil de velocidade trapezoidal (ou triangular, se o
+trecho for curto demais para atingir a velocidade programada).
+
+Unidades: distâncias em mm, velocidades em mm/min, aceleração em mm/s² e
+tempos em minutos.
+"""
+
+import numpy as np
+
+from carteiro_chines import TIPO_DESLOCAMENTO
+
+
+def comprimentos_segmentos(pontos):
+    """Comprimento de cada trecho de uma sequência de pontos (array K x 2)."""
+    pontos = np.asarray(pontos, dtype=np.float64)
+    if len(pontos) < 2:
+        return np.zeros(0)
+    delta = np.diff(pontos, axis=0)
+    return np.hypot(delta[:, 0], delta[:, 1])
+
+
+def tempo_segmentos(comprimentos, velocidade, aceleracao=None):
+    """
+    Tempo (min) para percorrer cada trecho à velocidade dada (mm/min).
+    Sem aceleração (None ou <= 0) o tempo é apenas comprimento / velocidade.
+    """
+    comprimentos = np.asarray(comprimentos, dtype=np.float64)
+    if velocidade <= 0:
+        return np.zeros_like(comprimentos)
+    if not aceleracao or aceleracao <= 0:
+        return comprimentos / velocidade
+
+    a = aceleracao * 3600.0  # mm/s² -> mm/min²
+    # Distância necessária para acelerar até a velocidade e frear de volta.
+    distancia_critica = velocidade * velocidade / a
+    trapezoidal = comprimentos / velocidade + velocidade / a
+    triangular = 2.0 * np.sqrt(comprimentos / a)
+    return np.where(comprimentos >= distancia_critica, trapezoidal, triangular)
+
+
+def metricas_caminho(pontos, tipos=None, velocidade=100.0, velocidade_rapida=None, aceleracao=None):
+    """
+    Calcula, numa única passada, as métricas do caminho dado pelos pontos.
+
+    tipos[i] classifica o trecho i (TIPO_DESLOCAMENTO para movimento rápido);
+    deslocamentos usam velocidade_rapida (padrão: a velocidade de corte).
+    Retorna um dicionário com os comprimentos por trecho, as distâncias total,
+    de corte e de deslocamento e os tempos de corte, deslocamento e movimento.
+    """
+    comprimentos = comprimentos_segmentos(pontos)
+    if tipos is not None and len(tipos):
+        rapido = np.asarray(tipos) == TIPO_DESLOCAMENTO
+    else:
+        rapido = np.zeros(len(comprimentos), dtype=bool)
+
+    if velocidade_rapida is None:
+        velocidade_rapida = velocidade
+
+    corte = comprimentos[~rapido]
+    deslocamento = comprimentos[rapido]
+    tempo_corte = float(tempo_segmentos(corte, velocidade, aceleracao).sum())
+    tempo_deslocamento = float(tempo_segmentos(deslocamento, velocidade_rapida, aceleracao).sum())
+
+    return {
+        "comprimentos": comprimentos,
+        "distancia": float(comprimentos.sum()),
+        "distancia_corte": float(corte.sum()),
+        "distancia_deslocamento": float(deslocamento.sum()),
+        "tempo_corte": tempo_corte,
+        "tempo_deslocamento": tempo_deslocamento,
+        "tempo_movimento": tempo_corte + tempo_deslocamento,
+    }
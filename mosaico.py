@@ -0,0 +1,293 @@
+"""
+Consultas por região do grafo com nível de detalhe, para o endpoint /api/grafo/tile.
+
+Uma consulta exata não percorre o grafo inteiro: os vértices da caixa vêm da
+grade espacial do próprio grafo (grafo.indice) e as arestas de um
+IndiceArestas, grade em que cada aresta entra só nas células que atravessa
+(inclusive trajetórias longas cujos extremos estão fora da região). O
+IndiceArestas é montado uma vez por grafo e atualizado pelo histórico de
+alterações; só é refeito quando o histórico não cobre a versão indexada
+(limpeza, carga em bloco). As duas buscas param assim que passam de
+LIMITE_ELEMENTOS_EXATOS elementos.
+
+Se o resultado couber no limite ele é devolvido exato, no formato de
+GrafoEuleriano.to_dict; senão é devolvida a geometria agregada numa grade
+cujo tamanho de célula depende do zoom (PIXELS_POR_CELULA pixels na tela):
+um ponto por célula ocupada (centroide e contagem) e um segmento por par de
+células ligadas. As agregações são calculadas para o grafo inteiro, em arrays
+NumPy (GeometriaGrafo), só quando uma consulta agregada é feita, e
+reaproveitadas por todas as consultas da mesma versão; como a visão agregada
+não é editável, a versão raramente muda entre elas.
+"""
+
+import math
+import threading
+import weakref
+
+import numpy as np
+
+from indice_espacial import TAMANHO_CELULA_PADRAO, celulas_segmento
+
+
+LIMITE_ELEMENTOS_EXATOS = 20000  # vértices + arestas numa resposta exata
+PIXELS_POR_CELULA = 8  # lado da célula de agregação na tela
+NIVEL_MINIMO, NIVEL_MAXIMO = -30, 60  # células de 2**nivel unidades
+
+_geometrias = weakref.WeakKeyDictionary()  # grafo -> GeometriaGrafo da última versão agregada
+_indices = weakref.WeakKeyDictionary()  # grafo -> IndiceArestas
+_trava = threading.Lock()
+
+
+def nivel_agregacao(zoom):
+    """Nível da grade de agregação (células de 2**nivel unidades) para o zoom em pixels por unidade."""
+    nivel = math.ceil(math.log2(PIXELS_POR_CELULA / zoom))
+    return min(max(nivel, NIVEL_MINIMO), NIVEL_MAXIMO)
+
+
+def _segmento_cruza(xa, ya, xb, yb, caixa):
+    """Indica se o segmento tem algum ponto dentro da caixa (recorte de Liang e Barsky)."""
+    xmin, ymin, xmax, ymax = caixa
+    dx, dy = xb - xa, yb - ya
+    inicio, fim = 0.0, 1.0
+    for p, q in ((-dx, xa - xmin), (dx, xmax - xa), (-dy, ya - ymin), (dy, ymax - ya)):
+        if p == 0:
+            if q < 0:
+                return False
+        elif p < 0:
+            inicio = max(inicio, q / p)
+        else:
+            fim = min(fim, q / p)
+    return inicio <= fim
+
+
+class IndiceArestas:
+    """
+    Arestas do grafo numa grade uniforme com células do comprimento médio das
+    arestas; cada aresta entra só nas células que atravessa.
+    """
+
+    def __init__(self, grafo):
+        self.versao = grafo.versao
+        vertices = grafo.vertices
+        comprimento = sum(math.dist(vertices[o], vertices[d]) for o, d in grafo.arestas) / max(len(grafo.arestas), 1)
+        self.tamanho = comprimento if comprimento > 0 else TAMANHO_CELULA_PADRAO
+        self._segmentos = {}  # id -> (origem, destino, xa, ya, xb, yb, células)
+        self._incidentes = {}  # vértice -> {id: None}
+        self._celulas = {}  # (i, j) -> {id: None}
+        for identificador, origem, destino in grafo.arestas.itens():
+            self._inserir(identificador, origem, destino, vertices)
+
+    def _inserir(self, identificador, origem, destino, vertices):
+        (xa, ya), (xb, yb) = vertices[origem], vertices[destino]
+        celulas = tuple(celulas_segmento(xa, ya, xb, yb, self.tamanho))
+        self._segmentos[identificador] = (origem, destino, xa, ya, xb, yb, celulas)
+        for vertice in (origem, destino):
+            self._incidentes.setdefault(vertice, {})[identificador] = None
+        for celula in celulas:
+            self._celulas.setdefault(celula, {})[identificador] = None
+
+    def _retirar(self, identificador):
+        origem, destino, *_, celulas = self._segmentos.pop(identificador)
+        for vertice in (origem, destino):
+            incidentes = self._incidentes.get(vertice)
+            if incidentes is not None:
+                incidentes.pop(identificador, None)
+                if not incidentes:
+                    del self._incidentes[vertice]
+        for celula in celulas:
+            ids = self._celulas[celula]
+            ids.pop(identificador, None)
+            if not ids:
+                del self._celulas[celula]
+
+    def atualizar(self, grafo):
+        """
+        Traz o índice para a versão atual do grafo a partir do histórico de
+        alterações; retorna False se o histórico não cobre a versão indexada
+        (ou contém uma limpeza) e o índice precisa ser refeito.
+        """
+        delta = grafo.alteracoes_desde(self.versao)
+        if delta is None:
+            return False
+        # Só as arestas tocadas pelo delta são reindexadas, com as coordenadas atuais
+        sujas = {}
+        for operacao in delta["operacoes"]:
+            tipo = operacao["tipo"]
+            if tipo == "limpar":
+                return False
+            if tipo in ("adicionar_aresta", "remover_aresta"):
+                sujas[operacao["id"]] = None
+            elif tipo in ("mover_vertice", "remover_vertice"):
+                sujas.update(self._incidentes.get(operacao["nome"], {}))
+        por_id = grafo.arestas.por_id
+        for identificador in sujas:
+            if identificador in self._segmentos:
+                self._retirar(identificador)
+            if identificador in por_id:
+                self._inserir(identificador, *por_id[identificador], grafo.vertices)
+        self.versao = grafo.versao
+        return True
+
+    def _celulas_na_caixa(self, xmin, ymin, xmax, ymax):
+        """Células ocupadas que cruzam a caixa (percorre a menor das duas coleções)."""
+        i0, j0 = math.floor(xmin / self.tamanho), math.floor(ymin / self.tamanho)
+        i1, j1 = math.floor(xmax / self.tamanho), math.floor(ymax / self.tamanho)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(self._celulas):
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    celula = self._celulas.get((i, j))
+                    if celula:
+                        yield celula
+        else:
+            for (i, j), celula in self._celulas.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    yield celula
+
+    def na_caixa(self, caixa, limite=None):
+        """
+        Ids das arestas que passam pela caixa (xmin, ymin, xmax, ymax). Com
+        `limite`, a busca para e retorna None assim que passar de `limite` arestas.
+        """
+        encontradas = {}
+        for celula in self._celulas_na_caixa(*caixa):
+            for identificador in celula:
+                if identificador not in encontradas and _segmento_cruza(*self._segmentos[identificador][2:6], caixa):
+                    encontradas[identificador] = None
+                    if limite is not None and len(encontradas) > limite:
+                        return None
+        return list(encontradas)
+
+
+class GeometriaGrafo:
+    """Retrato imutável da geometria de uma versão do grafo, em arrays NumPy, para as agregações."""
+
+    def __init__(self, grafo):
+        self.versao = grafo.versao
+        self.nomes = list(grafo.vertices)
+        self.coordenadas = np.array(list(grafo.vertices.values()), dtype=np.float64).reshape(-1, 2)
+        indice = {nome: i for i, nome in enumerate(self.nomes)}
+        extremos = np.fromiter((indice[v] for par in grafo.arestas for v in par), dtype=np.int64,
+                               count=2 * len(grafo.arestas))
+        self.extremos = extremos.reshape(-1, 2)
+        self._agregacoes = {}
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def _cruzam(inicio, fim, caixa):
+        """Máscara dos segmentos cuja caixa envolvente cruza a caixa."""
+        xmin, ymin, xmax, ymax = caixa
+        return ((np.minimum(inicio[:, 0], fim[:, 0]) <= xmax) & (np.maximum(inicio[:, 0], fim[:, 0]) >= xmin)
+                & (np.minimum(inicio[:, 1], fim[:, 1]) <= ymax) & (np.maximum(inicio[:, 1], fim[:, 1]) >= ymin))
+
+    @staticmethod
+    def _dentro(pontos, caixa):
+        xmin, ymin, xmax, ymax = caixa
+        return ((pontos[:, 0] >= xmin) & (pontos[:, 0] <= xmax)
+                & (pontos[:, 1] >= ymin) & (pontos[:, 1] <= ymax))
+
+    def agregacao(self, nivel):
+        """(centroides, contagens, pares de células, contagens dos pares) do grafo inteiro no nível."""
+        with self._trava:
+            if nivel not in self._agregacoes:
+                self._agregacoes[nivel] = self._agregar(2.0 ** nivel)
+            return self._agregacoes[nivel]
+
+    def _agregar(self, tamanho):
+        celulas = np.floor(self.coordenadas / tamanho).astype(np.int64)
+        _, grupo, contagens = np.unique(celulas, axis=0, return_inverse=True, return_counts=True)
+        grupo = grupo.ravel()
+        centroides = np.column_stack((
+            np.bincount(grupo, weights=self.coordenadas[:, 0]),
+            np.bincount(grupo, weights=self.coordenadas[:, 1])
+        )) / contagens[:, None]
+        # Centésimos da célula bastam para desenhar e encurtam bastante o JSON
+        centroides = np.round(centroides, max(0, 2 - math.floor(math.log10(tamanho))))
+        pares = np.sort(grupo[self.extremos], axis=1)
+        pares = pares[pares[:, 0] != pares[:, 1]]  # arestas dentro de uma célula somem
+        pares, multiplicidade = np.unique(pares, axis=0, return_counts=True)
+        return centroides, contagens, pares.reshape(-1, 2), multiplicidade
+
+    def regiao(self, caixa, nivel):
+        """Geometria agregada no nível dentro da caixa (xmin, ymin, xmax, ymax)."""
+        centroides, contagens, pares, multiplicidade = self.agregacao(nivel)
+        pontos = np.flatnonzero(self._dentro(centroides, caixa))
+        segmentos = np.flatnonzero(self._cruzam(centroides[pares[:, 0]], centroides[pares[:, 1]], caixa))
+        ligados = pares[segmentos]
+        return {
+            "nivel": "agregado",
+            "celula": 2.0 ** nivel,
+            "pontos": np.column_stack((centroides[pontos], contagens[pontos])).tolist(),
+            "segmentos": np.column_stack((centroides[ligados[:, 0]], centroides[ligados[:, 1]],
+                                          multiplicidade[segmentos])).tolist()
+        }
+
+
+def limites(grafo):
+    """Caixa envolvente [xmin, ymin, xmax, ymax] dos vértices, ou None se o grafo está vazio."""
+    if not grafo.vertices:
+        return None
+    coordenadas = np.array(list(grafo.vertices.values()), dtype=np.float64).reshape(-1, 2)
+    return [*coordenadas.min(axis=0).tolist(), *coordenadas.max(axis=0).tolist()]
+
+
+def indice_arestas(grafo):
+    """IndiceArestas do grafo na versão atual (atualizado pelo histórico, refeito só se preciso)."""
+    with _trava:
+        indice = _indices.get(grafo)
+    if indice is None or (indice.versao != grafo.versao and not indice.atualizar(grafo)):
+        indice = IndiceArestas(grafo)
+        with _trava:
+            _indices[grafo] = indice
+    return indice
+
+
+def regiao_exata(grafo, caixa, limite=LIMITE_ELEMENTOS_EXATOS):
+    """
+    Vértices e arestas do grafo na caixa, no formato de GrafoEuleriano.to_dict,
+    ou None se passarem de `limite` elementos.
+    """
+    nomes = grafo.indice.na_caixa(*caixa, limite=limite)
+    if nomes is None:
+        return None
+    ids = indice_arestas(grafo).na_caixa(caixa, limite - len(nomes))
+    if ids is None:
+        return None
+    # Extremos de arestas que saem da região também são enviados, para desenhá-las inteiras
+    arestas = [grafo.arestas.por_id[identificador] for identificador in ids]
+    usados = dict.fromkeys(nomes)
+    for origem, destino in arestas:
+        usados[origem] = usados[destino] = None
+    vertices = grafo.vertices
+    return {
+        "nivel": "exato",
+        "vertices": {nome: {"x": vertices[nome][0], "y": vertices[nome][1]} for nome in usados},
+        "arestas": [[origem, destino] for origem, destino in arestas]
+    }
+
+
+def geometria(grafo):
+    """GeometriaGrafo da versão atual do grafo (refeita só quando a versão muda)."""
+    with _trava:
+        atual = _geometrias.get(grafo)
+    if atual is None or atual.versao != grafo.versao:
+        atual = GeometriaGrafo(grafo)
+        with _trava:
+            _geometrias[grafo] = atual
+    return atual
+
+
+def consultar_regiao(grafo, caixa, zoom):
+    """Resposta de /api/grafo/tile: geometria da região com o nível de detalhe do zoom."""
+    xmin, ymin, xmax, ymax = caixa
+    if not all(math.isfinite(valor) for valor in caixa):
+        raise ValueError("bbox deve ter quatro números finitos")
+    if not (xmin <= xmax and ymin <= ymax):
+        raise ValueError("bbox deve ser xmin,ymin,xmax,ymax com xmin <= xmax e ymin <= ymax")
+    if not (zoom > 0 and math.isfinite(zoom)):
+        raise ValueError("zoom deve ser um número positivo")
+    resposta = regiao_exata(grafo, caixa)
+    if resposta is None:
+        resposta = geometria(grafo).regiao(caixa, nivel_agregacao(zoom))
+    resposta["versao"] = grafo.versao
+    resposta["bbox"] = list(caixa)
+    return resposta
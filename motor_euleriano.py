@@ -0,0 +1,83 @@
+"""
+Motor de busca de ciclos eulerianos em tempo linear.
+
+Trabalha sobre uma estrutura de adjacência compacta (vértices e arestas
+identificados por inteiros) e implementa o algoritmo de Hierholzer com pilha,
+cursores de aresta por vértice e um mapa de bits de arestas usadas, em O(V+E).
+"""
+
+
+def construir_adjacencia(num_vertices, origens, destinos):
+    """
+    Monta a adjacência compacta (formato CSR) de um multigrafo não direcionado.
+
+    Retorna (inicio, adjacentes): as arestas incidentes ao vértice v são
+    adjacentes[inicio[v]:inicio[v + 1]], identificadas pelo índice da aresta.
+    """
+    grau = [0] * num_vertices
+    for u in origens:
+        grau[u] += 1
+    for v in destinos:
+        grau[v] += 1
+
+    inicio = [0] * (num_vertices + 1)
+    for v in range(num_vertices):
+        inicio[v + 1] = inicio[v] + grau[v]
+
+    adjacentes = [0] * inicio[num_vertices]
+    posicao = inicio[:-1]
+    for aresta, (u, v) in enumerate(zip(origens, destinos)):
+        adjacentes[posicao[u]] = aresta
+        posicao[u] += 1
+        adjacentes[posicao[v]] = aresta
+        posicao[v] += 1
+
+    return inicio, adjacentes
+
+
+def hierholzer(num_vertices, origens, destinos, vertice_inicial=0, adjacencia=None):
+    """
+    Encontra um ciclo euleriano a partir de vertice_inicial.
+
+    origens[e] e destinos[e] são os extremos (índices inteiros) da aresta e.
+    Retorna (ciclo, arestas): a sequência de vértices, que começa e termina em
+    vertice_inicial, e os índices das arestas percorridas, em que arestas[i]
+    liga ciclo[i] a ciclo[i + 1]. Apenas o componente de vertice_inicial é
+    percorrido; arestas de outros componentes ficam de fora do resultado.
+    """
+    if adjacencia is None:
+        adjacencia = construir_adjacencia(num_vertices, origens, destinos)
+    inicio, adjacentes = adjacencia
+
+    cursor = inicio[:-1]
+    usada = bytearray(len(origens))
+
+    pilha_vertices = [vertice_inicial]
+    pilha_arestas = [-1]
+    ciclo = []
+    arestas = []
+
+    while pilha_vertices:
+        v = pilha_vertices[-1]
+        c = cursor[v]
+        fim = inicio[v + 1]
+        while c < fim and usada[adjacentes[c]]:
+            c += 1
+
+        if c == fim:
+            cursor[v] = c
+            ciclo.append(pilha_vertices.pop())
+            aresta = pilha_arestas.pop()
+            if aresta >= 0:
+                arestas.append(aresta)
+        else:
+            aresta = adjacentes[c]
+            cursor[v] = c + 1
+            usada[aresta] = 1
+            proximo = destinos[aresta] if origens[aresta] == v else origens[aresta]
+            pilha_vertices.append(proximo)
+            pilha_arestas.append(aresta)
+
+    ciclo.reverse()
+    arestas.reverse()
+    return ciclo, arestas
@@ -0,0 +1,437 @@
+"""
+Núcleo do sistema de corte, sem dependências de interface gráfica.
+
+Reúne o grafo de corte (GrafoEuleriano) e o pipeline de otimização (validação,
+rota, métricas e G-code) usados pelas duas interfaces (app.py e
+ciclo_euleriano_corte.py), pelas tarefas em segundo plano e pelo lote.
+Importações pesadas ficam fora do caminho de inicialização: networkx só é
+carregado no emparelhamento exato e tkinter/matplotlib só pela interface
+desktop. O tempo de importação pode ser conferido com
+
+    python -m nucleo --tempo-importacao
+"""
+
+import math
+import sys
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from armazem_arestas import ArmazemArestas
+from compactacao_gcode import comparar_programas
+from gcode import linhas_gcode, linhas_programa
+from indice_espacial import GradeEspacial
+from metricas_caminho import comprimentos_segmentos, metricas_caminho
+from motor_euleriano import hierholzer
+from sequenciamento import planejar_rota
+from status_euleriano import StatusEuleriano
+
+
+# Número máximo de alterações guardadas para respostas incrementais (delta)
+LIMITE_ALTERACOES = 10000
+# Fases do pipeline de otimização, na ordem em que são informadas ao progresso
+FASES = ("validacao", "emparelhamento", "ciclo", "gcode")
+
+# Módulos que não podem ser carregados ao importar o núcleo
+MODULOS_PESADOS = ("networkx", "matplotlib", "tkinter", "scipy", "flask")
+LIMITE_IMPORTACAO = 0.3  # segundos
+
+
+class GrafoEuleriano:
+    """Classe para representar e manipular grafos e encontrar ciclos eulerianos."""
+    
+    def __init__(self):
+        self.vertices = {}
+        self.indice = GradeEspacial()
+        self.arestas = ArmazemArestas()
+        self.status = StatusEuleriano()
+        self.versao = 0
+        self.alteracoes = deque(maxlen=LIMITE_ALTERACOES)
+        
+    def _registrar(self, operacao):
+        """Registra uma alteração no histórico versionado."""
+        self.versao += 1
+        self.alteracoes.append((self.versao, operacao))
+        
+    def alteracoes_desde(self, versao):
+        """
+        Retorna o delta (lista ordenada de operações) desde a versão informada,
+        ou None se ela não estiver mais no histórico e o cliente precisar do grafo completo.
+        """
+        if versao is None or versao > self.versao:
+            return None
+        if versao == self.versao:
+            return {"versao": self.versao, "operacoes": []}
+        if not self.alteracoes or versao < self.alteracoes[0][0] - 1:
+            return None
+        inicio = versao + 1 - self.alteracoes[0][0]
+        return {
+            "versao": self.versao,
+            "operacoes": [operacao for _, operacao in islice(self.alteracoes, inicio, None)]
+        }
+        
+    def limpar(self):
+        """Remove todos os vértices e arestas, mantendo o histórico de versões."""
+        self.vertices = {}
+        self.indice = GradeEspacial()
+        self.arestas = ArmazemArestas()
+        self.status = StatusEuleriano()
+        # Alterações anteriores à limpeza não precisam mais ser reaplicadas
+        self.alteracoes.clear()
+        self._registrar({"tipo": "limpar"})
+        
+    def adicionar_vertice(self, nome, x, y):
+        """Adiciona um vértice ao grafo."""
+        # O índice é atualizado primeiro: se ele rejeitar as coordenadas, o grafo não muda
+        self.indice.adicionar(nome, x, y)
+        self.vertices[nome] = (x, y)
+        self.status.adicionar_vertice(nome)
+        self._registrar({"tipo": "adicionar_vertice", "nome": nome, "x": float(x), "y": float(y)})
+        
+    def adicionar_aresta(self, origem, destino, peso=1):
+        """Adiciona uma aresta ao grafo e retorna seu identificador estável."""
+        self.status.adicionar_aresta(origem, destino)
+        identificador = self.arestas.adicionar(origem, destino)
+        self._registrar({"tipo": "adicionar_aresta", "id": identificador, "origem": origem, "destino": destino})
+        return identificador
+        
+    def mover_vertice(self, nome, x, y):
+        """Altera as coordenadas de um vértice, mantendo suas arestas."""
+        self.indice.mover(nome, x, y)
+        self.vertices[nome] = (x, y)
+        self._registrar({"tipo": "mover_vertice", "nome": nome, "x": float(x), "y": float(y)})
+        
+    def aplicar_operacoes(self, operacoes):
+        """
+        Aplica uma lista ordenada de operações de forma atômica.
+        Todas são validadas antes de qualquer alteração; em caso de erro levanta
+        ValueError e o grafo permanece inalterado.
+        """
+        validadas = []
+        adicionados, removidos = set(), set()
+        
+        def existe(nome):
+            return nome in adicionados or (nome in self.vertices and nome not in removidos)
+        
+        for indice, operacao in enumerate(operacoes, 1):
+            tipo = operacao.get("tipo")
+            try:
+                if tipo == "limpar":
+                    removidos.update(self.vertices)
+                    adicionados.clear()
+                    validadas.append((tipo,))
+                elif tipo in ("adicionar_vertice", "mover_vertice"):
+                    nome = operacao.get("nome")
+                    x, y = float(operacao["x"]), float(operacao["y"])
+                    if not (math.isfinite(x) and math.isfinite(y)):
+                        raise ValueError("coordenadas devem ser números finitos")
+                    if not nome:
+                        raise ValueError("nome do ponto não informado")
+                    if tipo == "adicionar_vertice" and existe(nome):
+                        raise ValueError(f"Ponto '{nome}' já existe!")
+                    if tipo == "mover_vertice" and not existe(nome):
+                        raise ValueError(f"Ponto '{nome}' não encontrado!")
+                    adicionados.add(nome)
+                    validadas.append((tipo, nome, x, y))
+                elif tipo == "remover_vertice":
+                    nome = operacao.get("nome")
+                    if not existe(nome):
+                        raise ValueError(f"Ponto '{nome}' não encontrado!")
+                    adicionados.discard(nome)
+                    removidos.add(nome)
+                    validadas.append((tipo, nome))
+                elif tipo in ("adicionar_aresta", "remover_aresta"):
+                    origem, destino = operacao.get("origem"), operacao.get("destino")
+                    if tipo == "adicionar_aresta" and not (existe(origem) and existe(destino)):
+                        raise ValueError("Pontos não encontrados!")
+                    validadas.append((tipo, origem, destino))
+                else:
+                    raise ValueError(f"tipo de operação desconhecido: {tipo!r}")
+            except KeyError as erro:
+                raise ValueError(f"Operação {indice}: campo {erro} ausente") from erro
+            except (TypeError, ValueError) as erro:
+                raise ValueError(f"Operação {indice}: {erro}") from erro
+                
+        for tipo, *argumentos in validadas:
+            if tipo == "limpar":
+                self.limpar()
+            elif tipo == "adicionar_vertice":
+                self.adicionar_vertice(*argumentos)
+            elif tipo == "mover_vertice":
+                self.mover_vertice(*argumentos)
+            elif tipo == "remover_vertice":
+                self.remover_vertice(*argumentos)
+            elif tipo == "adicionar_aresta":
+                self.adicionar_aresta(*argumentos)
+            elif tipo == "remover_aresta":
+                self.remover_aresta(*argumentos)
+        
+    def remover_vertice(self, nome):
+        """Remove um vértice do grafo."""
+        if nome in self.vertices:
+            for _, origem, destino in self.arestas.remover_vertice(nome):
+                self.status.remover_aresta(origem, destino)
+            self.status.remover_vertice(nome)
+            del self.vertices[nome]
+            self.indice.remover(nome)
+            self._registrar({"tipo": "remover_vertice", "nome": nome})
+            
+    def remover_aresta(self, origem, destino):
+        """Remove uma aresta do grafo."""
+        if self.arestas.contem(origem, destino):
+            identificador = self.arestas.remover(origem, destino)
+            self.status.remover_aresta(origem, destino)
+            self._registrar({"tipo": "remover_aresta", "id": identificador, "origem": origem, "destino": destino})
+                
+    def ponto_proximo(self, x, y, raio):
+        """Vértice mais próximo de (x, y) a distância menor que raio, ou None (índice espacial)."""
+        return self.indice.mais_proximo(x, y, raio)
+        
+    def vertices_na_regiao(self, xmin, ymin, xmax, ymax):
+        """Nomes dos vértices dentro do retângulo (limites inclusivos)."""
+        return self.indice.na_caixa(xmin, ymin, xmax, ymax)
+        
+    def grau(self, nome):
+        """Número de trajetórias que chegam ao vértice (laços contam duas vezes)."""
+        return self.status.grau.get(nome, 0)
+        
+    def verificar_euleriano(self):
+        """Verifica se o grafo possui um ciclo euleriano (status mantido incrementalmente)."""
+        return self.status.verificar()
+        
+    def verificar_rota(self, estrategia="euleriano"):
+        """
+        Verifica se a chapa pode ser otimizada peça a peça.
+        Componentes desconexos são permitidos (ligados por deslocamentos rápidos);
+        na estratégia euleriana todos os vértices precisam ter grau par.
+        """
+        if self.status.num_arestas == 0:
+            return False, "Nenhuma trajetória definida"
+
+        graus_impares = list(self.status.impares)
+        if graus_impares and estrategia != "carteiro":
+            return False, f"Vértices com grau ímpar: {graus_impares}"
+
+        num_pecas = self.status.num_componentes - self.status.num_isolados
+        mensagem = f"{num_pecas} peça(s)"
+        if graus_impares:
+            mensagem += f", {len(graus_impares)} vértices com grau ímpar serão emparelhados"
+        return True, mensagem
+
+    def encontrar_ciclo_euleriano(self):
+        """Encontra um ciclo euleriano usando o algoritmo de Hierholzer."""
+        ciclo, _ = self.encontrar_ciclo_euleriano_com_arestas()
+        return ciclo
+
+    def encontrar_ciclo_euleriano_com_arestas(self):
+        """
+        Encontra um ciclo euleriano e as arestas percorridas.
+        Retorna (ciclo, arestas), em que arestas[i] é o identificador estável da aresta
+        que liga ciclo[i] a ciclo[i+1], distinguindo arestas paralelas.
+        """
+        if len(self.arestas) == 0:
+            return [], []
+
+        nomes = list(self.vertices)
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        ids = list(self.arestas.por_id)
+        origens = [indices[u] for u, _ in self.arestas]
+        destinos = [indices[v] for _, v in self.arestas]
+
+        ciclo, arestas = hierholzer(len(nomes), origens, destinos, 0)
+        return [nomes[i] for i in ciclo], [ids[e] for e in arestas]
+        
+    def otimizar_rota(self, estrategia="euleriano", processos=None, progresso=None):
+        """
+        Planeja a rota da ferramenta para toda a chapa, peça a peça.
+        Retorna (ciclo, tipos), em que tipos[i] classifica o trecho ciclo[i] -> ciclo[i+1]
+        como corte, repetição de corte ou deslocamento rápido entre pontos/peças.
+        """
+        nomes = list(self.vertices)
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        origens = [indices[u] for u, _ in self.arestas]
+        destinos = [indices[v] for _, v in self.arestas]
+
+        ciclo, tipos = planejar_rota(
+            [self.vertices[nome] for nome in nomes], origens, destinos,
+            estrategia=estrategia, processos=processos, progresso=progresso
+        )
+        return [nomes[i] for i in ciclo], tipos
+        
+    def calcular_distancia_total(self, caminho):
+        """Calcula a distância total percorrida no caminho."""
+        return float(comprimentos_segmentos(self.pontos_caminho(caminho)).sum())
+        
+    def calcular_metricas(self, caminho, tipos=None, velocidade=100.0, velocidade_rapida=None, aceleracao=None):
+        """Distâncias de corte/deslocamento e tempos do caminho (ver metricas_caminho)."""
+        return metricas_caminho(self.pontos_caminho(caminho), tipos,
+                                velocidade, velocidade_rapida, aceleracao)
+        
+    def pontos_caminho(self, caminho):
+        """Coordenadas (x, y) dos vértices do caminho, na ordem do caminho."""
+        return [self.vertices[nome] for nome in caminho]
+    
+    def to_dict(self):
+        """Converte o grafo para dicionário."""
+        return {
+            "vertices": {nome: {"x": float(pos[0]), "y": float(pos[1])} 
+                       for nome, pos in self.vertices.items()},
+            "arestas": list(self.arestas)
+        }
+    
+    def from_dict(self, dados):
+        """Carrega o grafo de um dicionário."""
+        self.limpar()
+        
+        for nome, pos in dados.get("vertices", {}).items():
+            self.adicionar_vertice(nome, pos["x"], pos["y"])
+            
+        for origem, destino in dados.get("arestas", []):
+            self.adicionar_aresta(origem, destino)
+
+    def carregar_arrays(self, nomes, coordenadas, extremos, indice=None):
+        """
+        Carrega o grafo a partir de nomes, coordenadas (N x 2) e extremos das
+        arestas (M x 2, índices em nomes), como GrafoCompacto.carregar_arrays.
+        As operações não entram no histórico: a carga conta como uma única
+        versão nova, e clientes desatualizados recebem o grafo completo.
+        """
+        nomes = list(nomes)
+        if len(indice if indice is not None else set(nomes)) != len(nomes):
+            raise ValueError("nomes de vértices repetidos")
+        coordenadas = np.asarray(coordenadas, dtype=np.float64).reshape(-1, 2)
+        if not np.isfinite(coordenadas).all():
+            raise ValueError("coordenadas devem ser números finitos")
+        coordenadas = [tuple(pos) for pos in coordenadas.tolist()]
+        extremos = np.asarray(extremos, dtype=np.int64).reshape(-1, 2).tolist()
+
+        self.vertices = dict(zip(nomes, coordenadas))
+        self.indice = GradeEspacial()
+        self.arestas = ArmazemArestas()
+        self.status = StatusEuleriano()
+        for nome, (x, y) in self.vertices.items():
+            self.indice.adicionar(nome, x, y)
+            self.status.adicionar_vertice(nome)
+        for origem, destino in extremos:
+            origem, destino = nomes[origem], nomes[destino]
+            self.status.adicionar_aresta(origem, destino)
+            self.arestas.adicionar(origem, destino)
+        self.alteracoes.clear()
+        self.versao += 1
+
+
+def _sem_progresso(fase, fracao):
+    pass
+
+
+def otimizar_grafo(grafo, parametros, processos=None, progresso=None):
+    """
+    Pipeline completo de otimização de um grafo (GrafoEuleriano ou GrafoCompacto).
+    Retorna o resultado (ciclo, tipos, pontos, métricas e compactação) ou
+    levanta ValueError com a mensagem de erro.
+    """
+    if progresso is None:
+        progresso = _sem_progresso
+    estrategia = parametros["estrategia"]
+    velocidade = parametros["velocidade"]
+
+    progresso("validacao", 0.0)
+    otimizavel, mensagem = grafo.verificar_rota(estrategia)
+    if not otimizavel:
+        raise ValueError(mensagem)
+    progresso("validacao", 1.0)
+
+    ciclo, tipos = grafo.otimizar_rota(estrategia, processos=processos, progresso=progresso)
+    if not ciclo:
+        raise ValueError("Nenhum ciclo encontrado")
+
+    progresso("gcode", 0.0)
+    metricas = grafo.calcular_metricas(ciclo, tipos, velocidade,
+                                       velocidade_rapida=parametros["velocidade_rapida"],
+                                       aceleracao=parametros["aceleracao"])
+    pontos = grafo.pontos_caminho(ciclo)
+    if not isinstance(pontos, list):
+        pontos = pontos.tolist()
+    compactacao = None
+    if parametros["compactar"]:
+        compactacao = comparar_programas(
+            linhas_gcode(ciclo, tipos, pontos, velocidade),
+            linhas_programa(ciclo, tipos, pontos, velocidade, True, parametros["tolerancia"])
+        )
+    progresso("gcode", 1.0)
+
+    return {
+        "ciclo": ciclo,
+        "tipos": tipos,
+        "pontos": pontos,
+        "metricas": {nome: valor for nome, valor in metricas.items() if nome != "comprimentos"},
+        "compactacao": compactacao
+    }
+
+
+def medir_importacao(modulo="nucleo", repeticoes=5):
+    """
+    Mede a importação a frio do módulo em interpretadores novos (python -X importtime).
+    Retorna o tempo mediano (s), os módulos mais caros (tempo próprio, s) e os
+    módulos de MODULOS_PESADOS que foram carregados.
+    """
+    import re
+    import subprocess
+
+    linha_tempo = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+    totais, proprios, pesados = [], {}, set()
+    for _ in range(repeticoes):
+        processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                                  capture_output=True, text=True, check=True)
+        total = 0.0
+        for linha in processo.stderr.splitlines():
+            encontrado = linha_tempo.match(linha)
+            if not encontrado:
+                continue
+            proprio, acumulado, nome = encontrado.groups()
+            proprios[nome] = max(proprios.get(nome, 0.0), int(proprio) / 1e6)
+            if nome.split(".")[0] in MODULOS_PESADOS:
+                pesados.add(nome.split(".")[0])
+            if nome == modulo:
+                total = int(acumulado) / 1e6
+        totais.append(total)
+    return {
+        "segundos": sorted(totais)[len(totais) // 2],
+        "maiores": sorted(proprios.items(), key=lambda item: -item[1])[:10],
+        "pesados": sorted(pesados)
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Utilitários do núcleo do sistema de corte.")
+    parser.add_argument("--tempo-importacao", action="store_true",
+                        help="mede a importação a frio do núcleo e falha se ficar lenta ou carregar módulos pesados")
+    parser.add_argument("--modulo", default="nucleo", help="módulo a medir (padrão: nucleo)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite", type=float, default=LIMITE_IMPORTACAO, help="tempo máximo aceito (s)")
+    args = parser.parse_args(argv)
+
+    if not args.tempo_importacao:
+        parser.print_help()
+        return 0
+
+    medicao = medir_importacao(args.modulo, args.repeticoes)
+    print(f"Importação de {args.modulo}: {medicao['segundos'] * 1000:.1f} ms "
+          f"(mediana de {args.repeticoes}, limite {args.limite * 1000:.0f} ms)")
+    print("Módulos mais caros (tempo próprio):")
+    for nome, segundos in medicao["maiores"]:
+        print(f"  {segundos * 1000:8.1f} ms  {nome}")
+    if medicao["pesados"]:
+        print(f"Erro: módulos pesados carregados: {', '.join(medicao['pesados'])}", file=sys.stderr)
+        return 1
+    if medicao["segundos"] > args.limite:
+        print("Erro: importação acima do limite", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
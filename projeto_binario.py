@@ -0,0 +1,192 @@
+"""
+Formato binário compacto de projetos (.cgb), carregado por mapeamento em memória.
+
+Alternativa ao JSON de salvar_grafo para projetos grandes. Layout (little-endian):
+
+    cabeçalho (64 bytes)   MAGICA, versão do formato, reservado, número de
+                           vértices, número de arestas e deslocamento de cada
+                           bloco (coordenadas, arestas, nomes) e tamanho dos nomes
+    coordenadas            float64, N x 2 (x, y)
+    arestas                int32, M x 2 (índices dos vértices)
+    nomes                  UTF-8, nomes dos vértices separados por NUL
+
+Os blocos começam em posições múltiplas de 8. Coordenadas e arestas são lidas
+com numpy.memmap, sem interpretar elemento a elemento; os nomes são
+decodificados de uma só vez. ProjetoBinario converte de e para o esquema JSON
+({"vertices": {nome: {"x", "y"}}, "arestas": [[origem, destino], ...]}), e
+abrir_projeto carrega qualquer um dos dois formatos num grafo:
+
+    python -m projeto_binario para-binario projeto.json [projeto.cgb]
+    python -m projeto_binario para-json projeto.cgb [projeto.json]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+
+MAGICA = b"CORTEGRF"
+VERSAO_FORMATO = 1
+EXTENSAO = ".cgb"
+# magica, versao, reservado, vertices, arestas, pos. coordenadas, pos. arestas, pos. nomes, tamanho nomes
+CABECALHO = struct.Struct("<8sII6Q")
+SEPARADOR_NOMES = "\0"
+
+
+def _alinhar(posicao):
+    return (posicao + 7) // 8 * 8
+
+
+class ProjetoBinario:
+    """Nomes, coordenadas (N x 2, float64) e extremos das arestas (M x 2, int32) de um projeto."""
+
+    def __init__(self, nomes, coordenadas, arestas):
+        self.nomes = list(nomes)
+        self.coordenadas = np.asarray(coordenadas, dtype=np.float64).reshape(-1, 2)
+        self.arestas = np.asarray(arestas, dtype=np.int32).reshape(-1, 2)
+        if len(self.coordenadas) != len(self.nomes):
+            raise ValueError(f"{len(self.nomes)} nomes para {len(self.coordenadas)} coordenadas")
+        if len(self.arestas) and (self.arestas.min() < 0 or self.arestas.max() >= len(self.nomes)):
+            raise ValueError("aresta com índice de vértice fora do intervalo")
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Projeto a partir do esquema JSON (to_dict / salvar_grafo)."""
+        vertices = dados.get("vertices", {})
+        nomes = list(vertices)
+        indice = {nome: i for i, nome in enumerate(nomes)}
+        try:
+            arestas = [(indice[origem], indice[destino]) for origem, destino in dados.get("arestas", [])]
+        except KeyError as erro:
+            raise ValueError(f"aresta com vértice inexistente: {erro.args[0]}") from None
+        coordenadas = [(pos["x"], pos["y"]) for pos in vertices.values()]
+        return cls(nomes, coordenadas, arestas)
+
+    @classmethod
+    def de_grafo(cls, grafo):
+        """Projeto a partir de um GrafoEuleriano ou GrafoCompacto."""
+        nomes = list(grafo.vertices)
+        indice = {nome: i for i, nome in enumerate(nomes)}
+        arestas = [(indice[origem], indice[destino]) for origem, destino in grafo.arestas]
+        return cls(nomes, [grafo.vertices[nome] for nome in nomes], arestas)
+
+    def para_dict(self):
+        """Projeto no esquema JSON."""
+        nomes = self.nomes
+        return {
+            "vertices": {nome: {"x": x, "y": y} for nome, (x, y) in zip(nomes, self.coordenadas.tolist())},
+            "arestas": [[nomes[o], nomes[d]] for o, d in self.arestas.tolist()]
+        }
+
+    def para_grafo(self, classe):
+        """Carrega o projeto num grafo novo da classe (de uma só vez, se ela tiver carregar_arrays)."""
+        grafo = classe()
+        if hasattr(grafo, "carregar_arrays"):
+            grafo.carregar_arrays(self.nomes, self.coordenadas, self.arestas)
+            return grafo
+        nomes = self.nomes
+        for nome, (x, y) in zip(nomes, self.coordenadas.tolist()):
+            grafo.adicionar_vertice(nome, x, y)
+        for origem, destino in self.arestas.tolist():
+            grafo.adicionar_aresta(nomes[origem], nomes[destino])
+        return grafo
+
+    def salvar(self, caminho):
+        """Grava o projeto no formato binário."""
+        if any(SEPARADOR_NOMES in nome for nome in self.nomes):
+            raise ValueError("nomes de vértices não podem conter o caractere NUL")
+        nomes = SEPARADOR_NOMES.join(self.nomes).encode("utf-8")
+        pos_coordenadas = _alinhar(CABECALHO.size)
+        pos_arestas = _alinhar(pos_coordenadas + self.coordenadas.nbytes)
+        pos_nomes = _alinhar(pos_arestas + self.arestas.nbytes)
+        with open(caminho, "wb") as f:
+            f.write(CABECALHO.pack(MAGICA, VERSAO_FORMATO, 0, len(self.nomes), len(self.arestas),
+                                   pos_coordenadas, pos_arestas, pos_nomes, len(nomes)))
+            for posicao, bloco in ((pos_coordenadas, self.coordenadas.astype("<f8", copy=False)),
+                                   (pos_arestas, self.arestas.astype("<i4", copy=False)),
+                                   (pos_nomes, nomes)):
+                f.write(b"\0" * (posicao - f.tell()))
+                f.write(bloco.tobytes() if isinstance(bloco, np.ndarray) else bloco)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê um arquivo binário; coordenadas e arestas ficam mapeadas em memória (somente leitura)."""
+        tamanho = os.path.getsize(caminho)
+        with open(caminho, "rb") as f:
+            cabecalho = f.read(CABECALHO.size)
+            if len(cabecalho) < CABECALHO.size or not cabecalho.startswith(MAGICA):
+                raise ValueError(f"{caminho}: não é um projeto binário")
+            (_, versao, _, num_vertices, num_arestas,
+             pos_coordenadas, pos_arestas, pos_nomes, tamanho_nomes) = CABECALHO.unpack(cabecalho)
+            if versao > VERSAO_FORMATO:
+                raise ValueError(f"{caminho}: versão {versao} do formato não suportada (máximo {VERSAO_FORMATO})")
+            if (pos_coordenadas + 16 * num_vertices > tamanho or pos_arestas + 8 * num_arestas > tamanho
+                    or pos_nomes + tamanho_nomes > tamanho):
+                raise ValueError(f"{caminho}: arquivo truncado")
+            f.seek(pos_nomes)
+            texto = f.read(tamanho_nomes).decode("utf-8")
+        nomes = texto.split(SEPARADOR_NOMES) if num_vertices else []
+        coordenadas = np.memmap(caminho, dtype="<f8", mode="r", offset=pos_coordenadas,
+                                shape=(num_vertices, 2)) if num_vertices else np.empty((0, 2))
+        arestas = np.memmap(caminho, dtype="<i4", mode="r", offset=pos_arestas,
+                            shape=(num_arestas, 2)) if num_arestas else np.empty((0, 2), dtype=np.int32)
+        return cls(nomes, coordenadas, arestas)
+
+
+def eh_binario(caminho):
+    """Indica se o arquivo começa com a assinatura do formato binário."""
+    with open(caminho, "rb") as f:
+        return f.read(len(MAGICA)) == MAGICA
+
+
+def ler_projeto(caminho):
+    """ProjetoBinario de um arquivo em qualquer um dos formatos (binário ou JSON)."""
+    if eh_binario(caminho):
+        return ProjetoBinario.carregar(caminho)
+    with open(caminho, "r", encoding="utf-8") as f:
+        return ProjetoBinario.de_dict(json.load(f))
+
+
+def abrir_projeto(caminho, classe):
+    """Carrega um projeto binário ou JSON num grafo novo da classe."""
+    if eh_binario(caminho):
+        return ProjetoBinario.carregar(caminho).para_grafo(classe)
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    grafo = classe()
+    grafo.from_dict(dados)
+    return grafo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversão entre projetos JSON e o formato binário (.cgb).")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    for nome, ajuda in (("para-binario", "converte JSON em binário"), ("para-json", "converte binário em JSON")):
+        subcomando = subcomandos.add_parser(nome, help=ajuda)
+        subcomando.add_argument("entrada")
+        subcomando.add_argument("saida", nargs="?", default=None)
+    args = parser.parse_args(argv)
+
+    base = os.path.splitext(args.entrada)[0]
+    try:
+        projeto = ler_projeto(args.entrada)
+        if args.comando == "para-binario":
+            saida = args.saida or base + EXTENSAO
+            projeto.salvar(saida)
+        else:
+            saida = args.saida or base + ".json"
+            with open(saida, "w", encoding="utf-8") as f:
+                json.dump(projeto.para_dict(), f)
+    except (OSError, ValueError, KeyError) as erro:
+        print(f"Erro: {erro}", file=sys.stderr)
+        return 1
+    print(f"{len(projeto.nomes)} vértices e {len(projeto.arestas)} arestas gravados em {saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Registro de projetos (grafos) do backend web.
+
+Cada projeto tem seu próprio grafo e sua própria trava, de modo que várias
+células de corte podem ser atendidas pelo mesmo processo num servidor WSGI com
+várias threads: requisições de projetos diferentes rodam em paralelo e as do
+mesmo projeto são serializadas. Projetos ociosos são descartados por tempo
+de inatividade (TTL), por quantidade (LRU) e por um orçamento de memória
+estimado; o projeto padrão nunca é descartado.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+PROJETO_PADRAO = "padrao"
+TTL_PADRAO = 2 * 60 * 60  # segundos
+LIMITE_PROJETOS_PADRAO = 64
+LIMITE_BYTES_PADRAO = 1024 * 1024 * 1024
+
+# Estimativas (medidas com tracemalloc) do custo em memória de um GrafoEuleriano
+BYTES_POR_VERTICE = 500  # inclui a entrada no índice espacial
+BYTES_POR_ARESTA = 900
+BYTES_POR_ALTERACAO = 400
+
+
+def estimar_bytes(grafo):
+    """Estimativa da memória ocupada por um grafo, a partir do número de elementos."""
+    return (len(grafo.vertices) * BYTES_POR_VERTICE
+            + len(grafo.arestas) * BYTES_POR_ARESTA
+            + len(getattr(grafo, "alteracoes", ())) * BYTES_POR_ALTERACAO)
+
+
+class _Projeto:
+    """Entrada do registro: grafo, trava e dados de uso."""
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        self.trava = threading.Lock()
+        self.ultimo_acesso = time.monotonic()
+        self.em_uso = 0
+        self.bytes = 0
+
+
+class RegistroProjetos:
+    """Grafos indexados por identificador de projeto, com descarte de projetos ociosos."""
+
+    def __init__(self, fabrica, ttl=TTL_PADRAO, limite_projetos=LIMITE_PROJETOS_PADRAO,
+                 limite_bytes=LIMITE_BYTES_PADRAO):
+        self.fabrica = fabrica
+        self.ttl = ttl
+        self.limite_projetos = limite_projetos
+        self.limite_bytes = limite_bytes
+        self._projetos = OrderedDict()  # identificador -> _Projeto, do menos ao mais recente
+        self._trava = threading.Lock()
+
+    def __contains__(self, identificador):
+        return identificador in self._projetos
+
+    def __len__(self):
+        return len(self._projetos)
+
+    def criar(self):
+        """Cria um projeto vazio e retorna seu identificador."""
+        identificador = uuid.uuid4().hex
+        with self._trava:
+            self._projetos[identificador] = _Projeto(self.fabrica())
+            self._descartar_ociosos()
+        return identificador
+
+    def remover(self, identificador):
+        """Remove um projeto; retorna False se ele não existia."""
+        with self._trava:
+            return self._projetos.pop(identificador, None) is not None
+
+    def listar(self):
+        """Resumo dos projetos: identificador, tamanho e segundos desde o último acesso."""
+        agora = time.monotonic()
+        with self._trava:
+            return [
+                {
+                    "id": identificador,
+                    "vertices": len(projeto.grafo.vertices),
+                    "arestas": len(projeto.grafo.arestas),
+                    "bytes_estimados": projeto.bytes,
+                    "ocioso_ha": round(agora - projeto.ultimo_acesso, 1)
+                }
+                for identificador, projeto in self._projetos.items()
+            ]
+
+    @contextmanager
+    def usar(self, identificador=PROJETO_PADRAO):
+        """
+        Fornece o grafo do projeto (criado se não existir) com sua trava adquirida.
+        Enquanto em uso o projeto não é descartado.
+        """
+        with self._trava:
+            projeto = self._projetos.get(identificador)
+            if projeto is None:
+                projeto = self._projetos[identificador] = _Projeto(self.fabrica())
+            self._projetos.move_to_end(identificador)
+            projeto.em_uso += 1
+
+        try:
+            with projeto.trava:
+                yield projeto.grafo
+                projeto.bytes = estimar_bytes(projeto.grafo)
+        finally:
+            with self._trava:
+                projeto.em_uso -= 1
+                projeto.ultimo_acesso = time.monotonic()
+                self._descartar_ociosos()
+
+    def _descartar_ociosos(self):
+        """Descarta projetos expirados e, se preciso, os menos usados (chamado com a trava)."""
+        agora = time.monotonic()
+        total = sum(projeto.bytes for projeto in self._projetos.values())
+        for identificador in list(self._projetos):
+            projeto = self._projetos[identificador]
+            if identificador == PROJETO_PADRAO or projeto.em_uso:
+                continue
+            expirado = agora - projeto.ultimo_acesso > self.ttl
+            excedente = len(self._projetos) > self.limite_projetos or total > self.limite_bytes
+            if expirado or excedente:
+                del self._projetos[identificador]
+                total -= projeto.bytes
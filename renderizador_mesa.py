@@ -0,0 +1,230 @@
+"""
+Renderização incremental da mesa de trabalho da versão desktop (matplotlib).
+
+Os artistas são criados uma única vez e reaproveitados: as trajetórias e o
+caminho otimizado são uma LineCollection cada, e os pontos de corte um
+PathCollection (scatter). Quando o grafo ou o caminho mudam, apenas os arrays
+de dados são substituídos. Destaques que mudam a cada movimento do mouse
+(ponto selecionado, ponto sob o cursor e a linha de status) são artistas
+animados, desenhados por blitting sobre o fundo salvo no último desenho
+completo, sem redesenhar a figura.
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+
+from carteiro_chines import TIPO_DESLOCAMENTO
+
+
+# Acima destes números de elementos os rótulos de texto (caros para o
+# matplotlib) deixam de ser desenhados
+LIMITE_ROTULOS_PONTOS = 150
+LIMITE_ROTULOS_ETAPAS = 100
+
+COR_PONTO = '#0066CC'
+BORDA_PONTO = 'darkblue'
+COR_INICIO = '#00AA00'
+BORDA_INICIO = 'darkgreen'
+TITULO_PADRAO = 'Mesa de Trabalho - Visualização da Peça'
+MENSAGEM_VAZIA = ("📍 Clique na mesa para definir pontos de corte\n\n"
+                  "ou use uma peça pré-definida no painel esquerdo")
+
+
+class RenderizadorMesa:
+    """Desenha grafo, caminho otimizado e destaques num Axes, reaproveitando os artistas."""
+
+    def __init__(self, ax, canvas):
+        self.ax = ax
+        self.canvas = canvas
+        self._fundo = None
+        # Estado já desenhado: só redesenha a figura quando algo mudar
+        self._grafo = None
+        self._versao = None
+        self._ciclo = None
+        self._selecionado = None
+        self._proximo = None
+        self._rotulos = []
+        self._setas = None
+
+        ax.set_facecolor('#f0f0f0')
+        ax.set_xlabel('Coordenada X (mm)', fontsize=11, fontweight='bold')
+        ax.set_ylabel('Coordenada Y (mm)', fontsize=11, fontweight='bold')
+        ax.set_title(TITULO_PADRAO, fontsize=13, fontweight='bold', pad=15)
+        ax.grid(True, alpha=0.4, linestyle=':', linewidth=0.8, color='gray')
+        ax.set_aspect('equal', adjustable='box')
+
+        self.trajetorias = LineCollection([], colors='gray', alpha=0.5, linewidths=2,
+                                          linestyles='--', zorder=1)
+        self.caminho = LineCollection([], alpha=0.9, zorder=2)
+        ax.add_collection(self.trajetorias)
+        ax.add_collection(self.caminho)
+        self.pontos = ax.scatter(np.empty(0), np.empty(0), zorder=5)
+        self.vazio = ax.text(0.5, 0.5, MENSAGEM_VAZIA, ha='center', va='center', transform=ax.transAxes,
+                             fontsize=13, color='gray', style='italic',
+                             bbox=dict(boxstyle='round', facecolor='white', edgecolor='gray',
+                                       alpha=0.8, linewidth=2))
+
+        # Artistas animados (fora do fundo salvo; desenhados por blitting)
+        self.selecao, = ax.plot([], [], 'o', color='#FF4444', markersize=18, markeredgecolor='darkred',
+                                markeredgewidth=3, zorder=7, animated=True)
+        self.cursor, = ax.plot([], [], 'o', markersize=24, markerfacecolor='none', markeredgecolor='blue',
+                               markeredgewidth=2, zorder=7, animated=True)
+        self.status = ax.text(0.01, 0.99, '', transform=ax.transAxes, ha='left', va='top', fontsize=10,
+                              fontweight='bold', color='blue', zorder=8, animated=True,
+                              bbox=dict(boxstyle='round,pad=0.4', facecolor='white', edgecolor='blue',
+                                        alpha=0.9))
+
+        canvas.mpl_connect('draw_event', self._ao_desenhar)
+
+    def _ao_desenhar(self, event):
+        """Salva o fundo (sem os artistas animados) a cada desenho completo da figura."""
+        self._fundo = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._desenhar_destaques()
+
+    def _desenhar_destaques(self):
+        for artista in (self.selecao, self.cursor, self.status):
+            self.ax.draw_artist(artista)
+
+    def _blit(self):
+        if self._fundo is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._fundo)
+        self._desenhar_destaques()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    def atualizar(self, grafo, ciclo, tipos, selecionado=None):
+        """
+        Sincroniza a mesa com o grafo e o caminho. Se só a seleção mudou, o
+        destaque é atualizado por blitting; senão os dados das coleções são
+        substituídos e a figura redesenhada.
+        """
+        mudou = grafo is not self._grafo or grafo.versao != self._versao or ciclo is not self._ciclo
+        self._selecionado = selecionado
+        if mudou:
+            self._grafo, self._versao, self._ciclo = grafo, grafo.versao, ciclo
+            self._carregar(grafo, ciclo, tipos)
+        self._atualizar_destaques()
+        if mudou:
+            self.canvas.draw()
+        else:
+            self._blit()
+
+    def destacar_proximo(self, nome):
+        """Marca o ponto sob o cursor (None remove a marca) sem redesenhar a figura."""
+        if nome == self._proximo:
+            return
+        self._proximo = nome
+        self._atualizar_destaques()
+        self._blit()
+
+    def _atualizar_destaques(self):
+        vertices = self._grafo.vertices if self._grafo is not None else {}
+        for artista, nome in ((self.selecao, self._selecionado), (self.cursor, self._proximo)):
+            if nome in vertices:
+                x, y = vertices[nome]
+                artista.set_data([x], [y])
+            else:
+                artista.set_data([], [])
+        partes = []
+        if self._proximo in vertices:
+            partes.append(f'Próximo ao ponto: {self._proximo}')
+        if self._selecionado in vertices:
+            partes.append(f'Ponto selecionado: {self._selecionado}')
+        self.status.set_text(' | '.join(partes))
+        self.status.set_visible(bool(partes))
+
+    def _carregar(self, grafo, ciclo, tipos):
+        """Substitui os dados das coleções pelos do grafo e do caminho."""
+        for rotulo in self._rotulos:
+            rotulo.remove()
+        self._rotulos = []
+        if self._setas is not None:
+            self._setas.remove()
+            self._setas = None
+
+        nomes = list(grafo.vertices)
+        coordenadas = np.array(list(grafo.vertices.values()), dtype=float).reshape(-1, 2)
+        indice = {nome: i for i, nome in enumerate(nomes)}
+        vazio = not nomes
+        self.vazio.set_visible(vazio)
+
+        if vazio:
+            self.ax.set_xlim(-1, 1)
+            self.ax.set_ylim(-1, 1)
+        else:
+            minimo, maximo = coordenadas.min(axis=0), coordenadas.max(axis=0)
+            margem = (maximo - minimo).max() * 0.2 + 1
+            self.ax.set_xlim(minimo[0] - margem, maximo[0] + margem)
+            self.ax.set_ylim(minimo[1] - margem, maximo[1] + margem)
+
+        extremos = np.array([(indice[o], indice[d]) for o, d in grafo.arestas], dtype=np.intp).reshape(-1, 2)
+        self.trajetorias.set_segments(coordenadas[extremos])
+
+        # Caminho otimizado: uma única coleção com estilo por trecho
+        tem_caminho = bool(ciclo) and len(ciclo) > 1
+        if tem_caminho:
+            sequencia = coordenadas[np.fromiter((indice[v] for v in ciclo), dtype=np.intp, count=len(ciclo))]
+            segmentos = np.stack((sequencia[:-1], sequencia[1:]), axis=1)
+            deslocamento = np.array([tipo == TIPO_DESLOCAMENTO for tipo in tipos], dtype=bool)
+            self.caminho.set_segments(segmentos)
+            self.caminho.set_color(np.where(deslocamento, 'orange', 'red').tolist())
+            self.caminho.set_linewidth(np.where(deslocamento, 2, 4))
+            self.caminho.set_linestyle([':' if d else '-' for d in deslocamento])
+            self._desenhar_setas(segmentos)
+            if len(segmentos) <= LIMITE_ROTULOS_ETAPAS:
+                for i, (x, y) in enumerate(segmentos.mean(axis=1)):
+                    self._rotulos.append(self.ax.text(
+                        x, y, f"N{i+1}", ha='center', va='center', fontsize=9, fontweight='bold', color='red',
+                        bbox=dict(boxstyle='round,pad=0.4', facecolor='white', edgecolor='red', linewidth=2,
+                                  alpha=0.9), zorder=3))
+        else:
+            self.caminho.set_segments([])
+
+        inicio = ciclo[0] if tem_caminho else None
+        eh_inicio = np.array([nome == inicio for nome in nomes], dtype=bool)
+        self.pontos.set_offsets(coordenadas)
+        self.pontos.set_facecolors(np.where(eh_inicio, COR_INICIO, COR_PONTO).tolist())
+        self.pontos.set_edgecolors(np.where(eh_inicio, BORDA_INICIO, BORDA_PONTO).tolist())
+        self.pontos.set_sizes(np.where(eh_inicio, 14, 12) ** 2)
+        self.pontos.set_linewidths(np.where(eh_inicio, 2.5, 2))
+        if len(nomes) <= LIMITE_ROTULOS_PONTOS:
+            for nome, (x, y), inicial in zip(nomes, coordenadas, eh_inicio):
+                self._rotulos.append(self.ax.text(
+                    x, y + 0.25, nome, ha='center', va='bottom', fontsize=10, fontweight='bold', color='black',
+                    bbox=dict(boxstyle='round,pad=0.4', facecolor='white',
+                              edgecolor=BORDA_INICIO if inicial else BORDA_PONTO, alpha=0.9, linewidth=1.5),
+                    zorder=6))
+
+        self.ax.set_title(TITULO_PADRAO + (' | Caminho otimizado ativo' if tem_caminho else ''),
+                          fontsize=13, fontweight='bold', pad=15)
+        self._atualizar_legenda(bool(grafo.arestas), tem_caminho)
+
+    def _desenhar_setas(self, segmentos):
+        """Setas de direção da ferramenta: um único quiver no meio dos trechos."""
+        delta = segmentos[:, 1] - segmentos[:, 0]
+        visiveis = np.hypot(delta[:, 0], delta[:, 1]) > 0.1
+        if not visiveis.any():
+            return
+        meio = segmentos[visiveis].mean(axis=1)
+        delta = delta[visiveis] * 0.15
+        self._setas = self.ax.quiver(meio[:, 0], meio[:, 1], delta[:, 0], delta[:, 1], angles='xy',
+                                     scale_units='xy', scale=1, color='red', alpha=0.9, width=0.004,
+                                     zorder=4)
+
+    def _atualizar_legenda(self, tem_trajetorias, tem_caminho):
+        legenda = self.ax.get_legend()
+        if legenda is not None:
+            legenda.remove()
+        if not (tem_trajetorias or tem_caminho):
+            return
+        entradas = [
+            Line2D([], [], color='gray', alpha=0.5, linewidth=2, linestyle='--', label='Trajetórias definidas'),
+            Line2D([], [], color='b', linewidth=2, label='Pontos de corte'),
+        ]
+        if tem_caminho:
+            entradas.append(Line2D([], [], color='r', linewidth=4, label='Caminho otimizado'))
+            entradas.append(Line2D([], [], color='orange', linewidth=2, linestyle=':',
+                                   label='Deslocamento rápido'))
+        self.ax.legend(handles=entradas, loc='upper right', fontsize=9, framealpha=0.9)
@@ -0,0 +1,237 @@
+"""
+Sequenciamento de peças em chapas com vários componentes desconexos.
+
+Cada componente conexo (peça) tem seu ciclo resolvido de forma independente,
+opcionalmente em paralelo. Em seguida os componentes são ordenados e cada um
+ganha um ponto de entrada (perfuração), minimizando a distância total dos
+deslocamentos rápidos entre peças com vizinho mais próximo seguido de 2-opt.
+"""
+
+from motor_euleriano import construir_adjacencia, hierholzer
+from carteiro_chines import ArvoreKD, ligacoes_carteiro, TIPO_CORTE, TIPO_DESLOCAMENTO
+
+
+LIMITE_ARESTAS_PARALELO = 200000
+LIMITE_2OPT = 500
+MAX_PASSADAS_2OPT = 20
+
+
+def componentes_conexos(num_vertices, origens, destinos, adjacencia=None):
+    """
+    Separa os vértices com arestas em componentes conexos.
+    Retorna uma lista de componentes, cada um com a lista de seus vértices e de suas arestas.
+    """
+    if adjacencia is None:
+        adjacencia = construir_adjacencia(num_vertices, origens, destinos)
+    inicio, adjacentes = adjacencia
+
+    componente = [-1] * num_vertices
+    componentes = []
+    for raiz in range(num_vertices):
+        if componente[raiz] >= 0 or inicio[raiz] == inicio[raiz + 1]:
+            continue
+        rotulo = len(componentes)
+        componente[raiz] = rotulo
+        vertices = [raiz]
+        pilha = [raiz]
+        while pilha:
+            v = pilha.pop()
+            for c in range(inicio[v], inicio[v + 1]):
+                aresta = adjacentes[c]
+                w = destinos[aresta] if origens[aresta] == v else origens[aresta]
+                if componente[w] < 0:
+                    componente[w] = rotulo
+                    vertices.append(w)
+                    pilha.append(w)
+        componentes.append((vertices, []))
+
+    for aresta, u in enumerate(origens):
+        componentes[componente[u]][1].append(aresta)
+
+    return componentes
+
+
+def aumentar_componente(coordenadas, origens, destinos, estrategia="euleriano"):
+    """
+    Retorna (origens, destinos, tipos) do componente pronto para o ciclo: no
+    modo "carteiro" acrescenta as ligações que emparelham os vértices ímpares.
+    """
+    tipos = [TIPO_CORTE] * len(origens)
+    if estrategia == "carteiro":
+        origens = list(origens)
+        destinos = list(destinos)
+        for u, v, tipo in ligacoes_carteiro(coordenadas, origens, destinos):
+            origens.append(u)
+            destinos.append(v)
+            tipos.append(tipo)
+    return origens, destinos, tipos
+
+
+def _ciclo_componente(num_vertices, origens, destinos, tipos):
+    ciclo, arestas = hierholzer(num_vertices, origens, destinos, 0)
+    return ciclo, [tipos[e] for e in arestas]
+
+
+def resolver_componente(coordenadas, origens, destinos, estrategia="euleriano"):
+    """
+    Resolve o ciclo de um componente conexo com índices locais.
+    Retorna (ciclo, tipos). No modo "carteiro" os vértices ímpares são emparelhados antes.
+    """
+    return _ciclo_componente(len(coordenadas), *aumentar_componente(coordenadas, origens, destinos, estrategia))
+
+
+def _sem_progresso(fase, fracao):
+    pass
+
+
+def _resolver_subproblema(subproblema):
+    return resolver_componente(*subproblema)
+
+
+def _distancia(p, q):
+    return ((p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2) ** 0.5
+
+
+def _rotacionar(ciclo, tipos, indice):
+    """Faz um ciclo fechado começar (e terminar) em ciclo[indice]."""
+    return ciclo[indice:] + ciclo[1:indice + 1], tipos[indice:] + tipos[:indice]
+
+
+def ordenar_componentes(representantes, origem=(0.0, 0.0)):
+    """
+    Ordena componentes pelo vizinho mais próximo a partir de origem, seguido de 2-opt.
+    representantes[i] é o ponto (x, y) usado como entrada do componente i.
+    """
+    n = len(representantes)
+    if n == 0:
+        return []
+
+    arvore = ArvoreKD(representantes)
+    visitado = bytearray(n)
+    ordem = []
+    atual = origem
+    for _ in range(n):
+        k = 8
+        escolhido = None
+        while escolhido is None:
+            for _, indice in arvore.vizinhos(atual, min(k, n)):
+                if not visitado[indice]:
+                    escolhido = indice
+                    break
+            k *= 2
+        visitado[escolhido] = 1
+        ordem.append(escolhido)
+        atual = representantes[escolhido]
+
+    if n <= LIMITE_2OPT:
+        ordem = _dois_opt(ordem, representantes, origem)
+    return ordem
+
+
+def _dois_opt(ordem, pontos, origem):
+    """Melhoria 2-opt de uma rota aberta que parte de origem."""
+    rota = [origem] + [pontos[i] for i in ordem]
+    ordem = [None] + list(ordem)
+    n = len(rota)
+
+    for _ in range(MAX_PASSADAS_2OPT):
+        melhorou = False
+        for i in range(n - 2):
+            a, b = rota[i], rota[i + 1]
+            d_ab = _distancia(a, b)
+            for j in range(i + 2, n):
+                c = rota[j]
+                if j + 1 < n:
+                    d = rota[j + 1]
+                    delta = _distancia(a, c) + _distancia(b, d) - d_ab - _distancia(c, d)
+                else:
+                    delta = _distancia(a, c) - d_ab
+                if delta < -1e-9:
+                    rota[i + 1:j + 1] = rota[i + 1:j + 1][::-1]
+                    ordem[i + 1:j + 1] = ordem[i + 1:j + 1][::-1]
+                    b = rota[i + 1]
+                    d_ab = _distancia(a, b)
+                    melhorou = True
+        if not melhorou:
+            break
+
+    return ordem[1:]
+
+
+def planejar_rota(coordenadas, origens, destinos, estrategia="euleriano",
+                  processos=None, origem=(0.0, 0.0), adjacencia=None, progresso=None):
+    """
+    Planeja a rota completa de uma chapa com um ou mais componentes.
+
+    Retorna (ciclo, tipos) com índices globais de vértices: os ciclos de cada
+    componente encadeados por deslocamentos rápidos entre os pontos de entrada.
+    processos > 1 resolve os componentes em paralelo quando a chapa é grande.
+    adjacencia permite reaproveitar uma adjacência CSR já construída.
+    progresso(fase, fracao), se informado, é chamado no início das fases
+    "emparelhamento" (modo carteiro) e "ciclo" e ao fim de cada componente.
+    """
+    if progresso is None:
+        progresso = _sem_progresso
+    componentes = componentes_conexos(len(coordenadas), origens, destinos, adjacencia)
+    if not componentes:
+        return [], []
+
+    subproblemas = []
+    for vertices, arestas in componentes:
+        local = {v: i for i, v in enumerate(vertices)}
+        subproblemas.append((
+            [coordenadas[v] for v in vertices],
+            [local[origens[e]] for e in arestas],
+            [local[destinos[e]] for e in arestas],
+            estrategia,
+        ))
+
+    total = len(subproblemas)
+    if processos and processos > 1 and len(componentes) > 1 and len(origens) >= LIMITE_ARESTAS_PARALELO:
+        from concurrent.futures import ProcessPoolExecutor
+
+        solucoes = []
+        progresso("ciclo", 0.0)
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            for solucao in executor.map(_resolver_subproblema, subproblemas, chunksize=8):
+                solucoes.append(solucao)
+                progresso("ciclo", len(solucoes) / total)
+    else:
+        aumentados = []
+        if estrategia == "carteiro":
+            progresso("emparelhamento", 0.0)
+        for coordenadas_locais, origens_locais, destinos_locais, _ in subproblemas:
+            aumentados.append(aumentar_componente(coordenadas_locais, origens_locais, destinos_locais, estrategia))
+            if estrategia == "carteiro":
+                progresso("emparelhamento", len(aumentados) / total)
+        solucoes = []
+        progresso("ciclo", 0.0)
+        for (coordenadas_locais, _, _, _), aumentado in zip(subproblemas, aumentados):
+            solucoes.append(_ciclo_componente(len(coordenadas_locais), *aumentado))
+            progresso("ciclo", len(solucoes) / total)
+
+    # Ponto de entrada inicial de cada componente: o vértice mais próximo da origem.
+    entradas = []
+    for (vertices, _), (ciclo, _) in zip(componentes, solucoes):
+        entradas.append(min(ciclo, key=lambda v: _distancia(coordenadas[vertices[v]], origem)))
+    representantes = [coordenadas[vertices[e]] for (vertices, _), e in zip(componentes, entradas)]
+
+    ordem = ordenar_componentes(representantes, origem)
+
+    # Refina a entrada de cada componente: vértice mais próximo da saída anterior.
+    ciclo_total = []
+    tipos_total = []
+    posicao = origem
+    for indice in ordem:
+        vertices, _ = componentes[indice]
+        ciclo, tipos = solucoes[indice]
+        melhor = min(range(len(ciclo) - 1), key=lambda i: _distancia(coordenadas[vertices[ciclo[i]]], posicao))
+        ciclo, tipos = _rotacionar(ciclo, tipos, melhor)
+
+        if ciclo_total:
+            tipos_total.append(TIPO_DESLOCAMENTO)
+        ciclo_total.extend(vertices[v] for v in ciclo)
+        tipos_total.extend(tipos)
+        posicao = coordenadas[ciclo_total[-1]]
+
+    return ciclo_total, tipos_total
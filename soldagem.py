@@ -0,0 +1,194 @@
+"""
+Soldagem de vértices: funde pontos a menos de uma tolerância antes da otimização.
+
+Geometria importada ou desenhada à mão tem pontos repetidos a poucos mícrons
+um do outro, que criam graus ímpares e componentes espúrios. A soldagem
+percorre os vértices em ordem e funde cada um ao primeiro vértice mantido a
+menos de `tolerancia`, que conserva nome e coordenadas. A busca usa um hash
+espacial com células do tamanho da tolerância (3 x 3 células por ponto, O(N)
+esperado). Trajetórias que ficam com comprimento nulo são removidas, junto
+com os pontos que ficariam isolados por isso.
+
+Opcionalmente, trajetórias que passam a menos de `tolerancia` de um vértice
+mantido (junções em T) são divididas nele. Para isso as trajetórias são
+indexadas numa segunda grade, com células do tamanho do comprimento médio das
+trajetórias; cada uma entra só nas células que atravessa.
+
+O resultado é uma lista de operações no formato de
+GrafoEuleriano.aplicar_operacoes, aplicada de forma atômica e registrada no
+histórico de versões (os clientes web recebem o delta).
+"""
+
+import math
+import time
+
+from indice_espacial import celulas_segmento
+
+
+TOLERANCIA_SOLDAGEM = 0.01  # mm
+
+
+class FusaoPontos:
+    """
+    Numera os pontos, reaproveitando o já visto a menos de `tolerancia`. Hash
+    espacial com células do tamanho da tolerância: um ponto só pode se fundir
+    com os das 3 x 3 células em volta da sua.
+    """
+
+    def __init__(self, tolerancia):
+        if not (tolerancia > 0 and math.isfinite(tolerancia)):
+            raise ValueError("a tolerância deve ser um número positivo")
+        self.tolerancia = tolerancia
+        self.coordenadas = []
+        self.fundidos = 0
+        self._exatos = {}  # (x, y) -> índice; a maioria dos pontos repetidos coincide exatamente
+        self._celulas = {}  # (i, j) -> [índices]
+
+    def indice(self, x, y):
+        """Índice do ponto mantido a menos de `tolerancia` de (x, y), ou de um ponto novo."""
+        existente = self._exatos.get((x, y))
+        if existente is None:
+            existente = self._proximo(x, y)
+        if existente is not None:
+            self.fundidos += 1
+            self._exatos[(x, y)] = existente
+            return existente
+        novo = len(self.coordenadas)
+        self.coordenadas.append((x, y))
+        self._exatos[(x, y)] = novo
+        self._celulas.setdefault((math.floor(x / self.tolerancia), math.floor(y / self.tolerancia)), []).append(novo)
+        return novo
+
+    def _proximo(self, x, y):
+        i, j = math.floor(x / self.tolerancia), math.floor(y / self.tolerancia)
+        melhor, melhor_d2 = None, self.tolerancia * self.tolerancia
+        for vizinha in ((i - 1, j - 1), (i - 1, j), (i - 1, j + 1), (i, j - 1), (i, j), (i, j + 1),
+                        (i + 1, j - 1), (i + 1, j), (i + 1, j + 1)):
+            for indice in self._celulas.get(vizinha, ()):
+                px, py = self.coordenadas[indice]
+                d2 = (px - x) ** 2 + (py - y) ** 2
+                if d2 < melhor_d2:
+                    melhor, melhor_d2 = indice, d2
+        return melhor
+
+
+def _juncoes(coordenadas, arestas, tolerancia):
+    """
+    Cortes das junções em T: {índice da aresta: [(t, vértice), ...]} para os
+    vértices a menos de `tolerancia` do interior de cada aresta (t em 0..1).
+    """
+    if not arestas:
+        return {}
+    # Cada aresta entra só nas células que atravessa: com células do tamanho do
+    # comprimento médio, o total de entradas é O(M) mesmo com arestas longas.
+    # Como as células não são menores que a tolerância, um vértice próximo da
+    # aresta está numa das 3 x 3 células em volta de uma célula atravessada.
+    comprimento = sum(math.dist(coordenadas[a], coordenadas[b]) for a, b in arestas) / len(arestas)
+    tamanho = max(comprimento, tolerancia)
+    celulas = {}  # (i, j) -> [arestas que atravessam a célula]
+    for k, (a, b) in enumerate(arestas):
+        for celula in celulas_segmento(*coordenadas[a], *coordenadas[b], tamanho):
+            celulas.setdefault(celula, []).append(k)
+
+    cortes = {}
+    limite = tolerancia * tolerancia
+    for v, (x, y) in enumerate(coordenadas):
+        i, j = math.floor(x / tamanho), math.floor(y / tamanho)
+        candidatas = {k for di in (-1, 0, 1) for dj in (-1, 0, 1) for k in celulas.get((i + di, j + dj), ())}
+        for k in candidatas:
+            a, b = arestas[k]
+            if v == a or v == b:
+                continue
+            (xa, ya), (xb, yb) = coordenadas[a], coordenadas[b]
+            dx, dy = xb - xa, yb - ya
+            t = ((x - xa) * dx + (y - ya) * dy) / (dx * dx + dy * dy)
+            if 0 < t < 1 and (xa + t * dx - x) ** 2 + (ya + t * dy - y) ** 2 < limite:
+                cortes.setdefault(k, []).append((t, v))
+    return cortes
+
+
+def planejar_soldagem(vertices, arestas, tolerancia=TOLERANCIA_SOLDAGEM, dividir_juncoes=False):
+    """
+    Operações que soldam o grafo ({nome: (x, y)} e pares (origem, destino)),
+    sem alterá-lo, e as estatísticas da soldagem.
+    """
+    fusao = FusaoPontos(tolerancia)
+    mantidos = []  # índice da fusão -> nome do vértice mantido
+    representante = {}
+    for nome, (x, y) in vertices.items():
+        indice = fusao.indice(x, y)
+        if indice == len(mantidos):
+            mantidos.append(nome)
+        representante[nome] = indice
+
+    # Arestas soldadas (índices da fusão); None para as de comprimento nulo
+    originais = list(arestas)
+    soldadas = []
+    validas = []
+    for origem, destino in originais:
+        a, b = representante[origem], representante[destino]
+        if a == b:
+            soldadas.append(None)
+        else:
+            soldadas.append(len(validas))
+            validas.append((a, b))
+    cortes = _juncoes(fusao.coordenadas, validas, tolerancia) if dividir_juncoes else {}
+
+    operacoes = []
+    nulas = 0
+    ligados = set()  # vértices mantidos com alguma trajetória depois da soldagem
+    for (origem, destino), k in zip(originais, soldadas):
+        if k is None:
+            nulas += 1
+            operacoes.append({"tipo": "remover_aresta", "origem": origem, "destino": destino})
+            continue
+        a, b = validas[k]
+        caminho = [a] + [v for _, v in sorted(cortes.get(k, ()))] + [b]
+        ligados.update(caminho)
+        if mantidos[a] == origem and mantidos[b] == destino and k not in cortes:
+            continue
+        operacoes.append({"tipo": "remover_aresta", "origem": origem, "destino": destino})
+        for u, v in zip(caminho, caminho[1:]):
+            operacoes.append({"tipo": "adicionar_aresta", "origem": mantidos[u], "destino": mantidos[v]})
+    removidos = [nome for nome, indice in representante.items() if mantidos[indice] != nome]
+    # Pontos que só tinham trajetórias nulas ficariam isolados (pontos sem
+    # trajetória desde antes da soldagem são mantidos)
+    tinham = {representante[nome] for par in originais for nome in par}
+    isolados = [mantidos[indice] for indice in sorted(tinham - ligados)]
+    operacoes.extend({"tipo": "remover_vertice", "nome": nome} for nome in removidos + isolados)
+
+    return operacoes, {
+        "fundidos": len(removidos),
+        "isolados": len(isolados),
+        "arestas_nulas": nulas,
+        "juncoes": sum(len(c) for c in cortes.values()),
+        "vertices": len(mantidos) - len(isolados),
+        "operacoes": len(operacoes)
+    }
+
+
+def soldar(grafo, tolerancia=TOLERANCIA_SOLDAGEM, dividir_juncoes=False):
+    """
+    Solda os vértices do grafo (GrafoEuleriano) a menos de `tolerancia` e
+    retorna as estatísticas; o grafo só é alterado se houver o que soldar.
+    """
+    inicio = time.perf_counter()
+    operacoes, estatisticas = planejar_soldagem(grafo.vertices, grafo.arestas, tolerancia, dividir_juncoes)
+    if operacoes:
+        grafo.aplicar_operacoes(operacoes)
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    return estatisticas
+
+
+def resumo(estatisticas):
+    """Texto curto com o resultado da soldagem."""
+    if not estatisticas["operacoes"]:
+        return "nenhum ponto a soldar"
+    partes = [f"{estatisticas['fundidos']} pontos fundidos"]
+    if estatisticas["arestas_nulas"]:
+        partes.append(f"{estatisticas['arestas_nulas']} trajetórias nulas removidas")
+    if estatisticas["isolados"]:
+        partes.append(f"{estatisticas['isolados']} pontos isolados removidos")
+    if estatisticas["juncoes"]:
+        partes.append(f"{estatisticas['juncoes']} junções em T divididas")
+    return ", ".join(partes)
@@ -2,17 +2,31 @@
 let state = {
     mode: 'point', // 'point' ou 'edge'
     points: {},
+    indice: new GradeEspacial(), // Índice espacial de state.points para seleção pelo mouse
     edges: [],
     selectedPoint: null,
     optimizedPath: null,
+    optimizedTypes: null, // Tipo de cada trecho do caminho ('corte', 'repeticao', 'deslocamento')
     canvas: null,
     ctx: null,
-    scale: 1,
+    renderizador: null, // RenderizadorCanvas (camadas em cache + camada dinâmica)
+    scale: 1, // Vista: tela = ponto * scale + offset
     offsetX: 0,
     offsetY: 0,
+    panOrigem: null, // Início do arrasto da vista (botão do meio ou Shift + arrastar)
+    pontoSobCursor: null,
+    desenhoAgendado: null, // requestAnimationFrame pendente de agendarDesenho
+    mosaico: null, // Grafo grande: { num_vertices, num_arestas } e só a região visível é baixada
+    regiao: null, // Região carregada no modo mosaico: { bbox, zoom, nivel }
+    agregado: null, // Geometria agregada da região ({ pontos, segmentos }) em zoom baixo
+    consultaRegiao: 0, // Número da última consulta de região (descarta respostas atrasadas)
+    temporizadorRegiao: null,
     isDragging: false,
     dragPoint: null,
     lastMousePos: null,
+    versao: null, // Versão do grafo no servidor já aplicada localmente
+    projeto: new URLSearchParams(window.location.search).get('projeto'), // Projeto no servidor (null = padrão)
+    tarefa: null, // Id da otimização em andamento no servidor
     animationStep: 0, // Etapa atual da animação
     animationInterval: null, // Intervalo da animação
     isAnimating: false, // Se está animando
@@ -20,6 +34,23 @@ let state = {
     animationFrame: null // ID do requestAnimationFrame
 };
 
+// Número de linhas do programa CNC exibidas no painel de resultados
+const LIMITE_PREVIA_PROGRAMA = 500;
+
+// Grafos com mais vértices que isto são baixados por região (/api/grafo/tile)
+const LIMITE_GRAFO_COMPLETO = 50000;
+// Folga (fração da tela em cada lado) baixada além da área visível no modo mosaico
+const FOLGA_REGIAO = 0.5;
+// Espera (ms) após o último zoom/deslocamento antes de pedir a nova região
+const ESPERA_REGIAO = 200;
+
+// Limites do zoom da mesa (roda do mouse)
+const ESCALA_MINIMA = 0.02;
+const ESCALA_MAXIMA = 20;
+
+// Intervalo (ms) entre consultas ao andamento de uma otimização
+const INTERVALO_CONSULTA_TAREFA = 300;
+
 // Inicialização
 document.addEventListener('DOMContentLoaded', () => {
     initCanvas();
@@ -30,6 +61,7 @@ document.addEventListener('DOMContentLoaded', () => {
 function initCanvas() {
     state.canvas = document.getElementById('canvas');
     state.ctx = state.canvas.getContext('2d');
+    state.renderizador = new RenderizadorCanvas(state.canvas);
     
     resizeCanvas();
     window.addEventListener('resize', resizeCanvas);
@@ -41,6 +73,7 @@ function initCanvas() {
     state.canvas.addEventListener('mousedown', handleCanvasMouseDown);
     state.canvas.addEventListener('mouseup', handleCanvasMouseUp);
     state.canvas.addEventListener('mouseleave', handleCanvasMouseUp);
+    state.canvas.addEventListener('wheel', handleWheel, { passive: false });
     
     // Evento de teclado para Delete
     document.addEventListener('keydown', handleKeyDown);
@@ -50,7 +83,7 @@ function resizeCanvas() {
     const container = state.canvas.parentElement;
     state.canvas.width = container.clientWidth;
     state.canvas.height = container.clientHeight;
-    draw();
+    vistaAlterada();
 }
 
 function initEventListeners() {
@@ -80,15 +113,85 @@ function updateModeIndicator() {
     atualizarHint();
 }
 
+// Sincronização incremental com o servidor
+function comProjeto(url) {
+    // Projeto (grafo) no servidor, escolhido por ?projeto=<id> na página; sem ele, o projeto padrão
+    if (!state.projeto) return url;
+    return `${url}${url.includes('?') ? '&' : '?'}projeto=${encodeURIComponent(state.projeto)}`;
+}
+
+function comVersao(url) {
+    // Informa a versão local para o servidor responder apenas o delta
+    url = comProjeto(url);
+    if (state.versao === null) return url;
+    return `${url}${url.includes('?') ? '&' : '?'}since=${state.versao}`;
+}
+
+function aplicarResposta(data) {
+    if (data.delta) {
+        aplicarDelta(data.delta);
+    } else if (data.grafo) {
+        state.points = data.grafo.vertices || {};
+        state.edges = data.grafo.arestas || [];
+        state.indice.reconstruir(state.points);
+        state.renderizador.invalidar();
+    }
+    if (data.versao !== undefined) {
+        state.versao = data.versao;
+    }
+}
+
+function aplicarDelta(delta) {
+    delta.operacoes.forEach(op => {
+        switch (op.tipo) {
+            case 'limpar':
+                state.points = {};
+                state.edges = [];
+                state.indice.limpar();
+                break;
+            case 'adicionar_vertice':
+            case 'mover_vertice':
+                state.points[op.nome] = { x: op.x, y: op.y };
+                state.indice.adicionar(op.nome, op.x, op.y);
+                break;
+            case 'remover_vertice':
+                delete state.points[op.nome];
+                state.indice.remover(op.nome);
+                state.edges = state.edges.filter(([origem, destino]) => origem !== op.nome && destino !== op.nome);
+                break;
+            case 'adicionar_aresta':
+                state.edges.push([op.origem, op.destino]);
+                break;
+            case 'remover_aresta': {
+                const indice = state.edges.findIndex(([origem, destino]) =>
+                    (origem === op.origem && destino === op.destino) || (origem === op.destino && destino === op.origem));
+                if (indice >= 0) state.edges.splice(indice, 1);
+                break;
+            }
+        }
+    });
+}
+
 // API Calls
 async function carregarGrafo() {
     try {
-        const response = await fetch('/api/grafo');
+        const url = comVersao('/api/grafo');
+        const response = await fetch(`${url}${url.includes('?') ? '&' : '?'}limite=${LIMITE_GRAFO_COMPLETO}`);
         const data = await response.json();
         console.log('Dados recebidos do servidor:', data);
         
-        state.points = data.grafo.vertices || {};
-        state.edges = data.grafo.arestas || [];
+        if (data.mosaico) {
+            // Grafo grande demais para baixar inteiro: enquadra e pede só a região visível
+            state.mosaico = { num_vertices: data.num_vertices, num_arestas: data.num_arestas };
+            state.versao = data.versao;
+            state.regiao = null;
+            if (data.limites) enquadrar(data.limites);
+            atualizarStatus(data.status);
+            await carregarRegiao();
+            return;
+        }
+        
+        aplicarResposta(data);
         
         console.log('Estado atualizado - Pontos:', Object.keys(state.points).length, 'Arestas:', state.edges.length);
         console.log('Pontos:', state.points);
@@ -109,7 +212,7 @@ async function adicionarPonto(x, y, nome = null) {
     }
     
     try {
-        const response = await fetch('/api/vertice', {
+        const response = await fetch(comVersao('/api/vertice'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ nome, x, y })
@@ -122,8 +225,7 @@ async function adicionarPonto(x, y, nome = null) {
         }
         
         const data = await response.json();
-        state.points = data.grafo.vertices;
-        state.edges = data.grafo.arestas;
+        aplicarResposta(data);
         atualizarSelects();
         atualizarStatus(data.status);
         atualizarHint();
@@ -168,7 +270,7 @@ async function adicionarTrajetoria() {
     }
     
     try {
-        const response = await fetch('/api/aresta', {
+        const response = await fetch(comVersao('/api/aresta'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ origem: from, destino: to })
@@ -181,8 +283,7 @@ async function adicionarTrajetoria() {
         }
         
         const data = await response.json();
-        state.points = data.grafo.vertices;
-        state.edges = data.grafo.arestas;
+        aplicarResposta(data);
         atualizarSelects();
         atualizarStatus(data.status);
         atualizarHint();
@@ -195,12 +296,20 @@ async function adicionarTrajetoria() {
 async function otimizar() {
     const velocidade = parseFloat(document.getElementById('velocidade').value) || 100;
     const tempoSetup = parseFloat(document.getElementById('tempo-setup').value) || 0.5;
+    const estrategia = document.getElementById('estrategia').value;
+    const aceleracao = parseFloat(document.getElementById('aceleracao').value) || 0;
+    const compactar = document.getElementById('formato-programa').value === 'compactado';
+    
+    if (state.tarefa) return; // Já há uma otimização em andamento
     
     try {
-        const response = await fetch('/api/otimizar', {
+        if (document.getElementById('soldar').checked && !(await soldarPontos())) return;
+        
+        // A otimização roda como tarefa no servidor; o andamento é consultado periodicamente
+        const response = await fetch(comProjeto('/api/jobs'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ velocidade, tempo_setup: tempoSetup })
+            body: JSON.stringify({ velocidade, tempo_setup: tempoSetup, estrategia, aceleracao, compactar })
         });
         
         if (!response.ok) {
@@ -209,12 +318,26 @@ async function otimizar() {
             return;
         }
         
-        const data = await response.json();
-        state.optimizedPath = data.ciclo;
+        const { tarefa } = await response.json();
+        state.tarefa = tarefa;
+        mostrarProgresso({ fase: 'validacao', progresso: 0 });
+        
+        const data = await acompanharTarefa(tarefa);
+        if (!data) return;
+        
+        if (data.estado === 'erro') {
+            alert(`Erro: ${data.erro || 'Não foi possível otimizar'}`);
+            return;
+        }
+        if (data.estado !== 'concluida') return; // Cancelada
+        
+        const resultado = data.resultado;
+        state.optimizedPath = resultado.ciclo;
+        state.optimizedTypes = resultado.tipos || null;
         state.animationStep = 0; // Resetar animação
         state.lineProgress = {}; // Resetar progresso das linhas
         pararAnimacao(); // Parar qualquer animação anterior
-        mostrarResultados(data);
+        mostrarResultados(resultado);
         
         // Mostrar botão de animar
         const btnAnimar = document.getElementById('btn-animar');
@@ -225,6 +348,43 @@ async function otimizar() {
         draw();
     } catch (error) {
         console.error('Erro ao otimizar:', error);
+    } finally {
+        state.tarefa = null;
+        document.getElementById('progresso-otimizacao').style.display = 'none';
+    }
+}
+
+// Consulta a tarefa até ela terminar (concluída, com erro ou cancelada)
+async function acompanharTarefa(tarefa) {
+    while (true) {
+        const response = await fetch(`/api/jobs/${tarefa}`);
+        if (!response.ok) return null;
+        const data = await response.json();
+        if (data.estado !== 'na_fila' && data.estado !== 'executando') return data;
+        mostrarProgresso(data);
+        await new Promise(resolve => setTimeout(resolve, INTERVALO_CONSULTA_TAREFA));
+    }
+}
+
+function mostrarProgresso(data) {
+    const nomes = {
+        validacao: 'Validando o grafo',
+        emparelhamento: 'Emparelhando vértices ímpares',
+        ciclo: 'Montando o percurso',
+        gcode: 'Gerando o programa CNC'
+    };
+    const porcentagem = Math.round((data.progresso || 0) * 100);
+    document.getElementById('progresso-otimizacao').style.display = 'block';
+    document.getElementById('progresso-texto').textContent = `${nomes[data.fase] || data.fase}... ${porcentagem}%`;
+    document.getElementById('progresso-barra').value = data.progresso || 0;
+}
+
+async function cancelarOtimizacao() {
+    if (!state.tarefa) return;
+    try {
+        await fetch(`/api/jobs/${state.tarefa}`, { method: 'DELETE' });
+    } catch (error) {
+        console.error('Erro ao cancelar otimização:', error);
     }
 }
 
@@ -343,14 +503,15 @@ async function limparProjeto() {
     
     try {
         pararAnimacao(); // Parar animação se estiver rodando
-        await fetch('/api/limpar', { method: 'POST' });
-        state.points = {};
-        state.edges = [];
+        const response = await fetch(comVersao('/api/limpar'), { method: 'POST' });
+        aplicarResposta(await response.json());
         state.selectedPoint = null;
         state.optimizedPath = null;
+        state.optimizedTypes = null;
         state.animationStep = 0;
         atualizarSelects();
         atualizarStatus();
+        mostrarInfo([]);
         atualizarHint();
         fecharResultados();
         
@@ -366,14 +527,87 @@ async function limparProjeto() {
     }
 }
 
-async function carregarExemplo(tipo) {
+async function soldarPontos() {
+    // Funde pontos quase coincidentes no servidor antes da otimização; retorna false se falhar
+    const tolerancia = parseFloat(document.getElementById('tolerancia-soldagem').value) || 0.01;
+    const dividirJuncoes = document.getElementById('dividir-juncoes').checked;
+    const response = await fetch(comVersao('/api/soldar'), {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ tolerancia, dividir_juncoes: dividirJuncoes })
+    });
+    const data = await response.json();
+    if (!response.ok) {
+        alert(`Erro: ${data.erro || 'Não foi possível soldar os pontos'}`);
+        return false;
+    }
+    const est = data.soldagem;
+    if (est.operacoes) {
+        const partes = [`${est.fundidos} pontos fundidos`];
+        if (est.arestas_nulas) partes.push(`${est.arestas_nulas} trajetórias nulas removidas`);
+        if (est.isolados) partes.push(`${est.isolados} pontos isolados removidos`);
+        if (est.juncoes) partes.push(`${est.juncoes} junções em T divididas`);
+        mostrarInfo([`Soldagem: ${partes.join(', ')}`]);
+        if (state.mosaico) {
+            state.versao = data.versao;
+            state.regiao = null;
+            await carregarRegiao();
+        } else {
+            aplicarResposta(data);
+        }
+        if (!(state.selectedPoint in state.points)) state.selectedPoint = null;
+        atualizarSelects();
+        atualizarStatus(data.status);
+        draw();
+    }
+    return true;
+}
+
+async function importarDXF(input) {
+    // Envia o desenho ao servidor, que substitui o grafo; depois recarrega e enquadra a peça
+    const arquivo = input.files[0];
+    input.value = '';
+    if (!arquivo) return;
+    
+    const dados = new FormData();
+    dados.append('arquivo', arquivo);
     try {
-        const response = await fetch(`/api/exemplo/${tipo}`, { method: 'POST' });
+        pararAnimacao();
+        const response = await fetch(comProjeto('/api/importar/dxf'), { method: 'POST', body: dados });
         const data = await response.json();
+        if (!response.ok) {
+            alert(data.erro || 'Erro ao importar DXF');
+            return;
+        }
+        const est = data.estatisticas;
+        const descartadas = est.duplicadas + est.descartadas;
+        mostrarInfo([
+            `DXF: ${est.entidades} entidades → ${est.vertices} pontos e ${est.arestas} trajetórias`,
+            `${est.segundos.toFixed(2)} s (${Math.round(est.entidades_por_segundo)} entidades/s)` +
+                (descartadas ? `, ${descartadas} trajetórias descartadas` : '')
+        ]);
+        
+        state.mosaico = null;
+        state.agregado = null;
+        state.selectedPoint = null;
+        state.optimizedPath = null;
+        state.optimizedTypes = null;
+        fecharResultados();
+        if (data.limites) enquadrar(data.limites);
+        await carregarGrafo();
+    } catch (error) {
+        console.error('Erro ao importar DXF:', error);
+    }
+}
+
+async function carregarExemplo(tipo) {
+    try {
+        const response = await fetch(comVersao(`/api/exemplo/${tipo}`), { method: 'POST' });
+        aplicarResposta(await response.json());
         
-        // Calcular centro do canvas atual
-        const centroX = state.canvas.width / 2;
-        const centroY = state.canvas.height / 2;
+        // Calcular centro da área visível da mesa
+        const centroX = (state.canvas.width / 2 - state.offsetX) / state.scale;
+        const centroY = (state.canvas.height / 2 - state.offsetY) / state.scale;
         
         // Calcular offset para centralizar os pontos
         // Os exemplos são criados com centro em (400, 300)
@@ -382,40 +616,30 @@ async function carregarExemplo(tipo) {
         
         // Ajustar todas as coordenadas dos pontos
         const pontosAjustados = {};
-        Object.entries(data.grafo.vertices).forEach(([nome, pos]) => {
+        Object.entries(state.points).forEach(([nome, pos]) => {
             pontosAjustados[nome] = {
                 x: pos.x + offsetX,
                 y: pos.y + offsetY
             };
         });
         
-        // Atualizar pontos ajustados no servidor
-        // Limpar primeiro
-        await fetch('/api/limpar', { method: 'POST' });
-        
-        // Adicionar pontos ajustados
+        // Substituir o grafo no servidor pelos pontos ajustados em uma única requisição
+        const operacoes = [{ tipo: 'limpar' }];
         for (const [nome, pos] of Object.entries(pontosAjustados)) {
-            await fetch('/api/vertice', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ nome, x: pos.x, y: pos.y })
-            });
+            operacoes.push({ tipo: 'adicionar_vertice', nome, x: pos.x, y: pos.y });
         }
-        
-        // Adicionar arestas
-        for (const [origem, destino] of data.grafo.arestas) {
-            await fetch('/api/aresta', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ origem, destino })
-            });
+        for (const [origem, destino] of state.edges) {
+            operacoes.push({ tipo: 'adicionar_aresta', origem, destino });
         }
+        await enviarOperacoes(operacoes);
         
-        // Recarregar grafo atualizado
-        await carregarGrafo();
         state.selectedPoint = null;
         state.optimizedPath = null;
+        state.optimizedTypes = null;
+        atualizarSelects();
+        atualizarHint();
         fecharResultados();
+        draw();
     } catch (error) {
         console.error('Erro ao carregar exemplo:', error);
     }
@@ -429,10 +653,10 @@ function handleCanvasClick(e) {
         state.dragPoint = null;
         return;
     }
+    // Shift + clique move a vista; a visão agregada (zoom baixo no modo mosaico) não é editável
+    if (e.shiftKey || state.agregado) return;
     
-    const rect = state.canvas.getBoundingClientRect();
-    const x = e.clientX - rect.left;
-    const y = e.clientY - rect.top;
+    const { x, y } = posicaoNaMesa(e);
     
     console.log(`Clique no canvas - Modo: ${state.mode}, X: ${x}, Y: ${y}`);
     
@@ -477,9 +701,7 @@ function handleCanvasClick(e) {
 function handleRightClick(e) {
     e.preventDefault(); // Prevenir menu de contexto
     
-    const rect = state.canvas.getBoundingClientRect();
-    const x = e.clientX - rect.left;
-    const y = e.clientY - rect.top;
+    const { x, y } = posicaoNaMesa(e);
     
     const clickedPoint = encontrarPontoProximo(x, y);
     if (clickedPoint) {
@@ -496,9 +718,14 @@ function handleKeyDown(e) {
 }
 
 function handleCanvasMove(e) {
-    const rect = state.canvas.getBoundingClientRect();
-    const x = e.clientX - rect.left;
-    const y = e.clientY - rect.top;
+    if (state.panOrigem) {
+        state.offsetX = state.panOrigem.offsetX + e.clientX - state.panOrigem.x;
+        state.offsetY = state.panOrigem.offsetY + e.clientY - state.panOrigem.y;
+        vistaAlterada();
+        return;
+    }
+    
+    const { x, y } = posicaoNaMesa(e);
     
     // Salvar posição do mouse para linha temporária
     state.lastMousePos = { x, y };
@@ -507,84 +734,159 @@ function handleCanvasMove(e) {
         const point = state.points[state.dragPoint];
         point.x = x;
         point.y = y;
-        draw();
+        state.indice.mover(state.dragPoint, x, y);
+        if (state.optimizedPath) state.renderizador.invalidar('caminho');
+        agendarDesenho();
     } else {
         const point = encontrarPontoProximo(x, y);
-        if (state.mode === 'edge') {
+        if (state.agregado) {
+            state.canvas.style.cursor = 'zoom-in';
+        } else if (state.mode === 'edge') {
             state.canvas.style.cursor = point ? 'pointer' : 'not-allowed';
         } else {
             state.canvas.style.cursor = point ? 'move' : 'crosshair';
         }
-        // Redesenhar para mostrar linha temporária se houver ponto selecionado
-        if (state.selectedPoint && state.mode === 'edge') {
-            draw();
+        // Redesenhar destaque do ponto sob o cursor e linha temporária (só a camada dinâmica)
+        if (point !== state.pontoSobCursor || (state.selectedPoint && state.mode === 'edge')) {
+            state.pontoSobCursor = point;
+            agendarDesenho();
+        }
+    }
+}
+
+function enquadrar([xmin, ymin, xmax, ymax]) {
+    // Ajusta a vista para mostrar a caixa inteira
+    const largura = Math.max(xmax - xmin, 1e-9);
+    const altura = Math.max(ymax - ymin, 1e-9);
+    state.scale = Math.min(ESCALA_MAXIMA, Math.max(ESCALA_MINIMA,
+        0.9 * Math.min(state.canvas.width / largura, state.canvas.height / altura)));
+    state.offsetX = state.canvas.width / 2 - (xmin + xmax) / 2 * state.scale;
+    state.offsetY = state.canvas.height / 2 - (ymin + ymax) / 2 * state.scale;
+}
+
+function vistaAlterada() {
+    agendarDesenho();
+    if (!state.mosaico) return;
+    clearTimeout(state.temporizadorRegiao);
+    state.temporizadorRegiao = setTimeout(carregarRegiao, ESPERA_REGIAO);
+}
+
+function areaVisivel(folga = 0) {
+    const largura = state.canvas.width / state.scale;
+    const altura = state.canvas.height / state.scale;
+    const xmin = -state.offsetX / state.scale;
+    const ymin = -state.offsetY / state.scale;
+    return [xmin - largura * folga, ymin - altura * folga,
+            xmin + largura * (1 + folga), ymin + altura * (1 + folga)];
+}
+
+async function carregarRegiao() {
+    // Modo mosaico: baixa a geometria da área visível (com folga), exata ou agregada conforme o zoom
+    const [xmin, ymin, xmax, ymax] = areaVisivel();
+    const regiao = state.regiao;
+    if (regiao && xmin >= regiao.bbox[0] && ymin >= regiao.bbox[1] && xmax <= regiao.bbox[2] && ymax <= regiao.bbox[3] &&
+        (regiao.nivel === 'exato' || Math.abs(Math.log2(state.scale / regiao.zoom)) < 1)) {
+        return; // A região carregada ainda cobre a vista com o nível de detalhe certo
+    }
+    const consulta = ++state.consultaRegiao;
+    const bbox = areaVisivel(FOLGA_REGIAO);
+    try {
+        const url = comProjeto('/api/grafo/tile');
+        const response = await fetch(`${url}${url.includes('?') ? '&' : '?'}bbox=${bbox.join(',')}&zoom=${state.scale}`);
+        const data = await response.json();
+        if (!response.ok) throw new Error(data.erro || 'Erro ao carregar região');
+        if (consulta !== state.consultaRegiao) return; // Chegou uma resposta mais recente
+        
+        if (data.nivel === 'exato') {
+            state.points = data.vertices;
+            state.edges = data.arestas;
+            state.agregado = null;
+        } else {
+            state.points = {};
+            state.edges = [];
+            state.agregado = { pontos: data.pontos, segmentos: data.segmentos };
         }
+        state.indice.reconstruir(state.points);
+        state.versao = data.versao;
+        state.regiao = { bbox: data.bbox, zoom: state.scale, nivel: data.nivel };
+        state.renderizador.invalidar();
+        atualizarSelects();
+        atualizarHint();
+        draw();
+    } catch (error) {
+        console.error('Erro ao carregar região:', error);
     }
 }
 
+function handleWheel(e) {
+    // Zoom em torno do cursor
+    e.preventDefault();
+    const rect = state.canvas.getBoundingClientRect();
+    const sx = e.clientX - rect.left;
+    const sy = e.clientY - rect.top;
+    const escala = Math.min(ESCALA_MAXIMA, Math.max(ESCALA_MINIMA, state.scale * Math.exp(-e.deltaY * 0.0015)));
+    state.offsetX = sx - (sx - state.offsetX) * escala / state.scale;
+    state.offsetY = sy - (sy - state.offsetY) * escala / state.scale;
+    state.scale = escala;
+    vistaAlterada();
+}
+
+function posicaoNaMesa(e) {
+    // Coordenadas do evento no sistema dos pontos (desfaz zoom e deslocamento da vista)
+    const rect = state.canvas.getBoundingClientRect();
+    return {
+        x: (e.clientX - rect.left - state.offsetX) / state.scale,
+        y: (e.clientY - rect.top - state.offsetY) / state.scale
+    };
+}
+
 function handleCanvasMouseDown(e) {
+    // Botão do meio ou Shift + arrastar movem a vista
+    if (e.button === 1 || e.shiftKey) {
+        e.preventDefault();
+        state.panOrigem = { x: e.clientX, y: e.clientY, offsetX: state.offsetX, offsetY: state.offsetY };
+        return;
+    }
+    
     // Não iniciar arrasto se estiver no modo edge (deixa o clique processar)
     if (state.mode === 'edge') {
         return;
     }
     
-    const rect = state.canvas.getBoundingClientRect();
-    const x = e.clientX - rect.left;
-    const y = e.clientY - rect.top;
+    const { x, y } = posicaoNaMesa(e);
     
     const point = encontrarPontoProximo(x, y);
     if (point && state.mode === 'point') {
         state.isDragging = true;
         state.dragPoint = point;
+        state.renderizador.arrastar(point, state);
     }
 }
 
 function handleCanvasMouseUp() {
+    state.panOrigem = null;
     if (state.isDragging && state.dragPoint) {
         // Atualizar ponto no servidor
         const point = state.points[state.dragPoint];
         atualizarPontoNoServidor(state.dragPoint, point.x, point.y);
     }
+    if (state.dragPoint) state.renderizador.arrastar(null, state);
     state.isDragging = false;
     state.dragPoint = null;
 }
 
 async function atualizarPontoNoServidor(nome, x, y) {
-    // Salvar TODAS as conexões antes de atualizar
-    const todasConexoes = [...state.edges];
-    
     // Atualizar posição do ponto localmente para feedback visual
     if (state.points[nome]) {
         state.points[nome].x = x;
         state.points[nome].y = y;
+        state.indice.mover(nome, x, y);
     }
     
-    // Atualizar no servidor - remover e readicionar mantendo conexões
+    // Mover o ponto no servidor mantendo todas as conexões
     try {
-        // Passo 1: Remover ponto (isso remove automaticamente todas as conexões dele)
-        await fetch(`/api/vertice/${nome}`, { method: 'DELETE' });
-        
-        // Passo 2: Readicionar ponto na nova posição
-        await fetch('/api/vertice', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ nome, x, y })
-        });
-        
-        // Passo 3: Restaurar TODAS as conexões uma por uma
-        // Usar Promise.all para fazer todas as requisições em paralelo (mais rápido)
-        const promessas = todasConexoes.map(([origem, destino]) => 
-            fetch('/api/aresta', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ origem, destino })
-            })
-        );
-        
-        await Promise.all(promessas);
-        
-        // Passo 4: Recarregar estado completo do servidor para garantir sincronização
-        await carregarGrafo();
+        await enviarOperacoes([{ tipo: 'mover_vertice', nome, x, y }]);
+        draw();
     } catch (error) {
         console.error('Erro ao atualizar ponto:', error);
         // Recarregar em caso de erro para restaurar estado consistente
@@ -592,26 +894,34 @@ async function atualizarPontoNoServidor(nome, x, y) {
     }
 }
 
-function encontrarPontoProximo(x, y, limite = 30) {
-    let menorDistancia = Infinity;
-    let pontoProximo = null;
-    
-    for (const [nome, pos] of Object.entries(state.points)) {
-        const distancia = Math.sqrt((x - pos.x)**2 + (y - pos.y)**2);
-        if (distancia < menorDistancia && distancia < limite) {
-            menorDistancia = distancia;
-            pontoProximo = nome;
-        }
+async function enviarOperacoes(operacoes) {
+    // Aplica várias operações de forma atômica com uma única requisição
+    const response = await fetch(comVersao('/api/batch'), {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ operacoes })
+    });
+    const data = await response.json();
+    
+    if (!response.ok) {
+        throw new Error(data.erro || 'Erro ao aplicar operações');
     }
     
-    return pontoProximo;
+    aplicarResposta(data);
+    atualizarStatus(data.status);
+    return data;
+}
+
+function encontrarPontoProximo(x, y, limite = 30) {
+    // limite em pixels da tela
+    return state.indice.maisProximo(x, y, limite / state.scale);
 }
 
 async function conectarPontos(from, to) {
     try {
         console.log(`Conectando pontos: ${from} -> ${to}`);
         
-        const response = await fetch('/api/aresta', {
+        const response = await fetch(comVersao('/api/aresta'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ origem: from, destino: to })
@@ -627,8 +937,7 @@ async function conectarPontos(from, to) {
         console.log('Resposta do servidor:', data);
         
         // Atualizar estado local com dados do servidor
-        state.points = data.grafo.vertices;
-        state.edges = data.grafo.arestas;
+        aplicarResposta(data);
         
         console.log('Estado atualizado - Pontos:', Object.keys(state.points).length, 'Arestas:', state.edges.length);
         console.log('Arestas:', state.edges);
@@ -674,7 +983,7 @@ async function excluirPonto(nome) {
     }
     
     try {
-        const response = await fetch(`/api/vertice/${nome}`, {
+        const response = await fetch(comVersao(`/api/vertice/${nome}`), {
             method: 'DELETE'
         });
         
@@ -685,10 +994,10 @@ async function excluirPonto(nome) {
         }
         
         const data = await response.json();
-        state.points = data.grafo.vertices;
-        state.edges = data.grafo.arestas;
+        aplicarResposta(data);
         state.selectedPoint = null;
         state.optimizedPath = null;
+        state.optimizedTypes = null;
         atualizarSelects();
         atualizarStatus(data.status);
         atualizarHint();
@@ -702,161 +1011,15 @@ async function excluirPonto(nome) {
 
 // Drawing
 function draw() {
-    const ctx = state.ctx;
-    const width = state.canvas.width;
-    const height = state.canvas.height;
-    
-    // Limpar canvas
-    ctx.clearRect(0, 0, width, height);
-    
-    // Desenhar trajetórias normais
-    if (state.edges && Array.isArray(state.edges) && state.edges.length > 0) {
-        state.edges.forEach((edge) => {
-            // Suportar tanto array [from, to] quanto objeto {origem, destino}
-            let from, to;
-            if (Array.isArray(edge)) {
-                [from, to] = edge;
-            } else if (edge.origem && edge.destino) {
-                from = edge.origem;
-                to = edge.destino;
-            } else {
-                return; // Formato desconhecido, pular
-            }
-            
-            const p1 = state.points[from];
-            const p2 = state.points[to];
-            if (p1 && p2) {
-                ctx.strokeStyle = '#9ca3af';
-                ctx.setLineDash([5, 5]);
-                ctx.lineWidth = 2;
-                ctx.beginPath();
-                ctx.moveTo(p1.x, p1.y);
-                ctx.lineTo(p2.x, p2.y);
-                ctx.stroke();
-            }
-        });
-    }
-    
-    // Desenhar linha temporária quando um ponto está selecionado no modo edge
-    if (state.mode === 'edge' && state.selectedPoint && state.points[state.selectedPoint]) {
-        const selectedPos = state.points[state.selectedPoint];
-        const mousePos = state.lastMousePos || { x: selectedPos.x, y: selectedPos.y };
-        
-        ctx.strokeStyle = '#3b82f6';
-        ctx.setLineDash([3, 3]);
-        ctx.lineWidth = 2;
-        ctx.beginPath();
-        ctx.moveTo(selectedPos.x, selectedPos.y);
-        ctx.lineTo(mousePos.x, mousePos.y);
-        ctx.stroke();
-        
-        // Desenhar círculo no ponto de destino potencial
-        const hoverPoint = encontrarPontoProximo(mousePos.x, mousePos.y);
-        if (hoverPoint && hoverPoint !== state.selectedPoint) {
-            const hoverPos = state.points[hoverPoint];
-            ctx.strokeStyle = '#3b82f6';
-            ctx.lineWidth = 2;
-            ctx.setLineDash([]);
-            ctx.beginPath();
-            ctx.arc(hoverPos.x, hoverPos.y, 10, 0, Math.PI * 2);
-            ctx.stroke();
-        }
-    }
-    
-    // Desenhar caminho otimizado
-    if (state.optimizedPath && state.optimizedPath.length > 1) {
-        // Determinar quantas linhas desenhar
-        // Se está animando, só desenha até animationStep; senão, desenha todas
-        const maxSteps = state.isAnimating ? state.animationStep : state.optimizedPath.length - 1;
-        
-        for (let i = 0; i < state.optimizedPath.length - 1; i++) {
-            // Só desenha se i < maxSteps
-            if (i >= maxSteps) {
-                continue; // Pula esta linha se ainda não foi animada
-            }
-            
-            const p1 = state.points[state.optimizedPath[i]];
-            const p2 = state.points[state.optimizedPath[i + 1]];
-            if (p1 && p2) {
-                // Obter progresso de preenchimento desta linha (0-1)
-                const lineProgress = state.lineProgress[i]?.progress ?? 1;
-                
-                // Calcular ponto final baseado no progresso
-                const currentX = p1.x + (p2.x - p1.x) * lineProgress;
-                const currentY = p1.y + (p2.y - p1.y) * lineProgress;
-                
-                // Linha vermelha destacada (mais grossa quando animando)
-                ctx.setLineDash([]);
-                ctx.strokeStyle = '#ef4444';
-                ctx.lineWidth = state.isAnimating ? 5 : 4;
-                ctx.lineCap = 'round'; // Ponta arredondada para melhor visualização
-                ctx.beginPath();
-                ctx.moveTo(p1.x, p1.y);
-                ctx.lineTo(currentX, currentY);
-                ctx.stroke();
-                
-                // Desenhar número apenas se a linha estiver completamente preenchida ou quase
-                if (lineProgress >= 0.5) {
-                    // Número da etapa com destaque
-                    const midX = (p1.x + p2.x) / 2;
-                    const midY = (p1.y + p2.y) / 2;
-                    
-                    // Fundo branco para destacar (com opacidade baseada no progresso)
-                    const opacity = Math.min(lineProgress * 2, 1); // Aparece quando progresso >= 0.5
-                    ctx.globalAlpha = opacity;
-                    ctx.fillStyle = '#ffffff';
-                    ctx.beginPath();
-                    ctx.arc(midX, midY, 18, 0, Math.PI * 2);
-                    ctx.fill();
-                    
-                    // Borda preta
-                    ctx.strokeStyle = '#000000';
-                    ctx.lineWidth = 2;
-                    ctx.stroke();
-                    
-                    // Texto preto em negrito maior
-                    ctx.fillStyle = '#000000';
-                    ctx.font = 'bold 16px Arial';
-                    ctx.textAlign = 'center';
-                    ctx.textBaseline = 'middle';
-                    ctx.fillText(`N${i + 1}`, midX, midY);
-                    ctx.globalAlpha = 1; // Resetar opacidade
-                }
-            }
-        }
-    }
-    
-    // Desenhar pontos
-    ctx.setLineDash([]);
-    Object.entries(state.points).forEach(([nome, pos]) => {
-        let color = '#2563eb';
-        let size = 8;
-        
-        if (nome === state.selectedPoint) {
-            color = '#ef4444';
-            size = 12;
-        } else if (state.optimizedPath && nome === state.optimizedPath[0]) {
-            color = '#10b981';
-            size = 10;
-        }
-        
-        // Círculo
-        ctx.fillStyle = color;
-        ctx.beginPath();
-        ctx.arc(pos.x, pos.y, size, 0, Math.PI * 2);
-        ctx.fill();
-        
-        // Borda
-        ctx.strokeStyle = color === '#2563eb' ? '#1e40af' : color === '#ef4444' ? '#dc2626' : '#059669';
-        ctx.lineWidth = 2;
-        ctx.stroke();
-        
-        // Label
-        ctx.fillStyle = '#1f2937';
-        ctx.font = '600 11px Arial';
-        ctx.textAlign = 'center';
-        ctx.textBaseline = 'bottom';
-        ctx.fillText(nome, pos.x, pos.y - size - 4);
+    state.renderizador.desenhar(state);
+}
+
+function agendarDesenho() {
+    // Agrupa vários pedidos (eventos do mouse) num único quadro
+    if (state.desenhoAgendado) return;
+    state.desenhoAgendado = requestAnimationFrame(() => {
+        state.desenhoAgendado = null;
+        draw();
     });
 }
 
@@ -877,8 +1040,9 @@ function atualizarSelects() {
 }
 
 function atualizarStatus(status = null) {
-    document.getElementById('num-points').textContent = Object.keys(state.points).length;
-    document.getElementById('num-edges').textContent = state.edges.length;
+    // No modo mosaico só a região visível está no cliente: mostra os totais do servidor
+    document.getElementById('num-points').textContent = state.mosaico ? state.mosaico.num_vertices : Object.keys(state.points).length;
+    document.getElementById('num-edges').textContent = state.mosaico ? state.mosaico.num_arestas : state.edges.length;
     
     const statusText = document.getElementById('status-text');
     if (!status) {
@@ -893,6 +1057,17 @@ function atualizarStatus(status = null) {
     }
 }
 
+function mostrarInfo(linhas) {
+    // Resumo da última importação/soldagem no painel de status (vazio: esconde)
+    const info = document.getElementById('tempo-info');
+    info.replaceChildren(...linhas.map(texto => {
+        const linha = document.createElement('p');
+        linha.textContent = texto;
+        return linha;
+    }));
+    info.classList.toggle('hidden', !linhas.length);
+}
+
 function mostrarResultados(data) {
     const panel = document.getElementById('results-panel');
     const stats = document.getElementById('results-stats');
@@ -915,10 +1090,42 @@ function mostrarResultados(data) {
             <div class="stat-label">Trajetórias</div>
             <div class="stat-value">${data.estatisticas.trajetorias_percorridas}</div>
         </div>
+        <div class="stat-item">
+            <div class="stat-label">Deslocamentos</div>
+            <div class="stat-value">${data.estatisticas.deslocamentos || 0}</div>
+        </div>
     `;
     
-    code.textContent = data.programa_cnc;
+    const compactacao = data.programa.compactacao;
+    if (compactacao) {
+        stats.innerHTML += `
+            <div class="stat-item">
+                <div class="stat-label">Programa Compactado</div>
+                <div class="stat-value">-${(compactacao.reducao_bytes * 100).toFixed(1)}% bytes, -${(compactacao.reducao_blocos * 100).toFixed(1)}% blocos</div>
+            </div>
+        `;
+    }
+    
+    document.getElementById('download-programa').href = data.programa.url;
+    code.textContent = 'Carregando programa...';
     panel.classList.remove('hidden');
+    carregarPreviaPrograma(data.programa);
+}
+
+async function carregarPreviaPrograma(programa) {
+    // O programa completo pode ter milhões de linhas: mostrar só o início e oferecer o download
+    const code = document.getElementById('cnc-code');
+    try {
+        const response = await fetch(`${programa.url}&limite=${LIMITE_PREVIA_PROGRAMA}`);
+        let texto = await response.text();
+        if (programa.linhas > LIMITE_PREVIA_PROGRAMA) {
+            texto += `\n; ... ${programa.linhas - LIMITE_PREVIA_PROGRAMA} linhas restantes (baixe o programa completo)`;
+        }
+        code.textContent = texto;
+    } catch (error) {
+        console.error('Erro ao carregar programa:', error);
+        code.textContent = 'Não foi possível carregar o programa.';
+    }
 }
 
 function fecharResultados() {
@@ -929,7 +1136,7 @@ function atualizarHint() {
     const hint = document.getElementById('canvas-hint');
     const numPoints = Object.keys(state.points).length;
     
-    if (numPoints === 0) {
+    if (numPoints === 0 && !state.agregado) {
         hint.style.display = 'flex';
         if (state.mode === 'point') {
             hint.textContent = 'Clique para adicionar pontos de corte';
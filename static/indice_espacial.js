@@ -0,0 +1,137 @@
+// Índice espacial dos pontos do canvas para seleção pelo mouse.
+// Grade uniforme (hash de células), a mesma estrutura de indice_espacial.py:
+// inserir, mover e remover custam O(1) e a busca do ponto mais próximo visita
+// apenas as células que cruzam o raio procurado. A grade é refinada quando a
+// ocupação média das células passa de OCUPACAO_MAXIMA_CELULA.
+
+const TAMANHO_CELULA_PADRAO = 32; // px
+const OCUPACAO_MAXIMA_CELULA = 8;
+const TAMANHO_CELULA_MINIMO = 1e-6;
+
+class GradeEspacial {
+    constructor(tamanhoCelula = TAMANHO_CELULA_PADRAO) {
+        this.tamanhoInicial = tamanhoCelula;
+        this.limpar();
+    }
+
+    get tamanho() {
+        return this.posicoes.size;
+    }
+
+    chave(i, j) {
+        return `${i},${j}`;
+    }
+
+    celula(x, y) {
+        return [Math.floor(x / this.tamanhoCelula), Math.floor(y / this.tamanhoCelula)];
+    }
+
+    retirar(nome) {
+        const [x, y] = this.posicoes.get(nome);
+        this.posicoes.delete(nome);
+        const chave = this.chave(...this.celula(x, y));
+        const celula = this.celulas.get(chave);
+        celula.delete(nome);
+        if (celula.size === 0) this.celulas.delete(chave);
+    }
+
+    inserir(nome, x, y) {
+        const chave = this.chave(...this.celula(x, y));
+        let celula = this.celulas.get(chave);
+        if (!celula) {
+            celula = new Map();
+            this.celulas.set(chave, celula);
+        }
+        celula.set(nome, [x, y]);
+    }
+
+    // Insere o ponto (ou o move, se o nome já existe)
+    adicionar(nome, x, y) {
+        if (this.posicoes.has(nome)) this.retirar(nome);
+        this.posicoes.set(nome, [x, y]);
+        this.inserir(nome, x, y);
+        if (this.posicoes.size > OCUPACAO_MAXIMA_CELULA * this.celulas.size && this.posicoes.size >= this.limiteRefino) {
+            this.refinar();
+        }
+    }
+
+    mover(nome, x, y) {
+        this.adicionar(nome, x, y);
+    }
+
+    remover(nome) {
+        if (this.posicoes.has(nome)) this.retirar(nome);
+    }
+
+    limpar() {
+        this.tamanhoCelula = this.tamanhoInicial;
+        this.celulas = new Map(); // "i,j" -> Map(nome -> [x, y])
+        this.posicoes = new Map(); // nome -> [x, y]
+        this.limiteRefino = 0; // só tenta refinar de novo ao dobrar o número de pontos
+    }
+
+    // Reconstrói o índice a partir de { nome: { x, y } }
+    reconstruir(pontos) {
+        this.limpar();
+        Object.entries(pontos).forEach(([nome, pos]) => this.adicionar(nome, pos.x, pos.y));
+    }
+
+    refinar() {
+        // Pontos repetidos não se separam: para quando dividir não espalha mais
+        while (this.posicoes.size > OCUPACAO_MAXIMA_CELULA * this.celulas.size &&
+               this.tamanhoCelula / 2 >= TAMANHO_CELULA_MINIMO) {
+            const ocupadas = this.celulas.size;
+            this.tamanhoCelula /= 2;
+            this.celulas = new Map();
+            this.posicoes.forEach(([x, y], nome) => this.inserir(nome, x, y));
+            if (this.celulas.size === ocupadas) break;
+        }
+        this.limiteRefino = 2 * this.posicoes.size;
+    }
+
+    // Células ocupadas que cruzam a caixa (percorre a menor das duas coleções)
+    *celulasNaCaixa(xmin, ymin, xmax, ymax) {
+        const [i0, j0] = this.celula(xmin, ymin);
+        const [i1, j1] = this.celula(xmax, ymax);
+        if ((i1 - i0 + 1) * (j1 - j0 + 1) <= this.celulas.size) {
+            for (let i = i0; i <= i1; i++) {
+                for (let j = j0; j <= j1; j++) {
+                    const celula = this.celulas.get(this.chave(i, j));
+                    if (celula) yield celula;
+                }
+            }
+        } else {
+            for (const [chave, celula] of this.celulas) {
+                const [i, j] = chave.split(',').map(Number);
+                if (i >= i0 && i <= i1 && j >= j0 && j <= j1) yield celula;
+            }
+        }
+    }
+
+    // Nome do ponto mais próximo de (x, y) a distância menor que raio, ou null
+    maisProximo(x, y, raio) {
+        let melhor = null;
+        let melhorD2 = raio * raio;
+        for (const celula of this.celulasNaCaixa(x - raio, y - raio, x + raio, y + raio)) {
+            for (const [nome, [px, py]] of celula) {
+                const d2 = (px - x) ** 2 + (py - y) ** 2;
+                if (d2 < melhorD2) {
+                    melhor = nome;
+                    melhorD2 = d2;
+                }
+            }
+        }
+        return melhor;
+    }
+
+    // Nomes dos pontos dentro da caixa (limites inclusivos)
+    naCaixa(xmin, ymin, xmax, ymax) {
+        const nomes = [];
+        for (const celula of this.celulasNaCaixa(xmin, ymin, xmax, ymax)) {
+            for (const [nome, [px, py]] of celula) {
+                if (px >= xmin && px <= xmax && py >= ymin && py <= ymax) nomes.push(nome);
+            }
+        }
+        return nomes;
+    }
+}
@@ -0,0 +1,370 @@
+// Renderização em camadas do canvas da mesa de trabalho.
+// Três camadas fora da tela guardam o que muda pouco: trajetórias, caminho
+// otimizado e pontos. Cada uma só é refeita quando muda a versão do grafo, o
+// caminho, a vista (zoom/deslocamento) ou o tamanho do canvas. A cada quadro o
+// canvas visível apenas compõe as camadas e desenha por cima o que é dinâmico:
+// ponto sob o cursor, seleção, linha temporária, ponto arrastado e os trechos
+// em animação com a cabeça da ferramenta. Só o que cruza a área visível é
+// desenhado, e os rótulos somem com zoom baixo ou quando há pontos demais.
+// No modo mosaico com zoom baixo a camada das trajetórias mostra a geometria
+// agregada recebida de /api/grafo/tile.
+
+const ESCALA_MINIMA_ROTULOS = 0.5;
+const LIMITE_ROTULOS_VISIVEIS = 1500;
+const MARGEM_VISIVEL = 24; // px além da borda ainda desenhados (raio dos pontos e rótulos)
+
+function extremosAresta(edge) {
+    // Suportar tanto array [from, to] quanto objeto {origem, destino}
+    if (Array.isArray(edge)) return edge;
+    if (edge && edge.origem && edge.destino) return [edge.origem, edge.destino];
+    return null;
+}
+
+class RenderizadorCanvas {
+    constructor(canvas) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+        this.camadas = {};
+        ['arestas', 'caminho', 'pontos'].forEach(nome => {
+            const camada = document.createElement('canvas');
+            this.camadas[nome] = { canvas: camada, ctx: camada.getContext('2d'), chave: null };
+        });
+        this.caminhoDesenhado = 0; // trechos já gravados na camada do caminho durante a animação
+        this.arrastado = null; // ponto arrastado: sai das camadas e é desenhado a cada quadro
+        this.arestasArrastado = [];
+    }
+
+    // Força a reconstrução de uma camada (ou de todas)
+    invalidar(nome = null) {
+        Object.entries(this.camadas).forEach(([chave, camada]) => {
+            if (nome === null || nome === chave) camada.chave = null;
+        });
+    }
+
+    // Início (nome) ou fim (null) do arrasto de um ponto
+    arrastar(nome, state) {
+        this.arrastado = nome;
+        this.arestasArrastado = nome === null ? [] : state.edges.map(extremosAresta)
+            .filter(par => par && (par[0] === nome || par[1] === nome));
+        this.invalidar();
+    }
+
+    tela(state, pos) {
+        return [pos.x * state.scale + state.offsetX, pos.y * state.scale + state.offsetY];
+    }
+
+    // Retângulo visível em coordenadas do grafo
+    areaVisivel(state) {
+        const margem = MARGEM_VISIVEL / state.scale;
+        return {
+            xmin: -state.offsetX / state.scale - margem,
+            ymin: -state.offsetY / state.scale - margem,
+            xmax: (this.canvas.width - state.offsetX) / state.scale + margem,
+            ymax: (this.canvas.height - state.offsetY) / state.scale + margem
+        };
+    }
+
+    static visivel(area, p) {
+        return p.x >= area.xmin && p.x <= area.xmax && p.y >= area.ymin && p.y <= area.ymax;
+    }
+
+    static segmentoVisivel(area, p1, p2) {
+        // Rejeição trivial: os dois extremos do mesmo lado de fora da área
+        return !((p1.x < area.xmin && p2.x < area.xmin) || (p1.x > area.xmax && p2.x > area.xmax) ||
+                 (p1.y < area.ymin && p2.y < area.ymin) || (p1.y > area.ymax && p2.y > area.ymax));
+    }
+
+    // Prepara a camada; retorna true se ela precisa ser refeita
+    prepararCamada(nome, chave) {
+        const camada = this.camadas[nome];
+        if (camada.canvas.width !== this.canvas.width || camada.canvas.height !== this.canvas.height) {
+            camada.canvas.width = this.canvas.width;
+            camada.canvas.height = this.canvas.height;
+            camada.chave = null;
+        }
+        if (camada.chave !== null && camada.chave.length === chave.length &&
+            camada.chave.every((valor, i) => valor === chave[i])) {
+            return false;
+        }
+        camada.chave = chave;
+        camada.ctx.clearRect(0, 0, camada.canvas.width, camada.canvas.height);
+        return true;
+    }
+
+    desenhar(state) {
+        const vista = [state.scale, state.offsetX, state.offsetY, this.canvas.width, this.canvas.height];
+        const area = this.areaVisivel(state);
+        const rotulos = state.scale >= ESCALA_MINIMA_ROTULOS;
+
+        if (this.prepararCamada('arestas', [state.versao, state.edges, state.agregado, this.arrastado, ...vista])) {
+            if (state.agregado) {
+                this.desenharAgregado(this.camadas.arestas.ctx, state, area);
+            } else {
+                this.desenharArestas(this.camadas.arestas.ctx, state, area);
+            }
+        }
+        const caminho = state.optimizedPath && state.optimizedPath.length > 1 ? state.optimizedPath : null;
+        if (this.prepararCamada('caminho', [state.versao, caminho, state.isAnimating, ...vista])) {
+            this.caminhoDesenhado = state.isAnimating ? 0 : (caminho ? caminho.length - 1 : 0);
+            if (caminho) this.desenharTrechos(this.camadas.caminho.ctx, state, area, 0, this.caminhoDesenhado, rotulos);
+        }
+        if (caminho && state.isAnimating) {
+            // Grava na camada os trechos cuja animação terminou
+            let fim = this.caminhoDesenhado;
+            while (fim < state.animationStep && (state.lineProgress[fim]?.progress ?? 0) >= 1) fim++;
+            if (fim > this.caminhoDesenhado) {
+                this.desenharTrechos(this.camadas.caminho.ctx, state, area, this.caminhoDesenhado, fim, rotulos);
+                this.caminhoDesenhado = fim;
+            }
+        }
+        const inicio = caminho ? caminho[0] : null;
+        if (this.prepararCamada('pontos', [state.versao, state.points, inicio, this.arrastado, ...vista])) {
+            this.desenharPontos(this.camadas.pontos.ctx, state, area, inicio);
+        }
+
+        const ctx = this.ctx;
+        ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+        ctx.drawImage(this.camadas.arestas.canvas, 0, 0);
+        ctx.drawImage(this.camadas.caminho.canvas, 0, 0);
+        ctx.drawImage(this.camadas.pontos.canvas, 0, 0);
+        this.desenharDinamico(ctx, state, caminho, rotulos);
+    }
+
+    desenharArestas(ctx, state, area) {
+        ctx.strokeStyle = '#9ca3af';
+        ctx.setLineDash([5, 5]);
+        ctx.lineWidth = 2;
+        ctx.beginPath();
+        state.edges.forEach(edge => {
+            const par = extremosAresta(edge);
+            if (!par || par[0] === this.arrastado || par[1] === this.arrastado) return;
+            const p1 = state.points[par[0]];
+            const p2 = state.points[par[1]];
+            if (!p1 || !p2 || !RenderizadorCanvas.segmentoVisivel(area, p1, p2)) return;
+            ctx.moveTo(...this.tela(state, p1));
+            ctx.lineTo(...this.tela(state, p2));
+        });
+        ctx.stroke();
+        ctx.setLineDash([]);
+    }
+
+    // Geometria agregada do modo mosaico: [x, y, n] por célula e [x1, y1, x2, y2, n] por par de células
+    desenharAgregado(ctx, state, area) {
+        const { pontos, segmentos } = state.agregado;
+        const p1 = { x: 0, y: 0 };
+        const p2 = { x: 0, y: 0 };
+        ctx.strokeStyle = '#9ca3af';
+        [1, 2, 3].forEach(largura => {
+            // Espessura cresce com o número de trajetórias agregadas (1-2, 3-7, 8+)
+            ctx.lineWidth = largura;
+            ctx.beginPath();
+            segmentos.forEach(([x1, y1, x2, y2, n]) => {
+                if (Math.min(3, 1 + Math.floor(Math.log2(n) / 1.5)) !== largura) return;
+                p1.x = x1; p1.y = y1; p2.x = x2; p2.y = y2;
+                if (!RenderizadorCanvas.segmentoVisivel(area, p1, p2)) return;
+                ctx.moveTo(...this.tela(state, p1));
+                ctx.lineTo(...this.tela(state, p2));
+            });
+            ctx.stroke();
+        });
+        ctx.fillStyle = 'rgba(37, 99, 235, 0.7)';
+        ctx.beginPath();
+        pontos.forEach(([x, y, n]) => {
+            p1.x = x; p1.y = y;
+            if (!RenderizadorCanvas.visivel(area, p1)) return;
+            const [sx, sy] = this.tela(state, p1);
+            const r = Math.min(6, 1.5 + Math.log2(n) / 2);
+            ctx.moveTo(sx + r, sy);
+            ctx.arc(sx, sy, r, 0, Math.PI * 2);
+        });
+        ctx.fill();
+    }
+
+    // Trechos [de, ate) do caminho otimizado, agrupados por estilo num único traço cada
+    desenharTrechos(ctx, state, area, de, ate, rotulos) {
+        const caminho = state.optimizedPath;
+        const visiveis = [];
+        for (let i = de; i < ate; i++) {
+            const p1 = state.points[caminho[i]];
+            const p2 = state.points[caminho[i + 1]];
+            if (p1 && p2 && RenderizadorCanvas.segmentoVisivel(area, p1, p2)) visiveis.push([i, p1, p2]);
+        }
+        [false, true].forEach(deslocamento => {
+            ctx.setLineDash(deslocamento ? [8, 6] : []);
+            ctx.strokeStyle = deslocamento ? '#f59e0b' : '#ef4444';
+            ctx.lineWidth = deslocamento ? 2 : (state.isAnimating ? 5 : 4);
+            ctx.lineCap = 'round';
+            ctx.beginPath();
+            visiveis.forEach(([i, p1, p2]) => {
+                if ((state.optimizedTypes?.[i] === 'deslocamento') !== deslocamento) return;
+                ctx.moveTo(...this.tela(state, p1));
+                ctx.lineTo(...this.tela(state, p2));
+            });
+            ctx.stroke();
+        });
+        ctx.setLineDash([]);
+        if (rotulos && visiveis.length <= LIMITE_ROTULOS_VISIVEIS) {
+            visiveis.forEach(([i, p1, p2]) => this.desenharEtapa(ctx, state, i, p1, p2, 1));
+        }
+    }
+
+    // Número da etapa com destaque no meio do trecho
+    desenharEtapa(ctx, state, i, p1, p2, opacidade) {
+        const [x, y] = this.tela(state, { x: (p1.x + p2.x) / 2, y: (p1.y + p2.y) / 2 });
+        ctx.globalAlpha = opacidade;
+        ctx.fillStyle = '#ffffff';
+        ctx.beginPath();
+        ctx.arc(x, y, 18, 0, Math.PI * 2);
+        ctx.fill();
+        ctx.strokeStyle = '#000000';
+        ctx.lineWidth = 2;
+        ctx.stroke();
+        ctx.fillStyle = '#000000';
+        ctx.font = 'bold 16px Arial';
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'middle';
+        ctx.fillText(`N${i + 1}`, x, y);
+        ctx.globalAlpha = 1;
+    }
+
+    raio(state, tamanho) {
+        // Pontos encolhem com zoom baixo para não virarem uma mancha
+        return tamanho * Math.min(1, Math.max(state.scale, 0.3));
+    }
+
+    desenharPontos(ctx, state, area, inicio) {
+        const visiveis = Object.entries(state.points)
+            .filter(([nome, pos]) => nome !== this.arrastado && RenderizadorCanvas.visivel(area, pos));
+        const estilos = [
+            { cor: '#2563eb', borda: '#1e40af', tamanho: 8, filtro: nome => nome !== inicio },
+            { cor: '#10b981', borda: '#059669', tamanho: 10, filtro: nome => nome === inicio }
+        ];
+        estilos.forEach(({ cor, borda, tamanho, filtro }) => {
+            const r = this.raio(state, tamanho);
+            ctx.fillStyle = cor;
+            ctx.strokeStyle = borda;
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            visiveis.forEach(([nome, pos]) => {
+                if (!filtro(nome)) return;
+                const [x, y] = this.tela(state, pos);
+                ctx.moveTo(x + r, y);
+                ctx.arc(x, y, r, 0, Math.PI * 2);
+            });
+            ctx.fill();
+            ctx.stroke();
+        });
+        if (state.scale >= ESCALA_MINIMA_ROTULOS && visiveis.length <= LIMITE_ROTULOS_VISIVEIS) {
+            visiveis.forEach(([nome, pos]) => this.desenharRotulo(ctx, state, nome, pos, nome === inicio ? 10 : 8));
+        }
+    }
+
+    desenharRotulo(ctx, state, nome, pos, tamanho) {
+        const [x, y] = this.tela(state, pos);
+        ctx.fillStyle = '#1f2937';
+        ctx.font = '600 11px Arial';
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'bottom';
+        ctx.fillText(nome, x, y - this.raio(state, tamanho) - 4);
+    }
+
+    desenharPonto(ctx, state, pos, cor, borda, tamanho) {
+        const [x, y] = this.tela(state, pos);
+        ctx.fillStyle = cor;
+        ctx.strokeStyle = borda;
+        ctx.lineWidth = 2;
+        ctx.beginPath();
+        ctx.arc(x, y, this.raio(state, tamanho), 0, Math.PI * 2);
+        ctx.fill();
+        ctx.stroke();
+    }
+
+    desenharDinamico(ctx, state, caminho, rotulos) {
+        // Ponto arrastado e suas trajetórias
+        const arrastado = this.arrastado && state.points[this.arrastado];
+        if (arrastado) {
+            ctx.strokeStyle = '#9ca3af';
+            ctx.setLineDash([5, 5]);
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            this.arestasArrastado.forEach(([origem, destino]) => {
+                const p1 = state.points[origem];
+                const p2 = state.points[destino];
+                if (!p1 || !p2) return;
+                ctx.moveTo(...this.tela(state, p1));
+                ctx.lineTo(...this.tela(state, p2));
+            });
+            ctx.stroke();
+            ctx.setLineDash([]);
+            this.desenharPonto(ctx, state, arrastado, '#2563eb', '#1e40af', 8);
+            if (rotulos) this.desenharRotulo(ctx, state, this.arrastado, arrastado, 8);
+        }
+
+        // Trechos em animação (ainda não gravados na camada) e cabeça da ferramenta
+        if (caminho && state.isAnimating) {
+            let cabeca = null;
+            for (let i = this.caminhoDesenhado; i < state.animationStep; i++) {
+                const p1 = state.points[caminho[i]];
+                const p2 = state.points[caminho[i + 1]];
+                if (!p1 || !p2) continue;
+                const progresso = state.lineProgress[i]?.progress ?? 1;
+                const atual = { x: p1.x + (p2.x - p1.x) * progresso, y: p1.y + (p2.y - p1.y) * progresso };
+                const deslocamento = state.optimizedTypes?.[i] === 'deslocamento';
+                ctx.setLineDash(deslocamento ? [8, 6] : []);
+                ctx.strokeStyle = deslocamento ? '#f59e0b' : '#ef4444';
+                ctx.lineWidth = deslocamento ? 2 : 5;
+                ctx.lineCap = 'round';
+                ctx.beginPath();
+                ctx.moveTo(...this.tela(state, p1));
+                ctx.lineTo(...this.tela(state, atual));
+                ctx.stroke();
+                ctx.setLineDash([]);
+                if (rotulos && progresso >= 0.5) this.desenharEtapa(ctx, state, i, p1, p2, Math.min(progresso * 2, 1));
+                cabeca = atual;
+            }
+            if (cabeca) {
+                const [x, y] = this.tela(state, cabeca);
+                ctx.strokeStyle = '#111827';
+                ctx.fillStyle = '#fde047';
+                ctx.lineWidth = 2;
+                ctx.beginPath();
+                ctx.arc(x, y, 7, 0, Math.PI * 2);
+                ctx.fill();
+                ctx.stroke();
+                ctx.beginPath();
+                ctx.moveTo(x - 11, y);
+                ctx.lineTo(x + 11, y);
+                ctx.moveTo(x, y - 11);
+                ctx.lineTo(x, y + 11);
+                ctx.stroke();
+            }
+        }
+
+        // Linha temporária quando um ponto está selecionado no modo edge
+        const selecionado = state.selectedPoint && state.points[state.selectedPoint];
+        if (state.mode === 'edge' && selecionado) {
+            const mouse = state.lastMousePos || selecionado;
+            ctx.strokeStyle = '#3b82f6';
+            ctx.setLineDash([3, 3]);
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            ctx.moveTo(...this.tela(state, selecionado));
+            ctx.lineTo(...this.tela(state, mouse));
+            ctx.stroke();
+            ctx.setLineDash([]);
+        }
+
+        // Círculo no ponto sob o cursor
+        const proximo = state.pontoSobCursor && state.points[state.pontoSobCursor];
+        if (proximo && state.pontoSobCursor !== state.selectedPoint) {
+            const [x, y] = this.tela(state, proximo);
+            ctx.strokeStyle = '#3b82f6';
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            ctx.arc(x, y, this.raio(state, 10) + 2, 0, Math.PI * 2);
+            ctx.stroke();
+        }
+
+        if (selecionado) this.desenharPonto(ctx, state, selecionado, '#ef4444', '#dc2626', 12);
+    }
+}
@@ -0,0 +1,156 @@
+"""
+Manutenção incremental do status euleriano de um grafo.
+
+Em vez de reverificar o grafo inteiro a cada alteração, o status guarda o
+conjunto de vértices de grau ímpar (atualizado em O(1) por aresta) e um rótulo
+de componente conexo por vértice. Uma inserção que liga dois componentes
+reetiqueta o menor deles (custo total O(V log V)). A remoção da última aresta
+entre dois vértices é decidida localmente, por buscas em largura alternadas a
+partir dos dois extremos: se elas se encontram, nada muda; se uma se esgota,
+os vértices que ela visitou formam um componente novo. O custo fica limitado
+pelo lado menor, ou pelo caminho até o encontro; nenhuma operação percorre o
+grafo inteiro, a não ser a remoção de uma aresta que separa o grafo em duas
+metades de tamanho parecido (ou de uma aresta de um ciclo muito longo, cujas
+buscas só se encontram do outro lado).
+"""
+
+from collections import deque
+
+from armazem_arestas import chave_aresta
+
+
+class StatusEuleriano:
+    """Status euleriano (paridade dos graus e conectividade) mantido incrementalmente."""
+
+    def __init__(self):
+        self.grau = {}
+        self.impares = {}  # usado como conjunto ordenado
+        self.multiplicidade = {}
+        self.num_arestas = 0
+        self.num_isolados = 0
+        self._vizinhos = {}  # vértice -> {vizinho: None}, sem laços
+        self._componente = {}  # vértice -> rótulo do componente
+        self._membros = {}  # rótulo -> {vértice: None}
+        self._proximo_rotulo = 0
+
+    def _novo_componente(self, vertices):
+        rotulo = self._proximo_rotulo
+        self._proximo_rotulo += 1
+        self._membros[rotulo] = dict.fromkeys(vertices)
+        for v in vertices:
+            self._componente[v] = rotulo
+        return rotulo
+
+    def _unir(self, u, v):
+        cu, cv = self._componente[u], self._componente[v]
+        if cu == cv:
+            return
+        menor, maior = (cu, cv) if len(self._membros[cu]) <= len(self._membros[cv]) else (cv, cu)
+        membros = self._membros.pop(menor)
+        for w in membros:
+            self._componente[w] = maior
+        self._membros[maior].update(membros)
+
+    def _separar(self, u, v):
+        """Atualiza os componentes depois da remoção da última aresta u-v."""
+        visitados = ({u: None}, {v: None})
+        filas = (deque([u]), deque([v]))
+        while True:
+            for lado in (0, 1):
+                if not filas[lado]:
+                    # Este lado se esgotou sem encontrar o outro: virou um componente
+                    membros = self._membros[self._componente[u]]
+                    for w in visitados[lado]:
+                        del membros[w]
+                    self._novo_componente(visitados[lado])
+                    return
+                x = filas[lado].popleft()
+                for y in self._vizinhos[x]:
+                    if y in visitados[1 - lado]:
+                        return
+                    if y not in visitados[lado]:
+                        visitados[lado][y] = None
+                        filas[lado].append(y)
+
+    def _alterar_grau(self, v, delta):
+        antes = self.grau[v]
+        depois = antes + delta
+        self.grau[v] = depois
+        if depois % 2:
+            self.impares[v] = None
+        else:
+            self.impares.pop(v, None)
+        if antes == 0:
+            self.num_isolados -= 1
+        elif depois == 0:
+            self.num_isolados += 1
+
+    def adicionar_vertice(self, v):
+        """Registra um vértice isolado (ignora vértices já existentes)."""
+        if v in self.grau:
+            return
+        self.grau[v] = 0
+        self.num_isolados += 1
+        self._vizinhos[v] = {}
+        self._novo_componente((v,))
+
+    def remover_vertice(self, v):
+        """Remove um vértice cujas arestas já foram removidas com remover_aresta."""
+        if v not in self.grau:
+            return
+        del self.grau[v]
+        self.impares.pop(v, None)
+        self.num_isolados -= 1
+        # Sem arestas, o vértice é sozinho o seu componente
+        del self._vizinhos[v]
+        del self._membros[self._componente.pop(v)]
+
+    def adicionar_aresta(self, u, v):
+        """Registra uma aresta u-v (cria os vértices se necessário)."""
+        self.adicionar_vertice(u)
+        self.adicionar_vertice(v)
+        chave = chave_aresta(u, v)
+        self.multiplicidade[chave] = self.multiplicidade.get(chave, 0) + 1
+        self.num_arestas += 1
+        self._alterar_grau(u, 1)
+        self._alterar_grau(v, 1)
+        if u != v:
+            self._vizinhos[u][v] = None
+            self._vizinhos[v][u] = None
+            self._unir(u, v)
+
+    def remover_aresta(self, u, v):
+        """Remove uma ocorrência da aresta u-v."""
+        chave = chave_aresta(u, v)
+        restantes = self.multiplicidade.get(chave, 0) - 1
+        if restantes < 0:
+            return
+        if restantes == 0:
+            del self.multiplicidade[chave]
+        else:
+            self.multiplicidade[chave] = restantes
+        self.num_arestas -= 1
+        self._alterar_grau(u, -1)
+        self._alterar_grau(v, -1)
+        if restantes == 0 and u != v:
+            del self._vizinhos[u][v]
+            del self._vizinhos[v][u]
+            self._separar(u, v)
+
+    @property
+    def num_componentes(self):
+        """Número de componentes conexos, contando vértices isolados."""
+        return len(self._membros)
+
+    def verificar(self):
+        """Equivalente incremental de GrafoEuleriano.verificar_euleriano."""
+        if not self.grau:
+            return False, "Grafo vazio"
+
+        if self.num_componentes > 1:
+            return False, "Grafo não é conexo"
+
+        if self.impares:
+            return False, f"Vértices com grau ímpar: {list(self.impares)}"
+
+        return True, "Grafo é euleriano"
@@ -0,0 +1,196 @@
+"""
+Fila de tarefas de otimização executadas em processos separados.
+
+Otimizações grandes não devem bloquear a thread da requisição (nem estourar o
+tempo limite de proxies): a tarefa recebe uma cópia do grafo (dicionário de
+GrafoEuleriano.to_dict), roda num ProcessPoolExecutor e informa o andamento
+por fases (validação, emparelhamento, ciclo, G-code) através de uma fila
+compartilhada. O cancelamento é cooperativo: tarefas ainda na fila são
+canceladas imediatamente e as em execução param na próxima atualização de
+progresso.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from nucleo import FASES, otimizar_grafo
+
+
+LIMITE_TAREFAS = 100
+PASSO_PROGRESSO = 0.01  # menor avanço de progresso enviado pela fila
+
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+ERRO = "erro"
+CANCELADA = "cancelada"
+
+
+class TarefaCancelada(Exception):
+    """Levantada dentro da tarefa quando o cancelamento é pedido."""
+
+
+def executar_tarefa(identificador, dados, parametros, fila, canceladas):
+    """Ponto de entrada no processo de trabalho: monta o grafo compacto e otimiza."""
+    from grafo_compacto import GrafoCompacto
+
+    ultimo = {}
+
+    def progresso(fase, fracao):
+        if identificador in canceladas:
+            raise TarefaCancelada()
+        if fase != ultimo.get("fase") or fracao >= 1.0 or fracao - ultimo["fracao"] >= PASSO_PROGRESSO:
+            ultimo["fase"], ultimo["fracao"] = fase, fracao
+            fila.put((identificador, fase, fracao))
+
+    progresso("validacao", 0.0)
+    grafo = GrafoCompacto()
+    grafo.from_dict(dados)
+    return otimizar_grafo(grafo, parametros, progresso=progresso)
+
+
+class GerenciadorTarefas:
+    """Fila de tarefas de otimização com andamento por fases e cancelamento."""
+
+    def __init__(self, processos=None, limite_tarefas=LIMITE_TAREFAS):
+        self.processos = processos
+        self.limite_tarefas = limite_tarefas
+        self._tarefas = OrderedDict()  # id -> estado da tarefa
+        self._trava = threading.Lock()
+        self._executor = None
+        self._gerente = None
+        self._fila = None
+        self._canceladas = None
+
+    def _iniciar(self):
+        # Processos são criados apenas na primeira tarefa.
+        if self._executor is None:
+            self._gerente = multiprocessing.Manager()
+            self._fila = self._gerente.Queue()
+            self._canceladas = self._gerente.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.processos)
+
+    def _nova(self, estado, parametros, projeto):
+        identificador = uuid.uuid4().hex
+        self._tarefas[identificador] = {
+            "id": identificador,
+            "estado": estado,
+            "parametros": parametros,
+            "projeto": projeto,
+            "fase": FASES[0],
+            "progresso": 0.0,
+            "erro": None,
+            "resultado": None,
+            "em_cache": False,
+            "criada": time.time()
+        }
+        while len(self._tarefas) > self.limite_tarefas:
+            antigo, tarefa = next(iter(self._tarefas.items()))
+            if tarefa["estado"] in (NA_FILA, EXECUTANDO):
+                break
+            del self._tarefas[antigo]
+        return identificador
+
+    def enviar(self, dados, parametros, ao_concluir=None, projeto=None):
+        """
+        Enfileira a otimização do grafo (dicionário to_dict) e retorna o id da tarefa.
+        ao_concluir(resultado) é chamado quando a tarefa termina com sucesso;
+        projeto só é guardado na tarefa, para quem a consultar.
+        """
+        with self._trava:
+            self._iniciar()
+            identificador = self._nova(NA_FILA, parametros, projeto)
+            futuro = self._executor.submit(executar_tarefa, identificador, dados, parametros,
+                                           self._fila, self._canceladas)
+            self._tarefas[identificador]["futuro"] = futuro
+        futuro.add_done_callback(lambda f: self._finalizar(identificador, f, ao_concluir))
+        return identificador
+
+    def concluida(self, resultado, parametros, projeto=None):
+        """Registra uma tarefa já concluída com um resultado em cache; retorna seu id."""
+        with self._trava:
+            identificador = self._nova(CONCLUIDA, parametros, projeto)
+            tarefa = self._tarefas[identificador]
+            tarefa.update(fase=FASES[-1], progresso=1.0, resultado=resultado, em_cache=True)
+        return identificador
+
+    def _finalizar(self, identificador, futuro, ao_concluir):
+        resultado = erro = None
+        try:
+            resultado = futuro.result()
+            estado = CONCLUIDA
+        except (CancelledError, TarefaCancelada):
+            estado = CANCELADA
+        except ValueError as excecao:
+            estado, erro = ERRO, str(excecao)
+        except Exception as excecao:
+            estado, erro = ERRO, f"Falha na otimização: {excecao}"
+
+        with self._trava:
+            self._canceladas.pop(identificador, None)
+            tarefa = self._tarefas.get(identificador)
+            if tarefa is not None:
+                tarefa.update(estado=estado, erro=erro, resultado=resultado)
+                tarefa.pop("futuro", None)
+                if estado == CONCLUIDA:
+                    tarefa.update(fase=FASES[-1], progresso=1.0)
+        if estado == CONCLUIDA and ao_concluir is not None:
+            ao_concluir(resultado)
+
+    def _receber_progresso(self):
+        """Aplica as atualizações de progresso pendentes na fila (chamado com a trava)."""
+        if self._fila is None:
+            return
+        while True:
+            try:
+                identificador, fase, fracao = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            tarefa = self._tarefas.get(identificador)
+            if tarefa is not None and tarefa["estado"] in (NA_FILA, EXECUTANDO):
+                tarefa.update(estado=EXECUTANDO, fase=fase, progresso=fracao)
+
+    def consultar(self, identificador):
+        """Estado atual da tarefa (cópia, com o resultado se concluída) ou None."""
+        with self._trava:
+            self._receber_progresso()
+            tarefa = self._tarefas.get(identificador)
+            if tarefa is None:
+                return None
+            return {chave: valor for chave, valor in tarefa.items() if chave != "futuro"}
+
+    def anotar(self, identificador, chave, valor):
+        """
+        Guarda valor na tarefa se ela ainda não tem a chave; retorna o valor
+        guardado (o já existente, se houver) ou None se a tarefa não existe.
+        """
+        with self._trava:
+            tarefa = self._tarefas.get(identificador)
+            if tarefa is None:
+                return None
+            return tarefa.setdefault(chave, valor)
+
+    def cancelar(self, identificador):
+        """Pede o cancelamento da tarefa; retorna False se ela não existe."""
+        with self._trava:
+            tarefa = self._tarefas.get(identificador)
+            if tarefa is None:
+                return False
+            futuro = tarefa.get("futuro")
+            if futuro is None:
+                return True
+            self._canceladas[identificador] = True
+        futuro.cancel()
+        return True
+
+    def encerrar(self):
+        """Encerra os processos de trabalho."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._gerente.shutdown()
+            self._executor = None